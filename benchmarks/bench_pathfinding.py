@@ -0,0 +1,166 @@
+# auth: christian bitter
+# name: bench_pathfinding.py
+# desc: throughput benchmark of the grid path finding on generated maps.
+# Run it from the repository root, i.e. python benchmarks/bench_pathfinding.py
+# The maps are square grids with randomly placed rectangular obstacles covering about a quarter of the cells.
+# Every map is searched between the same random pairs of free cells, paths/s and expanded nodes per path are reported.
+# Flow fields are built towards some of these goals, the time per build and per update after blocking a few cells is reported.
+# Cooperative planning moves a few hundred agents with a budget of 2 ms per update.
+# Navigation meshes are built around randomly rotated rectangles, the build time and paths/s are reported.
+
+import sys
+import time
+from os.path import abspath, dirname, join
+
+import numpy as np
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from elisa.ai import (  # noqa: E402
+    CooperativePathfinder,
+    FlowField,
+    GridPathfinder,
+    HierarchicalPathfinder,
+    JumpPointFinder,
+    NavMesh,
+)
+from elisa.linalg import Rect2  # noqa: E402
+
+
+def generate_map(size: int, density: float = 0.25, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    costs = np.ones((size, size), dtype=np.float64)
+    # some rough terrain, twice as expensive to cross
+    costs[rng.random((size, size)) < 0.1] = 2.0
+    while np.isinf(costs).mean() < density:
+        x, y = rng.integers(0, size, 2)
+        w, h = rng.integers(1, max(size // 16, 2) + 1, 2)
+        costs[y : y + h, x : x + w] = np.inf
+    return costs
+
+
+def query_pairs(costs: np.ndarray, n: int, seed: int = 1) -> list:
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(np.isfinite(costs))
+    picks = free[rng.integers(0, free.shape[0], (n, 2))]
+    return [((s[1], s[0]), (t[1], t[0])) for s, t in picks.tolist()]
+
+
+def bench(name: str, finder, pairs: list):
+    found, expanded = 0, 0
+    t0 = time.perf_counter()
+    for s, t in pairs:
+        if finder.find_path(s, t) is not None:
+            found += 1
+        expanded += finder.expanded
+    dt = time.perf_counter() - t0
+    print(
+        "{:<32} {:>10.1f} paths/s {:>12.0f} expanded/path {:>6d}/{} found".format(
+            name, len(pairs) / dt, expanded / len(pairs), found, len(pairs)
+        )
+    )
+
+
+def main():
+    print("Python {}".format(sys.version.split()[0]))
+    for size, n in ((64, 400), (128, 200), (256, 50), (512, 20)):
+        costs = generate_map(size)
+        pairs = query_pairs(costs, n)
+        for diagonal in (False, True):
+            label = "{0}x{0} {1}-connected".format(size, 8 if diagonal else 4)
+            bench("A* " + label, GridPathfinder(costs, diagonal), pairs)
+
+    # jump point search needs uniform costs, so the rough terrain is flattened for the comparison
+    for size, n in ((128, 200), (256, 50), (512, 20)):
+        costs = generate_map(size)
+        costs[np.isfinite(costs)] = 1.0
+        pairs = query_pairs(costs, n)
+        label = "{0}x{0} uniform 8-connected".format(size)
+        bench("A* " + label, GridPathfinder(costs, True), pairs)
+        bench("JPS+ " + label, JumpPointFinder.from_costs(costs), pairs)
+
+    # the abstract graph of HPA* is built once per map, the build time is reported separately
+    for size, n in ((256, 50), (512, 20), (1024, 20)):
+        costs = generate_map(size)
+        pairs = query_pairs(costs, n)
+        t0 = time.perf_counter()
+        finder = HierarchicalPathfinder(costs, 16, True)
+        print("HPA* {0}x{0} build {1:.2f} s".format(size, time.perf_counter() - t0))
+        bench("HPA* {0}x{0} 8-connected".format(size), finder, pairs)
+
+    # a flow field answers every start at once, so the time to build it towards a goal is reported
+    for size in (128, 256, 512):
+        for uniform in (True, False):
+            costs = generate_map(size)
+            if uniform:
+                costs[np.isfinite(costs)] = 1.0
+            goals = [t for _, t in query_pairs(costs, 10)]
+            for diagonal in (False, True):
+                field = FlowField(costs, diagonal)
+                t0 = time.perf_counter()
+                for goal in goals:
+                    field.set_goals([goal])
+                dt = (time.perf_counter() - t0) / len(goals)
+                t0 = time.perf_counter()
+                field.set_costs(size // 2, size // 2, np.full((4, 4), np.inf))
+                du = time.perf_counter() - t0
+                label = "{0}x{0} {1} {2}-connected".format(
+                    size, "uniform" if uniform else "weighted", 8 if diagonal else 4
+                )
+                print(
+                    "{:<32} {:>10.1f} ms/build {:>8.1f} ms/update".format(
+                        "Flow field " + label, dt * 1e3, du * 1e3
+                    )
+                )
+
+    # cooperative planning is spread across frames, the time per update within the budget and the arrivals are reported
+    for size, n in ((64, 100), (128, 300)):
+        costs = generate_map(size, density=0.2)
+        pairs = query_pairs(costs, 4 * n)
+        planner = CooperativePathfinder(costs, True)
+        starts, goals = set(), set()
+        for s, t in pairs:
+            if len(starts) < n and s not in starts | goals and t not in starts | goals:
+                planner.add_agent(len(starts), s, t)
+                starts.add(s)
+                goals.add(t)
+        times = []
+        for _ in range(4 * size):
+            t0 = time.perf_counter()
+            planner.update(2.0)
+            times.append(time.perf_counter() - t0)
+            planner.step()
+        arrived = sum(planner.arrived(a) for a in planner.agents)
+        print(
+            "{:<32} {:>10.2f} ms/update {:>8.2f} ms worst {:>6d}/{} arrived".format(
+                "WHCA* {0}x{0} 8-connected".format(size),
+                1e3 * sum(times) / len(times),
+                1e3 * max(times),
+                arrived,
+                len(starts),
+            )
+        )
+
+    # a navigation mesh covers the same kind of level with polygons, the obstacles cover about a fifth of the space
+    for size, n in ((128, 100), (256, 400), (512, 1600)):
+        rng = np.random.default_rng(0)
+        obstacles = []
+        for x, y, w, h, alpha in zip(
+            *rng.uniform(0, size, (2, n)), *rng.uniform(2, 10, (2, n)), rng.uniform(0, 90, n)
+        ):
+            r = Rect2.from_points(x - w / 2, y - h / 2, x + w / 2, y + h / 2)
+            obstacles.append(r.rotate_ip(float(alpha)))
+        t0 = time.perf_counter()
+        mesh = NavMesh.build((0, 0, size, size), obstacles)
+        print(
+            "Navmesh {0}x{0} build {1:.2f} s {2} triangles".format(
+                size, time.perf_counter() - t0, len(mesh)
+            )
+        )
+        pairs = [(s, t) for s, t in rng.uniform(0, size, (200, 2, 2)).tolist()]
+        pairs = [(s, t) for s, t in pairs if mesh.locate(s) >= 0 and mesh.locate(t) >= 0][:50]
+        bench("Navmesh {0}x{0} funnel".format(size), mesh, pairs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# auth: christian bitter
+# name: bench_tilemap.py
+# desc: benchmark of the per-frame tile access and the memory of the tile map layers.
+# Run it from the repository root, i.e. python benchmarks/bench_tilemap.py
+# A renderer reads every visible cell of a layer once per frame, the time of one full read of a layer is reported
+# for the cell by cell access, the whole layer as nested lists and a view of the region on screen.
+
+import sys
+import timeit
+import tracemalloc
+from os.path import abspath, dirname, join
+
+import numpy as np
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from elisa.sprite import TileMap  # noqa: E402
+
+
+def bench(name: str, stmt: str, env: dict, number: int = 5, repeat: int = 3):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=repeat))
+    print("{:<40} {:>10.2f} ms/frame".format(name, best / number * 1e3))
+
+
+def read_cells(tm: TileMap, grid_name: str) -> int:
+    total = 0
+    for y in range(tm.map_height):
+        for x in range(tm.map_width):
+            total += tm.get_tile_index(x, y, grid_name)
+    return total
+
+
+def read_rows(rows: list) -> int:
+    total = 0
+    for row in rows:
+        for ti in row:
+            total += ti
+    return total
+
+
+def main():
+    print("Python {}".format(sys.version.split()[0]))
+    for size in (64, 256, 1024):
+        data = np.random.default_rng(0).integers(0, 64, size * size)
+        tracemalloc.start()
+        tm = TileMap(16, size, size)
+        tm.add_grid("layer", data.tolist())
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("{0}x{0} layer {1:.2f} MB".format(size, memory / 2**20))
+
+        env = {"tm": tm, "read_cells": read_cells, "read_rows": read_rows}
+        bench("{0}x{0} get_tile_index".format(size), "read_cells(tm, 'layer')", env)
+        bench("{0}x{0} get_grid".format(size), "read_rows(tm.get_grid('layer'))", env)
+        # a 640x480 screen of 16 px tiles
+        bench(
+            "{0}x{0} region 40x30 on screen".format(size),
+            "read_rows(tm.region('layer', 8, 8, 48, 38).tolist())",
+            env,
+            number=200,
+        )
+        bench("{0}x{0} mask".format(size), "tm.mask('layer', {1, 2, 3})", env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# auth: christian bitter
+# name: bench_vec.py
+# desc: micro benchmark of the per-operation cost of the elisa vector types.
+# Run it from the repository root, i.e. python benchmarks/bench_vec.py
+# Without arguments only the vector code of the working tree is timed. Pass a git revision, e.g.
+# python benchmarks/bench_vec.py --baseline HEAD~1, to time the elisa.linalg package of that revision side by side.
+# Operations the baseline does not support are reported as n/a.
+
+import argparse
+import importlib.util
+import io
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+import tracemalloc
+from os.path import abspath, dirname, join
+
+ROOT = abspath(join(dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import elisa.linalg  # noqa: E402
+
+OPERATIONS = [
+    ("Vec2(x, y)", "Vec2(1.0, 2.0)"),
+    ("Vec2 + Vec2", "a2 + b2"),
+    ("Vec2 - Vec2", "a2 - b2"),
+    ("Vec2 * float", "a2 * 0.5"),
+    ("Vec2.dot", "Vec2.dot(a2, b2)"),
+    ("Vec2.to_unit", "a2.to_unit()"),
+    ("Vec2.to_angle", "a2.to_angle()"),
+    ("Vec2.x + Vec2[1]", "a2.x + a2[1]"),
+    ("Vec2 += Vec2", "c = c2; c += b2"),
+    ("Vec2.add_into", "Vec2.add_into(c2, a2, b2)"),
+    ("Vec3(x, y, z)", "Vec3(1.0, 2.0, 3.0)"),
+    ("Vec3 + Vec3", "a3 + b3"),
+    ("Vec3.dot", "Vec3.dot(a3, b3)"),
+    ("Vec4(w, x, y, z)", "Vec4(1.0, 2.0, 3.0, 4.0)"),
+    ("Vec4 + Vec4", "a4 + b4"),
+    ("Vec4 * float", "a4 * 0.5"),
+]
+
+
+def load_baseline(rev: str, target: str):
+    """Extracts elisa/linalg of the git revision rev into target and imports it as the package baseline_linalg"""
+    data = subprocess.run(
+        ["git", "archive", rev, "elisa/linalg"], cwd=ROOT, check=True, capture_output=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(target)
+    package = join(target, "elisa", "linalg")
+    spec = importlib.util.spec_from_file_location(
+        "baseline_linalg", join(package, "__init__.py"), submodule_search_locations=[package]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    importlib.import_module("baseline_linalg.vec4")
+    return module
+
+
+def environment(linalg) -> dict:
+    Vec2, Vec3, Vec4 = linalg.Vec2, linalg.Vec3, sys.modules[linalg.__name__ + ".vec4"].Vec4
+    return {
+        "Vec2": Vec2,
+        "Vec3": Vec3,
+        "Vec4": Vec4,
+        "a2": Vec2(1.5, -2.0),
+        "b2": Vec2(0.5, 4.0),
+        "c2": Vec2(0.0, 0.0),
+        "a3": Vec3(1.5, -2.0, 3.0),
+        "b3": Vec3(0.5, 4.0, -1.0),
+        "a4": Vec4(1.5, -2.0, 3.0, 1.0),
+        "b4": Vec4(0.5, 4.0, -1.0, 0.0),
+    }
+
+
+def bench(stmt: str, env: dict, number: int = 200000, repeat: int = 5) -> str:
+    try:
+        best = min(timeit.repeat(stmt, globals=env, number=number, repeat=repeat))
+    except (AttributeError, TypeError):
+        return "n/a"
+    return "{:.1f}".format(best / number * 1e9)
+
+
+def memory_per_vec2(Vec2) -> str:
+    tracemalloc.start()
+    vs = [Vec2(float(i), 1.0) for i in range(10000)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return "{:.1f}".format(size / len(vs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="micro benchmark of the elisa vector types")
+    parser.add_argument("--baseline", help="git revision whose elisa.linalg is timed for comparison")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        columns = [("current", elisa.linalg)]
+        if args.baseline:
+            columns.insert(0, (args.baseline, load_baseline(args.baseline, tmp)))
+        envs = [environment(linalg) for _, linalg in columns]
+
+        print("Python {}".format(sys.version.split()[0]))
+        print("{:<28}".format("ns/op") + "".join("{:>14}".format(name) for name, _ in columns))
+        for name, stmt in OPERATIONS:
+            print("{:<28}".format(name) + "".join("{:>14}".format(bench(stmt, env)) for env in envs))
+        print(
+            "{:<28}".format("bytes per Vec2")
+            + "".join("{:>14}".format(memory_per_vec2(env["Vec2"])) for env in envs)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from .core import Game, GameDifficulty, Player, PlayerType
 from .linalg.mat2 import Mat2
 from .linalg.vec2 import Point2, Vec2
+from .linalg.vec2array import Point2Array, Vec2Array
 from .linalg.vec3 import Point3, Vec3
 from .linalg.vec4 import Vec4
 from .ui import ui, uifx
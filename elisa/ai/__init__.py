@@ -0,0 +1,12 @@
+from .cooperative import CooperativePathfinder
+from .flowfield import FlowField, flow_field
+from .hpa import HierarchicalPathfinder, hpa
+from .jps import JumpPointFinder, jps
+from .navmesh import NavMesh
+from .pathfinding import (
+    GridPathfinder,
+    astar,
+    cost_fn_from_types,
+    cost_grid,
+)
+from .service import PathfindingService
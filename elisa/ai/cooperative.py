@@ -0,0 +1,433 @@
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from .flowfield import FlowField
+from .pathfinding import SQRT2
+
+# Windowed hierarchical cooperative A* (WHCA*). Agents plan one after another in space and time: a reservation table
+# holds which agent occupies which cell at which timestep, and every search avoids the cells reserved by the others at
+# the time it would enter them, as well as swapping places with an agent head on. Searches only look a window of
+# timesteps ahead, the rest of the way is estimated by a lower bound of the distance to the goal ignoring the other
+# agents: the distances of all cells to a few landmarks spread over the grid are computed once with flow fields, and by
+# the triangle inequality a cell is at least D(cell, L) - D(goal, L) away from the goal for every landmark L.
+# Agents replan once half of their window has been walked, update spreads the searches across frames within a time
+# budget but always plans the agents whose plans run out. Agents that reached their goal or have not been planned yet
+# rest in their cell, which stays reserved for them.
+
+
+class _Agent(object):
+    def __init__(self, cell: int, goal: int, now: int):
+        self.goal = goal
+        # plan[i] is the agent's cell at timestep start + i, the agent rests in the last cell afterwards
+        self.plan = [cell]
+        self.start = now
+        self.replan = True
+        # if the last cell of the plan stays reserved after the plan ran out
+        self.resting = False
+
+    def cell(self, t: int) -> int:
+        return self.plan[min(max(t - self.start, 0), len(self.plan) - 1)]
+
+
+class CooperativePathfinder(object):
+    """Plans collision free paths of many agents moving on a grid of traversal costs in lockstep timesteps.
+    Like any windowed planner it is not complete, groups packing a corridor from both ends can block each other."""
+
+    def __init__(self, costs, diagonal: bool = False, window: int = 16, landmarks: int = 8):
+        """Creates a new cooperative path finder without agents
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, positive or math.inf for blocked cells, see cost_grid
+            diagonal (bool, optional): 8 instead of 4 connectivity. Diagonal steps may not cut blocked corners. Defaults to False.
+            window (int, optional): number of timesteps a search looks ahead. Defaults to 16.
+            landmarks (int, optional): number of landmarks whose distance fields guide the searches. Defaults to 8.
+
+        Raises:
+            ValueError: if the costs are not provided, not 2D or not positive or the window is shorter than 2 steps
+        """
+        super(CooperativePathfinder, self).__init__()
+        if costs is None:
+            raise ValueError("costs not provided")
+        c = np.asarray(costs, dtype=np.float64)
+        if c.ndim != 2:
+            raise ValueError("costs have to be a 2D (height, width) array")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+        if window < 2:
+            raise ValueError("window has to be at least 2 timesteps")
+
+        self._height, self._width = c.shape
+        self._diagonal = diagonal
+        self._window = window
+        self._costs = c
+        self._cost = c.ravel().tolist()
+        self._min_cost = float(c[np.isfinite(c)].min()) if np.isfinite(c).any() else 1.0
+        self._landmarks = self._build_landmarks(max(landmarks, 0))
+        self._agents = {}
+        # timestep -> {cell: agent}, and cell -> (agent, first timestep) of the agents resting at the end of their plans
+        self._table = {}
+        self._resting = {}
+        self._now = 0
+        self._expanded = 0
+        self._planned = 0
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def diagonal(self) -> bool:
+        return self._diagonal
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    @property
+    def now(self) -> int:
+        """The current timestep
+
+        Returns:
+            int: the timestep
+        """
+        return self._now
+
+    @property
+    def agents(self) -> list:
+        return list(self._agents)
+
+    @property
+    def expanded(self) -> int:
+        """Number of nodes expanded by the last update
+
+        Returns:
+            int: number of expanded nodes
+        """
+        return self._expanded
+
+    @property
+    def planned(self) -> int:
+        """Number of agents planned by the last update
+
+        Returns:
+            int: number of planned agents
+        """
+        return self._planned
+
+    def _index(self, p) -> int:
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("cell ({}, {}) outside of the grid".format(x, y))
+        i = y * self._width + x
+        if self._cost[i] == math.inf:
+            raise ValueError("cell ({}, {}) is blocked".format(x, y))
+        return i
+
+    def _xy(self, i: int) -> tuple:
+        return i % self._width, i // self._width
+
+    def _occupant(self, i: int, t: int):
+        agent = self._table.get(t, {}).get(i)
+        if agent is None:
+            rest = self._resting.get(i)
+            if rest is not None and rest[1] <= t:
+                agent = rest[0]
+        return agent
+
+    def add_agent(self, agent, start, goal) -> None:
+        """Adds an agent, it is planned by the next updates
+
+        Args:
+            agent (hashable): the agent's id, e.g. an entity id
+            start (tuple): the (x, y) cell the agent stands on
+            goal (tuple): the (x, y) cell the agent heads for
+
+        Raises:
+            ValueError: if the agent exists, the cells are outside of the grid or blocked, or the start is occupied
+        """
+        if agent in self._agents:
+            raise ValueError("agent {} exists".format(agent))
+        s, g = self._index(start), self._index(goal)
+        if self._occupant(s, self._now) is not None:
+            raise ValueError("cell ({}, {}) is occupied".format(*start))
+        a = _Agent(s, g, self._now)
+        self._agents[agent] = a
+        self._reserve(agent, a)
+
+    def remove_agent(self, agent) -> None:
+        """Removes an agent and frees its reservations
+
+        Args:
+            agent (hashable): the agent's id
+
+        Raises:
+            ValueError: if the agent does not exist
+        """
+        a = self._agents.pop(agent, None)
+        if a is None:
+            raise ValueError("agent {} does not exist".format(agent))
+        self._release(agent, a)
+
+    def set_goal(self, agent, goal) -> None:
+        """Sends an agent to a new goal, it is planned again by the next updates
+
+        Args:
+            agent (hashable): the agent's id
+            goal (tuple): the (x, y) cell the agent heads for
+
+        Raises:
+            ValueError: if the agent does not exist or the goal is outside of the grid or blocked
+        """
+        a = self._agents.get(agent)
+        if a is None:
+            raise ValueError("agent {} does not exist".format(agent))
+        a.goal = self._index(goal)
+        a.replan = True
+
+    def position(self, agent) -> tuple:
+        """The cell of an agent at the current timestep
+
+        Args:
+            agent (hashable): the agent's id
+
+        Returns:
+            tuple: the (x, y) cell
+        """
+        return self._xy(self._agents[agent].cell(self._now))
+
+    def path(self, agent) -> list:
+        """The planned cells of an agent from the current timestep on, one per timestep
+
+        Args:
+            agent (hashable): the agent's id
+
+        Returns:
+            list: list of (x, y) cells, the agent rests in the last one
+        """
+        a = self._agents[agent]
+        return [self._xy(i) for i in a.plan[max(self._now - a.start, 0) :] or a.plan[-1:]]
+
+    def arrived(self, agent) -> bool:
+        a = self._agents[agent]
+        return a.cell(self._now) == a.goal
+
+    def _reserve(self, agent, a: _Agent) -> None:
+        table = self._table
+        for t, i in enumerate(a.plan, a.start):
+            if t >= self._now:
+                table.setdefault(t, {})[i] = agent
+        a.resting = a.plan[-1] == a.goal or len(a.plan) == 1
+        if a.resting:
+            self._resting[a.plan[-1]] = (agent, a.start + len(a.plan) - 1)
+
+    def _release(self, agent, a: _Agent) -> None:
+        table = self._table
+        for t, i in enumerate(a.plan, a.start):
+            cells = table.get(t)
+            if cells is not None and cells.get(i) == agent:
+                del cells[i]
+        if self._resting.get(a.plan[-1], (None,))[0] == agent:
+            del self._resting[a.plan[-1]]
+
+    def _build_landmarks(self, n: int) -> np.ndarray:
+        # farthest point sampling, every landmark is the cell farthest from the ones chosen so far
+        free = np.flatnonzero(np.isfinite(self._costs))
+        if n == 0 or free.size == 0:
+            return np.zeros((0, self._height, self._width))
+        field = FlowField(self._costs, self._diagonal)
+        fields = []
+        nearest = field.set_goals([self._xy(int(free[0]))]).integration
+        for _ in range(n):
+            far = np.where(np.isfinite(nearest), nearest, -1.0)
+            landmark = int(np.argmax(far))
+            if far.flat[landmark] <= 0.0 and fields:
+                break
+            d = field.set_goals([self._xy(landmark)]).integration.copy()
+            fields.append(d)
+            nearest = d if len(fields) == 1 else np.minimum(nearest, d)
+        return np.stack(fields)
+
+    def _heuristic(self, goal: int, x0: int, y0: int, x1: int, y1: int) -> list:
+        """Lower bounds of the distances to the goal of the cells in the box [x0, x1) x [y0, y1), row by row"""
+        gx, gy = self._xy(goal)
+        y, x = np.mgrid[y0:y1, x0:x1]
+        dx, dy = np.abs(x - gx), np.abs(y - gy)
+        if self._diagonal:
+            h = self._min_cost * (dx + dy + (SQRT2 - 2.0) * np.minimum(dx, dy))
+        else:
+            h = self._min_cost * (dx + dy).astype(np.float64)
+        if len(self._landmarks):
+            box = self._landmarks[:, y0:y1, x0:x1]
+            dg = self._landmarks[:, gy, gx][:, None, None]
+            with np.errstate(invalid="ignore"):
+                # a cell that cannot reach a landmark the goal reaches cannot reach the goal
+                bound = np.where(np.isinf(box) & np.isinf(dg), 0.0, box - dg)
+            h = np.maximum(h, bound.max(axis=0))
+        return h.ravel().tolist()
+
+    def _search(self, agent, a: _Agent):
+        """Space-time A* from the agent's current cell over the window, returns the plan or None"""
+        w, h = self._width, self._height
+        cost, table, resting = self._cost, self._table, self._resting
+        now, window, goal = self._now, self._window, a.goal
+        inf = math.inf
+        s = a.cell(now)
+        # only cells within the window can be reached
+        sx, sy = s % w, s // w
+        x0, y0 = max(sx - window, 0), max(sy - window, 0)
+        x1, y1 = min(sx + window + 1, w), min(sy + window + 1, h)
+        bw = x1 - x0
+        dist = self._heuristic(goal, x0, y0, x1, y1)
+        if dist[(sy - y0) * bw + sx - x0] == inf:
+            return None
+        steps = [(0, 0, 0, 1.0), (1, 0, 1, 1.0), (-1, 0, -1, 1.0), (0, 1, w, 1.0), (0, -1, -w, 1.0)]
+        if self._diagonal:
+            steps += [
+                (1, 1, w + 1, SQRT2),
+                (-1, 1, w - 1, SQRT2),
+                (1, -1, 1 - w, SQRT2),
+                (-1, -1, -w - 1, SQRT2),
+            ]
+        horizon = max(table) if table else now
+
+        def occupied(i, t):
+            other = table.get(t, {}).get(i, agent)
+            if other == agent:
+                rest = resting.get(i)
+                if rest is not None and rest[1] <= t:
+                    other = rest[0]
+            return other != agent
+
+        def can_rest(i, t):
+            # nobody else may pass or stop in the cell after the agent stopped in it
+            rest = resting.get(i)
+            if rest is not None and rest[0] != agent:
+                return False
+            return not any(
+                table.get(u, {}).get(i, agent) != agent for u in range(t + 1, horizon + 1)
+            )
+
+        # nodes are (cell, timestep relative to now), waiting at the goal is free
+        g = {(s, 0): 0.0}
+        parent = {(s, 0): None}
+        closed = set()
+        open_set = [(dist[(sy - y0) * bw + sx - x0], 0, s)]
+        push, pop = heapq.heappush, heapq.heappop
+        expanded = 0
+        end = None
+        while open_set:
+            _, k, i = pop(open_set)
+            node = (i, k)
+            if node in closed:
+                continue
+            closed.add(node)
+            # the agent plans again before it reaches the end of the window, but stays at its goal
+            if k == window or (i == goal and can_rest(i, now + k)):
+                end = node
+                break
+            expanded += 1
+            x, y = i % w, i // w
+            gi = g[node]
+            t = now + k + 1
+            reserved = table.get(t, {})
+            for dx, dy, di, f in steps:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                j = i + di
+                c = cost[j]
+                hj = dist[(ny - y0) * bw + nx - x0]
+                if c == inf or hj == inf:
+                    continue
+                if dx != 0 and dy != 0 and (cost[i + dx] == inf or cost[i + dy * w] == inf):
+                    continue
+                if occupied(j, t):
+                    continue
+                # no swapping places with an agent coming the other way
+                if di != 0:
+                    other = table.get(t - 1, {}).get(j)
+                    if other is not None and other != agent and reserved.get(i) == other:
+                        continue
+                nj = (j, k + 1)
+                if nj in closed:
+                    continue
+                gj = gi + (0.0 if di == 0 and i == goal else c * f)
+                if gj < g.get(nj, inf):
+                    g[nj] = gj
+                    parent[nj] = node
+                    push(open_set, (gj + hj, k + 1, j))
+        self._expanded += expanded
+        if end is None:
+            return None
+        plan = []
+        while end is not None:
+            plan.append(end[0])
+            end = parent[end]
+        plan.reverse()
+        return plan
+
+    def update(self, budget: float = 2.0) -> int:
+        """Plans the agents whose plans run short or whose goals changed, most urgent first, until the time budget is
+        spent. Agents whose plans end with the next timestep without a cell to rest in are planned regardless of the
+        budget, as are the agents that have to go around an agent boxed in. These forced plans can make an update take
+        longer than the budget, e.g. 4 to 5 ms in the worst case against a 2 ms budget with a few hundred agents.
+
+        Args:
+            budget (float, optional): time budget in milliseconds. Defaults to 2.0.
+
+        Returns:
+            int: number of agents planned
+        """
+        deadline = time.perf_counter() + budget / 1000.0
+        now, half = self._now, self._window // 2
+        # (due, not for a new goal, remaining steps)
+        urgency = []
+        for agent, a in self._agents.items():
+            rest = a.start + len(a.plan) - 1 - now
+            due = rest <= 1 and not a.resting
+            if due or a.replan or (rest < half and not a.resting):
+                urgency.append(((not due, not a.replan, rest), agent))
+        urgency.sort(key=lambda u: u[0])
+
+        self._expanded, planned = 0, 0
+        urgency = deque(urgency)
+        while urgency:
+            key, agent = urgency.popleft()
+            if key[0] and time.perf_counter() >= deadline:
+                break
+            a = self._agents[agent]
+            cell = a.cell(now)
+            plan = self._search(agent, a)
+            self._release(agent, a)
+            a.plan, a.start, a.replan = plan or [cell], now, False
+            self._reserve(agent, a)
+            planned += 1
+            if plan is not None:
+                continue
+            # a boxed in agent waits in its cell, the agents planned through it have to go around it right away
+            for t, cells in self._table.items():
+                other = cells.get(cell)
+                if t > now and other is not None and other != agent:
+                    urgency.appendleft(((False, False, 0), other))
+        self._planned = planned
+        return planned
+
+    def step(self) -> dict:
+        """Advances all agents by one timestep along their plans
+
+        Returns:
+            dict: agent -> (x, y) cell at the new timestep
+        """
+        self._table.pop(self._now, None)
+        self._now += 1
+        return {agent: self._xy(a.cell(self._now)) for agent, a in self._agents.items()}
@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from elisa.sprite.tilemap import TileMap
+
+from .pathfinding import SQRT2, cost_grid
+
+# A flow field holds for every cell the cost of the cheapest path to the nearest goal (the integration field) and the
+# step to take from the cell (the direction field), so any number of agents can look up their way in O(1).
+# The integration field is computed by vectorized line relaxation: the grid is covered by families of lines (columns,
+# rows and, with diagonal steps, both diagonals). Along a line, prefix sums of the entering costs give the cost between
+# any two cells of an unblocked run, so one running minimum per orientation relaxes all cells of all lines at once.
+# Only lines holding a cell that improved since the family's last pass are relaxed again, so the work follows the
+# wavefront around obstacles, and an update after changing costs starts from the lines through the changed cells.
+
+# the neighbour offsets (dx, dy), the first four are the straight ones
+_OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+
+def _shifts(s: np.ndarray, e: np.ndarray, big: float) -> np.ndarray:
+    """Precomputes the relaxation of lines running along the columns of s.
+
+    Args:
+        s (np.ndarray): (L, M) costs of entering the cells, 0 for blocked cells
+        e (np.ndarray): (L - 1, M) flags, if a step between consecutive rows is possible
+        big (float): shift between runs, above twice the cost of any path
+
+    Returns:
+        np.ndarray: (L, M) shifts, see _relax
+    """
+    # exclusive prefix sums, so that the cost from row x down to row k < x is E[x] - E[k]
+    k = np.cumsum(s, axis=0) - s
+    # runs are separated by impossible steps, later runs are shifted far down so that the running minimum restarts
+    k[1:] += np.cumsum(~e, axis=0) * big
+    return k
+
+
+def _relax(d: np.ndarray, k: np.ndarray, eps: float) -> np.ndarray:
+    """Relaxes the distances along the columns of d, propagating from lower to higher row indices.
+
+    Args:
+        d (np.ndarray): (L, M) distances, unreached cells hold a value below the shift between runs but above any path
+        k (np.ndarray): (L, M) shifts of the lines, see _shifts
+        eps (float): smallest improvement accepted, above the rounding error of the shifts
+
+    Returns:
+        np.ndarray: the relaxed distances
+    """
+    v = d - k
+    np.minimum.accumulate(v, axis=0, out=v)
+    v += k
+    # minima leaking in from an earlier run are off by more than the unreached value, so they never improve a cell
+    v += eps
+    return np.minimum(d, v)
+
+
+class _Lines(object):
+    """A family of parallel lines covering the grid, stored as the columns of (L, M) arrays."""
+
+    def __init__(self, h: int, w: int, dx: int, dy: int):
+        self.dx, self.dy = dx, dy
+        self.factor = SQRT2 if dx != 0 and dy != 0 else 1.0
+        y, x = np.mgrid[0:h, 0:w]
+        flat = y * w + x
+        if (dx, dy) == (0, 1):
+            self.index, self.line_of = flat, x.ravel()
+        elif (dx, dy) == (1, 0):
+            self.index, self.line_of = flat.T, y.ravel()
+        else:
+            # diagonals are sheared into columns, the cells off the grid point to the sentinel h * w
+            col = x - y + h - 1 if dx == 1 else x + y
+            self.index = np.full((h, w + h - 1), h * w, dtype=flat.dtype)
+            self.index[y, col] = flat
+            self.line_of = col.ravel()
+        self.dirty = np.zeros(self.index.shape[1], dtype=bool)
+
+    def prepare(self, s: np.ndarray, ok: np.ndarray, big: float, lines=None) -> None:
+        """(Re)computes the shifts of the lines
+
+        Args:
+            s (np.ndarray): (h * w + 1) costs of entering the cells, 0 for blocked cells and the sentinel
+            ok (np.ndarray): (h * w + 1) flags, if the step from a cell to the next one along the line is possible
+            big (float): shift between runs, above twice the cost of any path
+            lines (np.ndarray, optional): indices of the lines to recompute. Defaults to None, i.e. all.
+        """
+        index = self.index if lines is None else self.index[:, lines]
+        ls = s[index] * self.factor
+        le = ok[index[:-1]]
+        forward = _shifts(ls, le, big)
+        backward = _shifts(ls[::-1], le[::-1], big)
+        if lines is None:
+            self.forward, self.backward = forward, backward
+        else:
+            self.forward[:, lines] = forward
+            self.backward[:, lines] = backward
+
+    def relax(self, d: np.ndarray, eps: float) -> np.ndarray:
+        """Relaxes the dirty lines in both orientations
+
+        Args:
+            d (np.ndarray): (h * w + 1) distances, see _relax. Updated in place.
+            eps (float): smallest improvement accepted
+
+        Returns:
+            np.ndarray: the improved cells
+        """
+        lines = np.flatnonzero(self.dirty)
+        self.dirty[:] = False
+        index = self.index[:, lines]
+        before = d[index]
+        z = _relax(before, self.forward[:, lines], eps)
+        # the backward shifts are stored in reversed line order
+        z = _relax(z[::-1], self.backward[:, lines], eps)[::-1]
+        improved = z < before
+        cells = index[improved]
+        d[cells] = z[improved]
+        return cells
+
+
+class FlowField(object):
+    """Integration and direction field over a grid of traversal costs towards one or more goal cells."""
+
+    def __init__(self, costs, diagonal: bool = True):
+        """Creates a new flow field without goals, see set_goals
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, positive or math.inf for blocked cells, see cost_grid
+            diagonal (bool, optional): 8 instead of 4 connectivity. Diagonal steps may not cut blocked corners. Defaults to True.
+
+        Raises:
+            ValueError: if the costs are not provided, not 2D or not positive
+        """
+        super(FlowField, self).__init__()
+        if costs is None:
+            raise ValueError("costs not provided")
+        c = np.array(costs, dtype=np.float64)
+        if c.ndim != 2:
+            raise ValueError("costs have to be a 2D (height, width) array")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        h, w = c.shape
+        self._height, self._width = h, w
+        self._diagonal = diagonal
+        self._cost = c
+        offsets = _OFFSETS if diagonal else _OFFSETS[:4]
+        self._moves = np.array(offsets, dtype=np.int8)
+        steps = ((0, 1), (1, 0), (1, 1), (-1, 1)) if diagonal else ((0, 1), (1, 0))
+        self._lines = [_Lines(h, w, dx, dy) for dx, dy in steps]
+        # the goals asked for by set_goals and the active ones among them, i.e. those on walkable cells
+        self._requested = np.zeros(c.shape, dtype=bool)
+        self._goals = np.zeros(c.shape, dtype=bool)
+        # distances of the cells and a trailing sentinel, unreached cells and the sentinel hold self._unreached
+        self._unreached = None
+        self._distance = np.zeros(h * w + 1)
+        self._field = np.full(c.shape, np.inf)
+        self._directions = np.zeros((h, w, 2), dtype=np.int8)
+        self._rounds = 0
+        self._prepare()
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def diagonal(self) -> bool:
+        return self._diagonal
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self._cost
+
+    @property
+    def integration(self) -> np.ndarray:
+        """The (height, width) cost of the cheapest path from each cell to the nearest goal, np.inf if there is none"""
+        return self._field
+
+    @property
+    def directions(self) -> np.ndarray:
+        """The (height, width, 2) step (dx, dy) to take from each cell, (0, 0) at the goals and for unreachable cells"""
+        return self._directions
+
+    @property
+    def goals(self) -> list:
+        return [(x, y) for y, x in np.argwhere(self._goals).tolist()]
+
+    @property
+    def rounds(self) -> int:
+        """Number of relaxation rounds over the line families the last build or update took
+
+        Returns:
+            int: number of rounds
+        """
+        return self._rounds
+
+    def _bounds(self) -> None:
+        finite = self._cost[np.isfinite(self._cost)]
+        self._max_cost = float(finite.max()) if finite.size else 1.0
+        h, w = self._cost.shape
+        # no path costs more than visiting every cell, no line holds more than h + w runs
+        self._big = 4.0 * (h * w * self._max_cost * SQRT2 + 1.0)
+        self._eps = 4.0 * np.finfo(np.float64).eps * (h + w + 1) * self._big
+        unreached = 0.5 * self._big
+        if self._unreached is None:
+            self._distance[:] = unreached
+        else:
+            self._distance[self._distance >= self._unreached] = unreached
+        self._unreached = unreached
+
+    def _step_flags(self, dx: int, dy: int) -> np.ndarray:
+        h, w = self._cost.shape
+        pf = np.pad(np.isfinite(self._cost), 1, constant_values=False)
+        ok = pf[1 : 1 + h, 1 : 1 + w] & pf[1 + dy : 1 + dy + h, 1 + dx : 1 + dx + w]
+        if dx != 0 and dy != 0:
+            # no cutting of blocked corners
+            ok &= pf[1 : 1 + h, 1 + dx : 1 + dx + w] & pf[1 + dy : 1 + dy + h, 1 : 1 + w]
+        return np.append(ok.ravel(), False)
+
+    def _entering(self) -> np.ndarray:
+        c = self._cost.ravel()
+        return np.append(np.where(np.isfinite(c), c, 0.0), 0.0)
+
+    def _prepare(self, cells: np.ndarray = None) -> None:
+        if cells is None:
+            self._bounds()
+        s = self._entering()
+        for lines in self._lines:
+            ok = self._step_flags(lines.dx, lines.dy)
+            if cells is None:
+                lines.prepare(s, ok, self._big)
+            else:
+                lines.prepare(s, ok, self._big, np.unique(lines.line_of[cells]))
+
+        # cost of a step into each direction, np.inf if it is impossible
+        h, w = self._cost.shape
+        pc = np.pad(self._cost, 1, constant_values=np.inf)
+        self._steps = np.empty((len(self._moves), h, w))
+        for i, (dx, dy) in enumerate(self._moves.tolist()):
+            step = pc[1 + dy : 1 + dy + h, 1 + dx : 1 + dx + w]
+            if dx != 0 and dy != 0:
+                corner = np.isinf(pc[1 : 1 + h, 1 + dx : 1 + dx + w]) | np.isinf(
+                    pc[1 + dy : 1 + dy + h, 1 : 1 + w]
+                )
+                step = np.where(corner, np.inf, step * SQRT2)
+            self._steps[i] = step
+
+    def _mark(self, cells: np.ndarray) -> None:
+        for lines in self._lines:
+            lines.dirty[lines.line_of[cells]] = True
+
+    def _solve(self) -> None:
+        d = self._distance
+        rounds = 0
+        while any(lines.dirty.any() for lines in self._lines):
+            rounds += 1
+            for lines in self._lines:
+                if not lines.dirty.any():
+                    continue
+                cells = lines.relax(d, self._eps)
+                if cells.size:
+                    # a line is fully relaxed after its pass, only the other families have to see the improvements
+                    for other in self._lines:
+                        if other is not lines:
+                            other.dirty[other.line_of[cells]] = True
+        self._rounds = rounds
+        self._field = np.where(
+            d[:-1] < self._unreached, d[:-1], np.inf
+        ).reshape(self._height, self._width)
+        self._update_directions()
+
+    def _update_directions(self) -> None:
+        h, w = self._height, self._width
+        pd = np.pad(self.integration, 1, constant_values=np.inf)
+        best = np.full((h, w), np.inf)
+        choice = np.zeros((h, w), dtype=np.intp)
+        candidate = np.empty((h, w))
+        for i, (dx, dy) in enumerate(self._moves.tolist()):
+            np.add(pd[1 + dy : 1 + dy + h, 1 + dx : 1 + dx + w], self._steps[i], out=candidate)
+            better = candidate < best
+            np.copyto(best, candidate, where=better)
+            np.copyto(choice, i, where=better)
+        directions = self._moves[choice]
+        directions[np.isinf(best) | self._goals | ~np.isfinite(self._cost)] = 0
+        self._directions = directions
+
+    def set_goals(self, goals: list) -> FlowField:
+        """Sets the goal cells and builds the fields. If goals are only added, the existing field is updated.
+
+        Args:
+            goals (list): list of (x, y) goal cells
+
+        Raises:
+            ValueError: if no goal is provided or a goal is outside of the grid
+
+        Returns:
+            FlowField: this instance
+        """
+        if not goals:
+            raise ValueError("goals not provided")
+        mask = np.zeros_like(self._goals)
+        for x, y in goals:
+            if not (0 <= x < self._width and 0 <= y < self._height):
+                raise ValueError("goal ({}, {}) outside of the grid".format(x, y))
+            mask[y, x] = True
+        self._requested = mask.copy()
+        mask &= np.isfinite(self._cost)
+
+        # adding goals only lowers distances, so the current field is a valid starting point
+        if np.any(self._goals & ~mask):
+            self._distance[:] = self._unreached
+            self._goals[:] = False
+        added = np.flatnonzero(mask & ~self._goals)
+        self._goals = mask
+        self._distance[added] = 0.0
+        self._mark(added)
+        self._solve()
+        return self
+
+    def set_costs(self, x0: int, y0: int, costs) -> None:
+        """Overwrites the costs of a rectangular region and updates the fields. Only the cells whose path ran through
+        a cell whose cost rose are reset, and relaxation starts from the lines through the reset and changed cells.
+
+        Args:
+            x0 (int): left column of the region
+            y0 (int): top row of the region
+            costs (np.ndarray or float): (h, w) costs of the region or a single cost for a single cell
+
+        Raises:
+            ValueError: if the region is not inside the grid or the costs are not positive
+        """
+        c = np.atleast_2d(np.asarray(costs, dtype=np.float64))
+        h, w = c.shape
+        if not (0 <= x0 and x0 + w <= self._width and 0 <= y0 and y0 + h <= self._height):
+            raise ValueError("region outside of the grid")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        region = (slice(y0, y0 + h), slice(x0, x0 + w))
+        raised = np.zeros(self._cost.shape, dtype=bool)
+        raised[region] = c > self._cost[region]
+        if self._diagonal:
+            # a newly blocked cell also removes the diagonal steps cutting its corners
+            blocked = np.zeros_like(raised)
+            blocked[region] = np.isinf(c) & np.isfinite(self._cost[region])
+            padded = np.pad(blocked, 1)
+            for dx, dy in _OFFSETS:
+                raised |= padded[1 + dy : 1 + dy + self._height, 1 + dx : 1 + dx + self._width]
+        self._cost[region] = c
+        # requested goals on cells that became walkable again are goals once more
+        goals = self._requested & np.isfinite(self._cost)
+        added = np.flatnonzero(goals & ~self._goals)
+        self._goals = goals
+
+        # the steps of the region and its border change, so do the shifts of the lines through them
+        changed = np.zeros(self._cost.shape, dtype=bool)
+        changed[max(y0 - 1, 0) : y0 + h + 1, max(x0 - 1, 0) : x0 + w + 1] = True
+        changed = np.flatnonzero(changed)
+        finite = c[np.isfinite(c)]
+        if finite.size and float(finite.max()) > self._max_cost:
+            self._prepare()
+        else:
+            self._prepare(changed)
+
+        d = self._distance
+        reset = np.flatnonzero(raised)
+        if reset.size:
+            # mark every cell whose path leads through a raised cell, by pointer jumping along the directions
+            yy, xx = np.mgrid[0 : self._height, 0 : self._width]
+            nxt = ((yy + self._directions[..., 1]) * self._width + xx + self._directions[..., 0]).ravel()
+            marked = raised.ravel()
+            for _ in range(max(int(math.ceil(math.log2(nxt.size))), 1)):
+                marked = marked | marked[nxt]
+                nxt = nxt[nxt]
+            reset = np.flatnonzero(marked & ~self._goals.ravel())
+            d[reset] = self._unreached
+        d[:-1][np.isinf(self._cost.ravel())] = self._unreached
+        d[added] = 0.0
+        # the reset cells are refilled along their lines, the changed cells and new goals may offer cheaper steps
+        self._mark(reset)
+        self._mark(changed)
+        self._mark(added)
+        self._solve()
+
+    def direction(self, x: int, y: int) -> tuple:
+        """The step to take from cell (x, y)
+
+        Args:
+            x (int): column
+            y (int): row
+
+        Returns:
+            tuple: (dx, dy), (0, 0) at the goals and for unreachable cells
+        """
+        dx, dy = self._directions[y, x].tolist()
+        return dx, dy
+
+    def sample(self, points, cell_size: float = 1.0) -> np.ndarray:
+        """Looks up the unit steering directions of many agents at once
+
+        Args:
+            points (np.ndarray): (N, 2) positions in world units
+            cell_size (float, optional): extent of a cell in world units, e.g. the tile width. Defaults to 1.0.
+
+        Returns:
+            np.ndarray: (N, 2) unit directions, zero for agents outside of the grid, at a goal or without a path
+        """
+        p = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        cx = np.floor(p[:, 0] / cell_size).astype(np.int64)
+        cy = np.floor(p[:, 1] / cell_size).astype(np.int64)
+        inside = (cx >= 0) & (cx < self._width) & (cy >= 0) & (cy < self._height)
+        v = np.zeros(p.shape, dtype=np.float64)
+        v[inside] = self._directions[cy[inside], cx[inside]]
+        n = np.hypot(v[:, 0], v[:, 1])
+        return v / np.where(n > 0.0, n, 1.0)[:, None]
+
+
+def flow_field(
+    tm: TileMap, grid_name: str, goals: list, cost_fn=None, diagonal: bool = True
+) -> FlowField:
+    """Builds the flow field of a tile map layer towards the goal cells
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer
+        goals (list): list of (x, y) goal cells
+        cost_fn (callable, optional): maps a tile index to its traversal cost (math.inf for blocked tiles). Defaults to None, i.e. every tile costs 1.
+        diagonal (bool, optional): 8 instead of 4 connectivity. Defaults to True.
+
+    Returns:
+        FlowField: the flow field
+    """
+    return FlowField(cost_grid(tm, grid_name, cost_fn), diagonal).set_goals(goals)
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import heapq
+import math
+
+import numpy as np
+
+from elisa.sprite.tilemap import TileMap
+
+from .pathfinding import SQRT2, cost_grid
+
+# Hierarchical path finding (HPA*) partitions the grid into square clusters. Along the border of two neighbouring clusters
+# every run of cells passable on both sides yields one or two transitions, i.e. pairs of abstract nodes facing each other.
+# The cheapest paths between the abstract nodes of a cluster are precomputed, so a query only connects start and goal to
+# the nodes of their clusters and searches the small abstract graph. Changing cells only recomputes the transitions on the
+# borders of the clusters touched and the paths inside these clusters and their neighbours.
+
+# runs of at least this many cells get a transition at either end instead of a single one in the middle
+_WIDE_ENTRANCE = 6
+# keys of the start and goal in the abstract graph of a query
+_START, _GOAL = -1, -2
+
+
+class HierarchicalPathfinder(object):
+    """HPA* over a grid of traversal costs. Paths are near optimal, but not guaranteed to be the cheapest ones."""
+
+    def __init__(self, costs, cluster_size: int = 16, diagonal: bool = False):
+        """Creates a new path finder and builds its abstract graph
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, positive or math.inf for blocked cells, see cost_grid
+            cluster_size (int, optional): edge length of the clusters in cells. Defaults to 16.
+            diagonal (bool, optional): 8 instead of 4 connectivity. Diagonal steps may not cut blocked corners. Defaults to False.
+
+        Raises:
+            ValueError: if the costs are not provided, not 2D or not positive, or the cluster size is smaller than 2
+        """
+        super(HierarchicalPathfinder, self).__init__()
+        if costs is None:
+            raise ValueError("costs not provided")
+        c = np.asarray(costs, dtype=np.float64)
+        if c.ndim != 2:
+            raise ValueError("costs have to be a 2D (height, width) array")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+        if cluster_size < 2:
+            raise ValueError("cluster size has to be at least 2")
+
+        self._height, self._width = c.shape
+        self._cluster_size = cluster_size
+        self._ncx = -(-self._width // cluster_size)
+        self._ncy = -(-self._height // cluster_size)
+        self._diagonal = diagonal
+        self._cost = c.ravel().tolist()
+        self._min_cost = float(c[np.isfinite(c)].min()) if np.isfinite(c).any() else 1.0
+        # border -> list of transitions (a, b), a on the left/ top side
+        self._transitions = {}
+        # node -> {node on the other side of a border: cost}
+        self._inter = {}
+        # cluster -> {node: {node: (cost, path)}}
+        self._intra = {}
+        # node -> [(node, cost)] joining the inter and intra edges, filled lazily by the searches
+        self._adjacency = {}
+        self._expanded = 0
+
+        for cy in range(self._ncy):
+            for cx in range(self._ncx):
+                if cx + 1 < self._ncx:
+                    self._build_border((0, cx, cy))
+                if cy + 1 < self._ncy:
+                    self._build_border((1, cx, cy))
+        for cluster in range(self._ncx * self._ncy):
+            self._build_cluster(cluster)
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def cluster_size(self) -> int:
+        return self._cluster_size
+
+    @property
+    def expanded(self) -> int:
+        """Number of abstract nodes expanded by the last search
+
+        Returns:
+            int: number of expanded nodes
+        """
+        return self._expanded
+
+    @property
+    def nodes(self) -> list:
+        """The cells of the abstract graph's nodes
+
+        Returns:
+            list: list of (x, y) cells
+        """
+        w = self._width
+        return sorted((i % w, i // w) for i in self._inter)
+
+    def _cluster(self, i: int) -> int:
+        cs, w = self._cluster_size, self._width
+        return (i // w // cs) * self._ncx + (i % w) // cs
+
+    def _bounds(self, cluster: int) -> tuple:
+        cs = self._cluster_size
+        cx, cy = cluster % self._ncx, cluster // self._ncx
+        return (
+            cx * cs,
+            cy * cs,
+            min((cx + 1) * cs, self._width),
+            min((cy + 1) * cs, self._height),
+        )
+
+    def _borders(self, cluster: int) -> list:
+        # borders are keyed by (orientation, cx, cy) of the cluster on their left (0) or top (1) side
+        cx, cy = cluster % self._ncx, cluster // self._ncx
+        borders = []
+        if cx + 1 < self._ncx:
+            borders.append((0, cx, cy))
+        if cx > 0:
+            borders.append((0, cx - 1, cy))
+        if cy + 1 < self._ncy:
+            borders.append((1, cx, cy))
+        if cy > 0:
+            borders.append((1, cx, cy - 1))
+        return borders
+
+    def _build_border(self, border: tuple) -> None:
+        for a, b in self._transitions.pop(border, []):
+            for u, v in ((a, b), (b, a)):
+                links = self._inter.get(u)
+                if links is not None:
+                    links.pop(v, None)
+                    if not links:
+                        del self._inter[u]
+
+        orientation, cx, cy = border
+        cs, w, cost, inf = self._cluster_size, self._width, self._cost, math.inf
+        if orientation == 0:
+            x = (cx + 1) * cs - 1
+            cells = [(y * w + x, y * w + x + 1) for y in range(cy * cs, min((cy + 1) * cs, self._height))]
+        else:
+            y = (cy + 1) * cs - 1
+            cells = [(y * w + x, (y + 1) * w + x) for x in range(cx * cs, min((cx + 1) * cs, w))]
+
+        transitions, run = [], []
+        for a, b in cells + [(None, None)]:
+            if a is not None and cost[a] != inf and cost[b] != inf:
+                run.append((a, b))
+                continue
+            if len(run) >= _WIDE_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+
+        self._transitions[border] = transitions
+        for a, b in transitions:
+            self._inter.setdefault(a, {})[b] = cost[b]
+            self._inter.setdefault(b, {})[a] = cost[a]
+
+    def _nodes(self, cluster: int) -> list:
+        nodes = set()
+        for border in self._borders(cluster):
+            for a, b in self._transitions.get(border, []):
+                nodes.add(a if self._cluster(a) == cluster else b)
+        return sorted(nodes)
+
+    def _search(self, source: int, targets, bounds: tuple, reverse: bool = False) -> dict:
+        """Dijkstra search from source restricted to bounds
+
+        Args:
+            source (int): the source cell
+            targets (collection): the cells to find paths to, the search stops once all of them are settled
+            bounds (tuple): (x0, y0, x1, y1) the search may not leave
+            reverse (bool, optional): find the paths from the targets to the source instead. Defaults to False.
+
+        Returns:
+            dict: target -> (cost, path) for the reachable targets, paths run from source to target (target to source if reversed)
+        """
+        x0, y0, x1, y1 = bounds
+        w, cost, inf, diagonal = self._width, self._cost, math.inf, self._diagonal
+        dist, parent = {source: 0.0}, {source: -1}
+        remaining = set(targets)
+        found = {}
+        open_set = [(0.0, source)]
+        while open_set and remaining:
+            d, i = heapq.heappop(open_set)
+            if d > dist[i]:
+                continue
+            if i in remaining:
+                remaining.discard(i)
+                path = []
+                j = i
+                while j != -1:
+                    path.append((j % w, j // w))
+                    j = parent[j]
+                found[i] = (d, path if reverse else path[::-1])
+            x, y = i % w, i // w
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)):
+                if dx != 0 and dy != 0 and not diagonal:
+                    break
+                nx, ny = x + dx, y + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                if dx != 0 and dy != 0 and (cost[i + dx] == inf or cost[i + dy * w] == inf):
+                    continue
+                j = ny * w + nx
+                if cost[j] == inf:
+                    continue
+                # moving backwards, the cell entered is the current one
+                step = cost[i] if reverse else cost[j]
+                nd = d + (step * SQRT2 if dx != 0 and dy != 0 else step)
+                if nd < dist.get(j, inf):
+                    dist[j], parent[j] = nd, i
+                    heapq.heappush(open_set, (nd, j))
+        return found
+
+    def _build_cluster(self, cluster: int) -> None:
+        bounds = self._bounds(cluster)
+        nodes = self._nodes(cluster)
+        edges = {}
+        for a in nodes:
+            edges[a] = {b: r for b, r in self._search(a, nodes, bounds).items() if b != a}
+        self._intra[cluster] = edges
+
+    def set_costs(self, x0: int, y0: int, costs) -> None:
+        """Overwrites the costs of a rectangular region, e.g. after tiles were changed, and updates the abstract graph
+        of the clusters touched and their neighbours
+
+        Args:
+            x0 (int): left column of the region
+            y0 (int): top row of the region
+            costs (np.ndarray or float): (h, w) costs of the region or a single cost for a single cell
+
+        Raises:
+            ValueError: if the region is not inside the grid or the costs are not positive
+        """
+        c = np.atleast_2d(np.asarray(costs, dtype=np.float64))
+        h, w = c.shape
+        if not (0 <= x0 and x0 + w <= self._width and 0 <= y0 and y0 + h <= self._height):
+            raise ValueError("region outside of the grid")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        for r, row in enumerate(c.tolist()):
+            i = (y0 + r) * self._width + x0
+            self._cost[i : i + w] = row
+        finite = c[np.isfinite(c)]
+        if finite.size > 0:
+            self._min_cost = min(self._min_cost, float(finite.min()))
+
+        cs = self._cluster_size
+        touched = {
+            cy * self._ncx + cx
+            for cy in range(y0 // cs, (y0 + h - 1) // cs + 1)
+            for cx in range(x0 // cs, (x0 + w - 1) // cs + 1)
+        }
+        borders = {b for cluster in touched for b in self._borders(cluster)}
+        for border in borders:
+            self._build_border(border)
+        self._adjacency = {}
+
+        rebuild = set(touched)
+        for orientation, cx, cy in borders:
+            rebuild.add(cy * self._ncx + cx)
+            rebuild.add((cy + orientation) * self._ncx + cx + 1 - orientation)
+        for cluster in rebuild:
+            self._build_cluster(cluster)
+
+    def _index(self, p) -> int:
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("cell ({}, {}) outside of the grid".format(x, y))
+        return y * self._width + x
+
+    def path_cost(self, path: list) -> float:
+        """Sums the traversal costs along a path
+
+        Args:
+            path (list): list of (x, y) cells
+
+        Returns:
+            float: the path's cost
+        """
+        total = 0.0
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            c = self._cost[y1 * self._width + x1]
+            total += c * SQRT2 if x0 != x1 and y0 != y1 else c
+        return total
+
+    def find_path(self, start, goal) -> list:
+        """Finds a path from start to goal through the abstract graph and refines it to cells
+
+        Args:
+            start (tuple): the (x, y) start cell
+            goal (tuple): the (x, y) goal cell
+
+        Raises:
+            ValueError: if start or goal are outside of the grid
+
+        Returns:
+            list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+        """
+        s, t = self._index(start), self._index(goal)
+        self._expanded = 0
+        if self._cost[s] == math.inf or self._cost[t] == math.inf:
+            return None
+        if s == t:
+            return [(s % self._width, s // self._width)]
+
+        # connect start and goal to the abstract nodes of their clusters
+        sc, tc = self._cluster(s), self._cluster(t)
+        start_nodes = self._nodes(sc)
+        goal_nodes = self._nodes(tc)
+        start_links = self._search(s, start_nodes + ([t] if sc == tc else []), self._bounds(sc))
+        goal_links = self._search(t, goal_nodes, self._bounds(tc), reverse=True)
+        ncx = self._ncx
+        if sc != tc and abs(sc % ncx - tc % ncx) <= 1 and abs(sc // ncx - tc // ncx) <= 1:
+            # in neighbouring clusters the direct path may be far shorter than the one over the transitions
+            (ax0, ay0, ax1, ay1), (bx0, by0, bx1, by1) = self._bounds(sc), self._bounds(tc)
+            bounds = (min(ax0, bx0), min(ay0, by0), max(ax1, bx1), max(ay1, by1))
+            start_links.update(self._search(s, [t], bounds))
+
+        w, mc, diagonal = self._width, self._min_cost, self._diagonal
+        adjacency = self._adjacency
+        tx, ty = t % w, t // w
+
+        def heuristic(i):
+            if i == _GOAL:
+                return 0.0
+            dx, dy = abs(i % w - tx), abs(i // w - ty)
+            if diagonal:
+                return mc * (dx + dy + (SQRT2 - 2.0) * min(dx, dy))
+            return mc * (dx + dy)
+
+        def neighbours(i):
+            if i == _START:
+                for j, (c, _) in start_links.items():
+                    yield (_GOAL if j == t else j), c
+                return
+            adjacent = adjacency.get(i)
+            if adjacent is None:
+                adjacent = list(self._inter.get(i, {}).items()) + [
+                    (j, c) for j, (c, _) in self._intra[self._cluster(i)].get(i, {}).items()
+                ]
+                adjacency[i] = adjacent
+            yield from adjacent
+            if i in goal_links:
+                yield _GOAL, goal_links[i][0]
+
+        g, parent = {_START: 0.0}, {_START: None}
+        open_set = [(heuristic(s), _START)]
+        closed = set()
+        expanded = 0
+        while open_set:
+            _, i = heapq.heappop(open_set)
+            if i in closed:
+                continue
+            if i == _GOAL:
+                break
+            closed.add(i)
+            expanded += 1
+            gi = g[i]
+            for j, c in neighbours(i):
+                gj = gi + c
+                if j not in closed and gj < g.get(j, math.inf):
+                    g[j], parent[j] = gj, i
+                    heapq.heappush(open_set, (gj + heuristic(j), j))
+        self._expanded = expanded
+        if _GOAL not in parent:
+            return None
+
+        # refine the abstract path to cells
+        keys = []
+        i = _GOAL
+        while i is not None:
+            keys.append(i)
+            i = parent[i]
+        keys.reverse()
+
+        path = []
+        for a, b in zip(keys, keys[1:]):
+            if a == _START:
+                segment = start_links[t if b == _GOAL else b][1]
+            elif b == _GOAL:
+                segment = goal_links[a][1]
+            elif b in self._inter.get(a, {}) and self._cluster(a) != self._cluster(b):
+                segment = [(a % w, a // w), (b % w, b // w)]
+            else:
+                segment = self._intra[self._cluster(a)][a][b][1]
+            path += segment[1:] if path else segment
+        return path
+
+
+def hpa(
+    tm: TileMap,
+    grid_name: str,
+    start,
+    goal,
+    cost_fn=None,
+    diagonal: bool = False,
+    cluster_size: int = 16,
+) -> list:
+    """Finds a near optimal path between two cells of a tile map layer with HPA*. Building the abstract graph is the
+    expensive part, for repeated queries on the same layer build a HierarchicalPathfinder once instead.
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer to search on
+        start (tuple): the (x, y) start cell
+        goal (tuple): the (x, y) goal cell
+        cost_fn (callable, optional): maps a tile index to its traversal cost (math.inf for blocked tiles). Defaults to None, i.e. every tile costs 1.
+        diagonal (bool, optional): 8 instead of 4 connectivity. Defaults to False.
+        cluster_size (int, optional): edge length of the clusters in cells. Defaults to 16.
+
+    Returns:
+        list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+    """
+    return HierarchicalPathfinder(
+        cost_grid(tm, grid_name, cost_fn), cluster_size, diagonal
+    ).find_path(start, goal)
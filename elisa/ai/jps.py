@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+
+from elisa.sprite.tilemap import TileMap
+
+from .pathfinding import SQRT2, cost_grid
+
+# Jump point search exploits that on a uniform cost grid most paths are symmetric. Instead of pushing every neighbour, a
+# node only jumps ahead along its direction of travel until it reaches a jump point, i.e. a cell with a forced neighbour
+# that can only be reached optimally through it. Diagonal moves never cut blocked corners, as for GridPathfinder.
+# The straight jumps are precomputed (JPS+): for every cell and cardinal direction the tables hold the distance to the
+# next jump point and the number of free cells ahead. Changing a cell only recomputes the rows and columns next to it.
+
+# the cardinal directions east, west, south and north as (dx, dy)
+_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_EAST, _WEST, _SOUTH, _NORTH = 0, 1, 2, 3
+
+
+def _east_tables(p: np.ndarray) -> tuple:
+    """Computes the jump and run distances towards +x for the inner rows of the padded walkability array p.
+
+    Args:
+        p (np.ndarray): (h + 2, w + 2) walkability padded by a blocked border
+
+    Returns:
+        tuple: (h, w) distances to the next jump point (0 if a wall comes first) and (h, w) number of free cells ahead
+    """
+    walk = p[1:-1, 1:-1]
+    h, w = walk.shape
+    # a cell entered moving east is a jump point, if the cell above or below is free but was blocked one step back
+    forced = walk & (
+        (p[:-2, 1:-1] & ~p[:-2, :-2]) | (p[2:, 1:-1] & ~p[2:, :-2])
+    )
+
+    cols = np.arange(w)
+    big = np.int64(w)
+    # index of the first blocked and the first event (blocked or forced) cell at or after each column
+    blocked = np.where(~walk, cols, big)
+    event = np.where(~walk | forced, cols, big)
+    first_blocked = np.minimum.accumulate(blocked[:, ::-1], axis=1)[:, ::-1]
+    first_event = np.minimum.accumulate(event[:, ::-1], axis=1)[:, ::-1]
+    # the scan starts one cell ahead
+    nxt_blocked = np.concatenate((first_blocked[:, 1:], np.full((h, 1), big)), axis=1)
+    nxt_event = np.concatenate((first_event[:, 1:], np.full((h, 1), big)), axis=1)
+
+    run = np.where(walk, nxt_blocked - cols - 1, 0)
+    jump = np.where(walk & (nxt_event < nxt_blocked), nxt_event - cols, 0)
+    return jump, run
+
+
+class JumpPointFinder(object):
+    """Jump point search (JPS+) over a uniform cost grid with 8 connectivity. Paths are as short as the ones found by
+    GridPathfinder with diagonal moves on the same grid, while far fewer nodes are expanded.
+    """
+
+    def __init__(self, walkable):
+        """Creates a new path finder and precomputes its jump tables
+
+        Args:
+            walkable (np.ndarray): (height, width) boolean array of the walkable cells, e.g. the negated TileMap.mask of the blocking tiles
+
+        Raises:
+            ValueError: if walkable is not provided or not 2D
+        """
+        super(JumpPointFinder, self).__init__()
+        if walkable is None:
+            raise ValueError("walkable not provided")
+        walk = np.asarray(walkable, dtype=bool)
+        if walk.ndim != 2:
+            raise ValueError("walkable has to be a 2D (height, width) array")
+
+        self._height, self._width = walk.shape
+        n = walk.size
+        self._walk_grid = walk.copy()
+        self._walk = walk.ravel().tolist()
+        self._jump = [None] * 4
+        self._run = [None] * 4
+        self._g = [0.0] * n
+        self._parent = [-1] * n
+        self._seen = [0] * n
+        self._closed = [0] * n
+        self._generation = 0
+        self._expanded = 0
+        self._build(0, self._height, 0, self._width)
+
+    @staticmethod
+    def from_costs(costs) -> JumpPointFinder:
+        """Creates a path finder from a cost grid as used by GridPathfinder
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, math.inf for blocked cells
+
+        Raises:
+            ValueError: if the finite costs are not uniform, use GridPathfinder for weighted grids
+
+        Returns:
+            JumpPointFinder: the path finder
+        """
+        c = np.asarray(costs, dtype=np.float64)
+        finite = c[np.isfinite(c)]
+        if finite.size > 0 and np.any(finite != finite[0]):
+            raise ValueError("jump point search requires uniform costs")
+        return JumpPointFinder(np.isfinite(c))
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def expanded(self) -> int:
+        """Number of nodes (jump points) expanded by the last search
+
+        Returns:
+            int: number of expanded nodes
+        """
+        return self._expanded
+
+    @property
+    def walkable(self) -> np.ndarray:
+        return self._walk_grid.copy()
+
+    def _build(self, y0: int, y1: int, x0: int, x1: int) -> None:
+        # recomputes the east/ west tables of the rows [y0, y1) and the south/ north tables of the columns [x0, x1)
+        p = np.pad(self._walk_grid, 1, constant_values=False)
+        w = self._width
+
+        if y1 > y0:
+            band = p[y0 : y1 + 2]
+            east = _east_tables(band)
+            west = tuple(t[:, ::-1] for t in _east_tables(band[:, ::-1]))
+            for d, (jump, run) in ((_EAST, east), (_WEST, west)):
+                if self._jump[d] is None:
+                    self._jump[d], self._run[d] = jump.ravel().tolist(), run.ravel().tolist()
+                else:
+                    self._jump[d][y0 * w : y1 * w] = jump.ravel().tolist()
+                    self._run[d][y0 * w : y1 * w] = run.ravel().tolist()
+
+        if x1 > x0:
+            band = p[:, x0 : x1 + 2].T
+            south = tuple(t.T for t in _east_tables(band))
+            north = tuple(t[:, ::-1].T for t in _east_tables(band[:, ::-1]))
+            for d, (jump, run) in ((_SOUTH, south), (_NORTH, north)):
+                if self._jump[d] is None:
+                    self._jump[d], self._run[d] = jump.ravel().tolist(), run.ravel().tolist()
+                else:
+                    jl, rl = jump.tolist(), run.tolist()
+                    for c in range(x1 - x0):
+                        self._jump[d][x0 + c :: w] = [row[c] for row in jl]
+                        self._run[d][x0 + c :: w] = [row[c] for row in rl]
+
+    def set_walkable(self, x0: int, y0: int, walkable) -> None:
+        """Changes the walkability of a rectangular region and updates the jump tables of the rows and columns next to it
+
+        Args:
+            x0 (int): left column of the region
+            y0 (int): top row of the region
+            walkable (np.ndarray or bool): (h, w) walkability of the region or a single value for a single cell
+
+        Raises:
+            ValueError: if the region is not inside the grid
+        """
+        v = np.atleast_2d(np.asarray(walkable, dtype=bool))
+        h, w = v.shape
+        if not (0 <= x0 and x0 + w <= self._width and 0 <= y0 and y0 + h <= self._height):
+            raise ValueError("region outside of the grid")
+
+        self._walk_grid[y0 : y0 + h, x0 : x0 + w] = v
+        for r, row in enumerate(v.tolist()):
+            i = (y0 + r) * self._width + x0
+            self._walk[i : i + w] = row
+        # forced neighbours depend on the adjacent rows/ columns as well
+        self._build(
+            max(y0 - 1, 0),
+            min(y0 + h + 1, self._height),
+            max(x0 - 1, 0),
+            min(x0 + w + 1, self._width),
+        )
+
+    def _index(self, p) -> int:
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("cell ({}, {}) outside of the grid".format(x, y))
+        return y * self._width + x
+
+    def _free(self, x: int, y: int) -> bool:
+        return 0 <= x < self._width and 0 <= y < self._height and self._walk[y * self._width + x]
+
+    def _straight(self, i: int, d: int, goal: int) -> int:
+        # successor of i jumping along the cardinal direction d, the goal if it is passed on the way, -1 if none
+        run = self._run[d][i]
+        if run == 0:
+            return -1
+        w = self._width
+        jump = self._jump[d][i]
+        dx, dy = _DIRECTIONS[d]
+        x, y, gx, gy = i % w, i // w, goal % w, goal // w
+        if dy == 0 and gy == y:
+            k = (gx - x) * dx
+        elif dx == 0 and gx == x:
+            k = (gy - y) * dy
+        else:
+            k = 0
+        if 0 < k <= run and (jump == 0 or k <= jump):
+            return goal
+        if jump == 0:
+            return -1
+        return i + jump * (dx + dy * w)
+
+    def _diagonal(self, i: int, dx: int, dy: int, goal: int) -> int:
+        # successor of i jumping diagonally, the first cell from which a straight jump finds something, -1 if none
+        w, free = self._width, self._free
+        x, y = i % w, i // w
+        dh = _EAST if dx > 0 else _WEST
+        dv = _SOUTH if dy > 0 else _NORTH
+        while True:
+            if not (free(x + dx, y) and free(x, y + dy) and free(x + dx, y + dy)):
+                return -1
+            x, y = x + dx, y + dy
+            j = y * w + x
+            if j == goal:
+                return j
+            if self._straight(j, dh, goal) != -1 or self._straight(j, dv, goal) != -1:
+                return j
+
+    def _successors(self, i: int, goal: int) -> list:
+        w, free = self._width, self._free
+        x, y = i % w, i // w
+        p = self._parent[i]
+        if p == -1:
+            dirs = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)]
+        else:
+            px, py = p % w, p // w
+            dx, dy = (x > px) - (x < px), (y > py) - (y < py)
+            if dx != 0 and dy != 0:
+                dirs = [(dx, 0), (0, dy), (dx, dy)]
+            elif dx != 0:
+                dirs = [(dx, 0), (0, 1), (0, -1)]
+                if free(x + dx, y):
+                    dirs += [(dx, 1), (dx, -1)]
+            else:
+                dirs = [(0, dy), (1, 0), (-1, 0)]
+                if free(x, y + dy):
+                    dirs += [(1, dy), (-1, dy)]
+
+        successors = []
+        for dx, dy in dirs:
+            if dx != 0 and dy != 0:
+                j = self._diagonal(i, dx, dy, goal)
+            else:
+                j = self._straight(i, _DIRECTIONS.index((dx, dy)), goal)
+            if j != -1:
+                successors.append(j)
+        return successors
+
+    def _path(self, i: int) -> list:
+        # the jump points are connected by straight or diagonal lines, which are filled in cell by cell
+        w, parent = self._width, self._parent
+        points = []
+        while i != -1:
+            points.append((i % w, i // w))
+            i = parent[i]
+        points.reverse()
+
+        path = points[:1]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            dx, dy = (x1 > x0) - (x1 < x0), (y1 > y0) - (y1 < y0)
+            for k in range(1, max(abs(x1 - x0), abs(y1 - y0)) + 1):
+                path.append((x0 + k * dx, y0 + k * dy))
+        return path
+
+    def find_path(self, start, goal) -> list:
+        """Finds a shortest path from start to goal
+
+        Args:
+            start (tuple): the (x, y) start cell
+            goal (tuple): the (x, y) goal cell
+
+        Raises:
+            ValueError: if start or goal are outside of the grid
+
+        Returns:
+            list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+        """
+        s, t = self._index(start), self._index(goal)
+        self._expanded = 0
+        if not self._walk[s] or not self._walk[t]:
+            return None
+
+        self._generation += 1
+        gen = self._generation
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        w = self._width
+        tx, ty = t % w, t // w
+
+        def heuristic(i):
+            dx, dy = abs(i % w - tx), abs(i // w - ty)
+            return dx + dy + (SQRT2 - 2.0) * min(dx, dy)
+
+        g[s], parent[s], seen[s] = 0.0, -1, gen
+        open_set = [(heuristic(s), s)]
+        push, pop = heapq.heappush, heapq.heappop
+        expanded = 0
+
+        while open_set:
+            _, i = pop(open_set)
+            if closed[i] == gen:
+                continue
+            if i == t:
+                self._expanded = expanded
+                return self._path(t)
+            closed[i] = gen
+            expanded += 1
+            x, y, gi = i % w, i // w, g[i]
+
+            for j in self._successors(i, t):
+                if closed[j] == gen:
+                    continue
+                dx, dy = abs(j % w - x), abs(j // w - y)
+                gj = gi + (dx * SQRT2 if dx == dy else dx + dy)
+                if seen[j] != gen or gj < g[j]:
+                    g[j], parent[j], seen[j] = gj, i, gen
+                    push(open_set, (gj + heuristic(j), j))
+
+        self._expanded = expanded
+        return None
+
+
+def jps(tm: TileMap, grid_name: str, start, goal, cost_fn=None) -> list:
+    """Finds a shortest path between two cells of a uniform cost tile map layer with jump point search, moving in
+    8 directions. For repeated queries on the same layer, build a JumpPointFinder once instead.
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer to search on
+        start (tuple): the (x, y) start cell
+        goal (tuple): the (x, y) goal cell
+        cost_fn (callable, optional): maps a tile index to its traversal cost, math.inf for blocked tiles. All finite costs need to be equal. Defaults to None, i.e. every tile is walkable.
+
+    Raises:
+        ValueError: if the finite costs are not uniform
+
+    Returns:
+        list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+    """
+    return JumpPointFinder.from_costs(cost_grid(tm, grid_name, cost_fn)).find_path(
+        start, goal
+    )
@@ -0,0 +1,599 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+
+import numpy as np
+
+from elisa.linalg import Poly2, inside_poly2_many
+
+# Navigation meshes for levels authored as polygons rather than tiles. The free space inside a boundary polygon and around
+# the obstacle polygons is covered by triangles of a constrained Delaunay triangulation, i.e. every polygon edge is an
+# edge of the triangulation and no triangle straddles the border of an obstacle. Crossing obstacle edges are split at
+# their intersections first, so obstacles may overlap each other and the boundary. A search runs A* over the triangles
+# sharing an edge, which yields a corridor of triangles, and the simple stupid funnel algorithm pulls the path through
+# the corridor taut, leaving any-angle paths which only bend at obstacle corners.
+# Orientations follow the usual math convention, a triangle (a, b, c) is counter clockwise if c lies left of a -> b.
+
+# relative tolerance of the triangulation, scaled by the extent of the input
+_EPS = 1e-9
+
+
+def _orient(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    # twice the signed area of the triangle (a, b, c), positive if c lies left of a -> b
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _incircle(ax, ay, bx, by, cx, cy, dx, dy) -> float:
+    # positive if d lies inside the circumcircle of the counter clockwise triangle (a, b, c)
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    ad, bd, cd = adx * adx + ady * ady, bdx * bdx + bdy * bdy, cdx * cdx + cdy * cdy
+    return (
+        adx * (bdy * cd - bd * cdy)
+        - ady * (bdx * cd - bd * cdx)
+        + ad * (bdx * cdy - bdy * cdx)
+    )
+
+
+class _Triangulation(object):
+    # Incremental constrained Delaunay triangulation. A triangle (a, b, c) is stored as its three directed edges, each
+    # mapping to the opposite vertex, so the triangle on the other side of the edge (a, b) is found under (b, a).
+    # Everything lies inside a large super triangle made of the vertices 0, 1 and 2.
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float):
+        cx, cy = 0.5 * (x0 + x1), 0.5 * (y0 + y1)
+        d = max(x1 - x0, y1 - y0, 1.0)
+        self._tol = _EPS * d
+        self._itol = _EPS * d**4
+        self._x = [cx - 20.0 * d, cx + 20.0 * d, cx]
+        self._y = [cy - 10.0 * d, cy - 10.0 * d, cy + 20.0 * d]
+        self._opp = {}
+        # vertex -> a vertex it shares an edge with, may be outdated
+        self._adj = {}
+        self._last = (0, 1)
+        self._add(0, 1, 2)
+
+    def _add(self, a: int, b: int, c: int) -> None:
+        opp = self._opp
+        opp[(a, b)], opp[(b, c)], opp[(c, a)] = c, a, b
+        self._adj[a], self._adj[b], self._adj[c] = b, c, a
+        self._last = (a, b)
+
+    def _remove(self, a: int, b: int, c: int) -> None:
+        opp = self._opp
+        del opp[(a, b)], opp[(b, c)], opp[(c, a)]
+
+    def _side(self, a: int, b: int, p: int) -> float:
+        # signed distance of p from the line a -> b, positive on the left
+        x, y = self._x, self._y
+        return _orient(x[a], y[a], x[b], y[b], x[p], y[p]) / max(
+            math.hypot(x[b] - x[a], y[b] - y[a]), self._tol
+        )
+
+    def _locate(self, p: int) -> tuple:
+        # visibility walk from the last triangle added, falls back to a scan should the walk not terminate
+        u, v = self._last if self._last in self._opp else next(iter(self._opp))
+        w = self._opp[(u, v)]
+        tol = self._tol
+        for _ in range(4 * len(self._opp) + 16):
+            if self._side(u, v, p) < -tol:
+                u, v = v, u
+            elif self._side(v, w, p) < -tol:
+                u, v = w, v
+            elif self._side(w, u, p) < -tol:
+                u, v = u, w
+            else:
+                return u, v, w
+            w = self._opp.get((u, v))
+            if w is None:
+                break
+        for (u, v), w in self._opp.items():
+            if min(self._side(u, v, p), self._side(v, w, p), self._side(w, u, p)) >= -tol:
+                return u, v, w
+        raise ValueError("point outside of the triangulation")
+
+    def add_point(self, px: float, py: float) -> int:
+        x, y = self._x, self._y
+        p = len(x)
+        x.append(px)
+        y.append(py)
+        u, v, w = self._locate(p)
+        for q in (u, v, w):
+            if math.hypot(x[q] - px, y[q] - py) <= self._tol:
+                # coincides with a vertex
+                x.pop()
+                y.pop()
+                return q
+
+        tol = self._tol
+        for a, b, c in ((u, v, w), (v, w, u), (w, u, v)):
+            if abs(self._side(a, b, p)) <= tol:
+                # on the edge (a, b), which splits both triangles sharing it
+                d = self._opp[(b, a)]
+                self._remove(a, b, c)
+                self._remove(b, a, d)
+                for t in ((p, c, a), (p, b, c), (p, d, b), (p, a, d)):
+                    self._add(*t)
+                self._legalize([(p, c, a), (p, b, c), (p, d, b), (p, a, d)])
+                return p
+
+        self._remove(u, v, w)
+        for t in ((p, u, v), (p, v, w), (p, w, u)):
+            self._add(*t)
+        self._legalize([(p, u, v), (p, v, w), (p, w, u)])
+        return p
+
+    def _legalize(self, stack: list) -> None:
+        # flips the edges opposite the new vertex until all of them are locally Delaunay
+        x, y, opp = self._x, self._y, self._opp
+        while stack:
+            p, a, b = stack.pop()
+            if opp.get((a, b)) != p:
+                continue
+            d = opp.get((b, a))
+            if d is None:
+                continue
+            if _incircle(x[p], y[p], x[a], y[a], x[b], y[b], x[d], y[d]) > self._itol:
+                self._remove(p, a, b)
+                self._remove(b, a, d)
+                self._add(p, a, d)
+                self._add(p, d, b)
+                stack.append((p, a, d))
+                stack.append((p, d, b))
+
+    def _fan_start(self, a: int) -> int:
+        b = self._adj.get(a)
+        if b is not None and (a, b) in self._opp:
+            return b
+        for u, v in self._opp:
+            if u == a:
+                self._adj[a] = v
+                return v
+        raise ValueError("vertex not in the triangulation")
+
+    def add_segment(self, a: int, b: int) -> None:
+        x, y, opp, tol = self._x, self._y, self._opp, self._tol
+        stack = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            if a == b or (a, b) in opp or (b, a) in opp:
+                continue
+            dx, dy = x[b] - x[a], y[b] - y[a]
+
+            # find the triangle around a the segment leaves a through
+            u = self._fan_start(a)
+            first, split, w = u, None, None
+            while True:
+                w = opp[(a, u)]
+                if abs(self._side(a, b, u)) <= tol and (x[u] - x[a]) * dx + (y[u] - y[a]) * dy > 0.0:
+                    split = u
+                    break
+                if self._side(a, b, u) < 0.0 < self._side(a, b, w):
+                    break
+                u = w
+                if u == first or (a, u) not in opp:
+                    raise ValueError("segment cannot be inserted")
+            if split is not None:
+                # a vertex on the segment, insert both parts
+                stack.append((split, b))
+                stack.append((a, split))
+                continue
+
+            # walk the triangles crossed, collecting the vertices left and right of the segment
+            left, right, crossed = [w], [u], [(a, u, w)]
+            while True:
+                c = opp[(w, u)]
+                crossed.append((w, u, c))
+                if c == b:
+                    break
+                s = self._side(a, b, c)
+                if abs(s) <= tol:
+                    # a vertex on the segment, the rest is inserted from there
+                    stack.append((c, b))
+                    b = c
+                    break
+                if s < 0.0:
+                    right.append(c)
+                    u = c
+                else:
+                    left.append(c)
+                    w = c
+            for t in crossed:
+                self._remove(*t)
+            self._fill(a, b, left)
+            self._fill(b, a, right[::-1])
+
+    def _fill(self, a: int, b: int, chain: list) -> None:
+        # triangulates the cavity between the edge (a, b) and the chain of vertices left of it, ordered from a to b
+        x, y = self._x, self._y
+        stack = [(a, b, chain)]
+        while stack:
+            a, b, chain = stack.pop()
+            if not chain:
+                continue
+            k = 0
+            for i in range(1, len(chain)):
+                c, d = chain[k], chain[i]
+                if _incircle(x[a], y[a], x[b], y[b], x[c], y[c], x[d], y[d]) > 0.0:
+                    k = i
+            c = chain[k]
+            self._add(a, b, c)
+            stack.append((a, c, chain[:k]))
+            stack.append((c, b, chain[k + 1 :]))
+
+    def triangles(self) -> tuple:
+        # the (N, 2) real vertices and the triangles not touching the super triangle
+        tris = set()
+        for (a, b), c in self._opp.items():
+            if a > 2 and b > 2 and c > 2 and a < b and a < c:
+                tris.add((a, b, c))
+        v = np.stack((self._x[3:], self._y[3:]), axis=1).reshape(-1, 2)
+        t = np.array(sorted(tris), dtype=np.int64).reshape(-1, 3) - 3
+        return v, t
+
+
+def _polygon(p, name: str) -> np.ndarray:
+    v = p.vertices if isinstance(p, Poly2) else np.asarray(p, dtype=np.float64).reshape(-1, 2)
+    if v.shape[0] < 3:
+        raise ValueError("{} needs at least 3 points".format(name))
+    if not np.all(np.isfinite(v)):
+        raise ValueError("{} has to have finite points".format(name))
+    return v
+
+
+def _split_segments(polygons: list, tol: float) -> list:
+    # the polygon edges as (p, q) point pairs, split wherever they cross or touch another edge
+    p = np.concatenate(polygons)
+    q = np.concatenate([np.roll(v, -1, axis=0) for v in polygons])
+    r = q - p
+    n = p.shape[0]
+    lt = tol / np.maximum(np.hypot(r[:, 0], r[:, 1]), tol)
+    segments = []
+    # segment i crosses segment j at p_i + t_ij * r_i = p_j + u_ij * r_j, solved for a block of rows at a time
+    block = max(1, (1 << 20) // n)
+    for i0 in range(0, n, block):
+        i1 = min(i0 + block, n)
+        pi, ri, li = p[i0:i1, np.newaxis, :], r[i0:i1, np.newaxis, :], lt[i0:i1, np.newaxis]
+        qp = p[np.newaxis, :, :] - pi
+        denom = ri[:, :, 0] * r[np.newaxis, :, 1] - ri[:, :, 1] * r[np.newaxis, :, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (qp[:, :, 0] * r[np.newaxis, :, 1] - qp[:, :, 1] * r[np.newaxis, :, 0]) / denom
+            u = (qp[:, :, 0] * ri[:, :, 1] - qp[:, :, 1] * ri[:, :, 0]) / denom
+        hit = (
+            (denom != 0.0)
+            & (t > li)
+            & (t < 1.0 - li)
+            & (u >= -lt[np.newaxis, :])
+            & (u <= 1.0 + lt[np.newaxis, :])
+        )
+        for i in range(i0, i1):
+            ts = np.sort(t[i - i0, hit[i - i0]])
+            pts = [tuple(p[i].tolist())]
+            pts += [tuple(x) for x in (p[i] + ts[:, np.newaxis] * r[i]).tolist()]
+            pts.append(tuple(q[i].tolist()))
+            segments.extend(zip(pts, pts[1:]))
+    return segments
+
+
+class NavMesh(object):
+    """A navigation mesh of triangles covering the walkable space of a level, searched with A* over the triangles and
+    smoothed with the funnel algorithm. Build it once with NavMesh.build at level load, or save and load it as json.
+    """
+
+    def __init__(self, vertices, triangles):
+        """Creates a new navigation mesh from its triangles, triangles sharing an edge are connected
+
+        Args:
+            vertices (np.ndarray or list): (N, 2) vertex positions
+            triangles (np.ndarray or list): (M, 3) vertex indices of the triangles in either winding order
+
+        Raises:
+            ValueError: if vertices or triangles are not provided, not of the right shape or reference missing vertices
+        """
+        super(NavMesh, self).__init__()
+        if vertices is None:
+            raise ValueError("vertices not provided")
+        if triangles is None:
+            raise ValueError("triangles not provided")
+        v = np.array(vertices, dtype=np.float64).reshape(-1, 2)
+        t = np.array(triangles, dtype=np.int64).reshape(-1, 3)
+        if t.size and (t.min() < 0 or t.max() >= v.shape[0]):
+            raise ValueError("triangles reference vertices not provided")
+
+        # keep every triangle counter clockwise
+        a, b, c = v[t[:, 0]], v[t[:, 1]], v[t[:, 2]]
+        cw = _orient(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1]) < 0.0
+        t[cw] = t[cw][:, ::-1]
+
+        self._vertices = v
+        self._triangles = t
+        self._corners = v[t]
+        scale = float(np.ptp(v, axis=0).max()) if v.shape[0] else 1.0
+        self._tol = _EPS * max(scale, 1.0)
+
+        # the triangle across each edge, edge k runs from corner k to corner k + 1
+        self._neighbours = np.full(t.shape, -1, dtype=np.int64)
+        edges = {}
+        for i, (p, q, r) in enumerate(t.tolist()):
+            for k, e in enumerate(((p, q), (q, r), (r, p))):
+                edges[e] = (i, k)
+        for (p, q), (i, k) in edges.items():
+            j = edges.get((q, p))
+            if j is not None:
+                self._neighbours[i, k] = j[0]
+        self._adjacency = self._neighbours.tolist()
+        self._xy = self._corners.tolist()
+        # edge end points and lengths for locate, edge midpoints for the search
+        self._ends = np.roll(self._corners, -1, axis=1)
+        d = self._ends - self._corners
+        self._lengths = np.hypot(d[:, :, 0], d[:, :, 1])
+        self._midpoints = (0.5 * (self._corners + self._ends)).tolist()
+        self._expanded = 0
+
+    @staticmethod
+    def build(bounds, obstacles: list = None) -> NavMesh:
+        """Triangulates the free space inside the bounds and outside of the obstacles
+
+        Args:
+            bounds (Poly2 or tuple): the boundary polygon, e.g. a Rect2, or a box (xmin, ymin, xmax, ymax)
+            obstacles (list, optional): list of Poly2 or lists of points. They may overlap each other and the bounds. Defaults to None.
+
+        Raises:
+            ValueError: if the bounds are not provided or a polygon has less than 3 points
+
+        Returns:
+            NavMesh: the navigation mesh
+        """
+        if bounds is None:
+            raise ValueError("bounds not provided")
+        if not isinstance(bounds, Poly2) and len(bounds) == 4 and np.ndim(bounds) == 1:
+            x0, y0, x1, y1 = bounds
+            bounds = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+        outer = _polygon(bounds, "bounds")
+        holes = [_polygon(o, "obstacle") for o in (obstacles or [])]
+
+        points = np.concatenate([outer] + holes)
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        cdt = _Triangulation(x0, y0, x1, y1)
+        segments = _split_segments([outer] + holes, cdt._tol)
+        ids = {}
+        for p, q in segments:
+            for s in (p, q):
+                if s not in ids:
+                    ids[s] = cdt.add_point(*s)
+        for p, q in segments:
+            cdt.add_segment(ids[p], ids[q])
+
+        v, t = cdt.triangles()
+        centroids = v[t].mean(axis=1)
+        keep = inside_poly2_many(outer, centroids)
+        for h in holes:
+            keep &= ~inside_poly2_many(h, centroids)
+        t = t[keep]
+        # drop the vertices outside of the walkable space
+        used = np.unique(t)
+        remap = np.full(v.shape[0], -1, dtype=np.int64)
+        remap[used] = np.arange(used.shape[0])
+        return NavMesh(v[used], remap[t])
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return self._vertices.copy()
+
+    @property
+    def triangles(self) -> np.ndarray:
+        """The vertex indices of the counter clockwise triangles
+
+        Returns:
+            np.ndarray: (M, 3) vertex indices
+        """
+        return self._triangles.copy()
+
+    @property
+    def neighbours(self) -> np.ndarray:
+        """The triangle across each edge, edge k runs from corner k to corner k + 1
+
+        Returns:
+            np.ndarray: (M, 3) triangle indices, -1 where the edge borders an obstacle or the bounds
+        """
+        return self._neighbours.copy()
+
+    @property
+    def expanded(self) -> int:
+        """Number of triangles expanded by the last search
+
+        Returns:
+            int: number of expanded triangles
+        """
+        return self._expanded
+
+    def __len__(self) -> int:
+        return self._triangles.shape[0]
+
+    def locate(self, p) -> int:
+        """Finds the triangle containing a point
+
+        Args:
+            p (Point2 or tuple): the point
+
+        Returns:
+            int: the triangle's index, or -1 if the point lies outside of the mesh
+        """
+        px, py = float(p[0]), float(p[1])
+        a, b = self._corners, self._ends
+        side = _orient(a[:, :, 0], a[:, :, 1], b[:, :, 0], b[:, :, 1], px, py)
+        inside = np.flatnonzero(np.all(side >= -self._tol * self._lengths, axis=1))
+        return int(inside[0]) if inside.size else -1
+
+    def _portal(self, i: int, j: int) -> tuple:
+        # the (left, right) end points of the edge from triangle i into triangle j, as seen walking from i to j
+        k = self._adjacency[i].index(j)
+        corners = self._xy[i]
+        return tuple(corners[(k + 1) % 3]), tuple(corners[k])
+
+    def find_corridor(self, start, goal) -> list:
+        """Finds the triangles a path from start to goal passes through. The search runs from edge midpoint to edge
+        midpoint, so the corridor is short but not guaranteed to hold the shortest path.
+
+        Args:
+            start (Point2 or tuple): the start point
+            goal (Point2 or tuple): the goal point
+
+        Returns:
+            list: the triangle indices from the start's to the goal's triangle, or None if the goal cannot be reached
+        """
+        s, t = self.locate(start), self.locate(goal)
+        self._expanded = 0
+        if s < 0 or t < 0:
+            return None
+        if s == t:
+            return [s]
+
+        gx, gy = float(goal[0]), float(goal[1])
+        adjacency, midpoints = self._adjacency, self._midpoints
+        # position where the search entered a triangle, the middle of the edge crossed
+        pos = {s: (float(start[0]), float(start[1]))}
+        g, parent, closed = {s: 0.0}, {s: -1}, set()
+        open_set = [(math.hypot(pos[s][0] - gx, pos[s][1] - gy), s)]
+        push, pop = heapq.heappush, heapq.heappop
+        expanded = 0
+
+        while open_set:
+            _, i = pop(open_set)
+            if i in closed:
+                continue
+            if i == t:
+                self._expanded = expanded
+                corridor = []
+                while i >= 0:
+                    corridor.append(i)
+                    i = parent[i]
+                return corridor[::-1]
+            closed.add(i)
+            expanded += 1
+            x, y = pos[i]
+            for j, (mx, my) in zip(adjacency[i], midpoints[i]):
+                if j < 0 or j in closed:
+                    continue
+                gj = g[i] + math.hypot(mx - x, my - y)
+                if j not in g or gj < g[j]:
+                    g[j], parent[j], pos[j] = gj, i, (mx, my)
+                    push(open_set, (gj + math.hypot(mx - gx, my - gy), j))
+
+        self._expanded = expanded
+        return None
+
+    def find_path(self, start, goal) -> list:
+        """Finds a path from start to goal, pulled taut through the corridor of triangles by the funnel algorithm
+
+        Args:
+            start (Point2 or tuple): the start point
+            goal (Point2 or tuple): the goal point
+
+        Returns:
+            list: the path as list of (x, y) points from start to goal, bending only at obstacle corners, or None if the goal cannot be reached
+        """
+        corridor = self.find_corridor(start, goal)
+        if corridor is None:
+            return None
+        start, goal = (float(start[0]), float(start[1])), (float(goal[0]), float(goal[1]))
+        portals = [(start, start)]
+        portals += [self._portal(i, j) for i, j in zip(corridor, corridor[1:])]
+        portals.append((goal, goal))
+        return self._funnel(portals)
+
+    @staticmethod
+    def _funnel(portals: list) -> list:
+        # simple stupid funnel: narrow the funnel portal by portal, once a side would cross the other the corner of the
+        # other side becomes the new apex and the walk restarts from there
+        apex = left = right = portals[0][0]
+        ai = li = ri = 0
+        path = [apex]
+        i = 1
+        while i < len(portals):
+            pl, pr = portals[i]
+            if _orient(*apex, *right, *pr) >= 0.0:
+                if apex == right or _orient(*apex, *left, *pr) < 0.0:
+                    right, ri = pr, i
+                else:
+                    if path[-1] != left:
+                        path.append(left)
+                    apex = right = left
+                    ai = ri = li
+                    i = ai + 1
+                    continue
+            if _orient(*apex, *left, *pl) <= 0.0:
+                if apex == left or _orient(*apex, *right, *pl) > 0.0:
+                    left, li = pl, i
+                else:
+                    if path[-1] != right:
+                        path.append(right)
+                    apex = left = right
+                    ai = li = ri
+                    i = ai + 1
+                    continue
+            i += 1
+        goal = portals[-1][0]
+        if path[-1] != goal:
+            path.append(goal)
+        return path
+
+    def to_dict(self) -> dict:
+        """The mesh as plain lists, suitable for json
+
+        Returns:
+            dict: dict of vertices and triangles
+        """
+        return {"vertices": self._vertices.tolist(), "triangles": self._triangles.tolist()}
+
+    @staticmethod
+    def from_dict(d: dict) -> NavMesh:
+        """Creates a mesh from the dict returned by to_dict
+
+        Args:
+            d (dict): dict of vertices and triangles
+
+        Raises:
+            ValueError: if the dict is not provided or misses the vertices or triangles
+
+        Returns:
+            NavMesh: the navigation mesh
+        """
+        if not d:
+            raise ValueError("d not provided")
+        if "vertices" not in d or "triangles" not in d:
+            raise ValueError("d does not appear to be a navigation mesh")
+        return NavMesh(d["vertices"], d["triangles"])
+
+    def save(self, json_fp: str) -> None:
+        """Writes the mesh to a json file
+
+        Args:
+            json_fp (str): path of the file
+        """
+        if not json_fp or json_fp.strip() == "":
+            raise ValueError("json_fp not provided")
+        with open(json_fp, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @staticmethod
+    def load(json_fp: str) -> NavMesh:
+        """Reads a mesh written by save
+
+        Args:
+            json_fp (str): path of the file
+
+        Raises:
+            ValueError: if the file path is not provided or the file does not exist
+
+        Returns:
+            NavMesh: the navigation mesh
+        """
+        if not json_fp or json_fp.strip() == "":
+            raise ValueError("json_fp not provided")
+        if not os.path.exists(json_fp):
+            raise ValueError("json_fp does not exist")
+        with open(json_fp, "r") as f:
+            return NavMesh.from_dict(json.load(f))
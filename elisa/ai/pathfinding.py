@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import heapq
+import math
+
+import numpy as np
+
+from elisa.sprite.tilemap import TileMap
+
+# Path finding on tile grids. The grid is given as an array of traversal costs, where entering a cell costs the cell's
+# cost (times sqrt(2) for diagonal steps) and cells of infinite cost are blocked. All per cell search state lives in
+# flat lists indexed by y * width + x. The lists are allocated once per grid and reused across searches, a generation
+# stamp marks which entries belong to the current search, so a query never pays for clearing the whole grid.
+
+SQRT2 = math.sqrt(2.0)
+
+
+def cost_fn_from_types(tileprops: dict, type_costs: dict, default: float = 1.0):
+    """Creates a cost function assigning each tile the traversal cost of its tile type.
+
+    Args:
+        tileprops (dict): map of tile index to tile properties as returned by tileprops_from_tsx
+        type_costs (dict): map of tile type to traversal cost, use math.inf for blocking types
+        default (float, optional): cost of tiles whose type is not listed or which have no properties. Defaults to 1.0.
+
+    Raises:
+        ValueError: if the tile properties or type costs are not provided
+
+    Returns:
+        callable: function mapping a tile index to its traversal cost
+    """
+    if tileprops is None:
+        raise ValueError("tile properties not provided")
+    if type_costs is None:
+        raise ValueError("type costs not provided")
+
+    costs = {
+        i: float(type_costs.get(p.get("type"), default)) for i, p in tileprops.items()
+    }
+    return lambda tile_index: costs.get(tile_index, default)
+
+
+def cost_grid(tm: TileMap, grid_name: str, cost_fn=None) -> np.ndarray:
+    """Evaluates the traversal costs of a tile map layer.
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer
+        cost_fn (callable, optional): maps a tile index to its traversal cost (math.inf for blocked tiles). Defaults to None, i.e. every tile costs 1.
+
+    Raises:
+        ValueError: if the tile map is not provided or the layer does not exist
+
+    Returns:
+        np.ndarray: (map height, map width) float array of costs, indexed as costs[y, x]
+    """
+    if tm is None:
+        raise ValueError("tile map not provided")
+    if not tm.has_grid(grid_name):
+        raise ValueError("logical grid does not exist")
+    if cost_fn is None:
+        return np.ones(tm.get_array(grid_name).shape, dtype=np.float64)
+
+    # the cost function is evaluated once per distinct tile index
+    return tm.map_tiles(grid_name, lambda i: float(cost_fn(i)), np.float64)
+
+
+class GridPathfinder(object):
+    """A* search over a grid of traversal costs. Build it once per grid and run any number of queries on it."""
+
+    def __init__(self, costs, diagonal: bool = False):
+        """Creates a new path finder
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, positive or math.inf for blocked cells, see cost_grid
+            diagonal (bool, optional): 8 instead of 4 connectivity. Diagonal steps may not cut blocked corners. Defaults to False.
+
+        Raises:
+            ValueError: if the costs are not provided, not 2D, or not positive
+        """
+        super(GridPathfinder, self).__init__()
+        if costs is None:
+            raise ValueError("costs not provided")
+        c = np.asarray(costs, dtype=np.float64)
+        if c.ndim != 2:
+            raise ValueError("costs have to be a 2D (height, width) array")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        self._height, self._width = c.shape
+        n = c.size
+        self._diagonal = diagonal
+        self._cost = c.ravel().tolist()
+        self._g = [0.0] * n
+        self._parent = [-1] * n
+        # generation stamps, an entry is valid if its stamp equals the current search's generation
+        self._seen = [0] * n
+        self._closed = [0] * n
+        self._generation = 0
+        self._expanded = 0
+        self._update_min_cost()
+
+    def _update_min_cost(self) -> None:
+        finite = [v for v in self._cost if v != math.inf]
+        self._min_cost = min(finite) if finite else 1.0
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def diagonal(self) -> bool:
+        return self._diagonal
+
+    @property
+    def expanded(self) -> int:
+        """Number of nodes expanded by the last search
+
+        Returns:
+            int: number of expanded nodes
+        """
+        return self._expanded
+
+    @property
+    def costs(self) -> np.ndarray:
+        return np.array(self._cost, dtype=np.float64).reshape(self._height, self._width)
+
+    def cost(self, x: int, y: int) -> float:
+        return self._cost[y * self._width + x]
+
+    def passable(self, x: int, y: int) -> bool:
+        return (
+            0 <= x < self._width
+            and 0 <= y < self._height
+            and self._cost[y * self._width + x] != math.inf
+        )
+
+    def set_costs(self, x0: int, y0: int, costs) -> None:
+        """Overwrites the costs of a rectangular region, e.g. after tiles were changed
+
+        Args:
+            x0 (int): left column of the region
+            y0 (int): top row of the region
+            costs (np.ndarray or float): (h, w) costs of the region or a single cost for a single cell
+
+        Raises:
+            ValueError: if the region is not inside the grid or the costs are not positive
+        """
+        c = np.atleast_2d(np.asarray(costs, dtype=np.float64))
+        h, w = c.shape
+        if not (0 <= x0 and x0 + w <= self._width and 0 <= y0 and y0 + h <= self._height):
+            raise ValueError("region outside of the grid")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        for r, row in enumerate(c.tolist()):
+            i = (y0 + r) * self._width + x0
+            self._cost[i : i + w] = row
+        self._update_min_cost()
+
+    def _index(self, p) -> int:
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("cell ({}, {}) outside of the grid".format(x, y))
+        return y * self._width + x
+
+    def _path(self, i: int) -> list:
+        w, parent = self._width, self._parent
+        path = []
+        while i != -1:
+            path.append((i % w, i // w))
+            i = parent[i]
+        path.reverse()
+        return path
+
+    def path_cost(self, path: list) -> float:
+        """Sums the traversal costs along a path
+
+        Args:
+            path (list): list of (x, y) cells
+
+        Returns:
+            float: the path's cost
+        """
+        total = 0.0
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            c = self._cost[y1 * self._width + x1]
+            total += c * SQRT2 if x0 != x1 and y0 != y1 else c
+        return total
+
+    def find_path(self, start, goal) -> list:
+        """Finds a cheapest path from start to goal
+
+        Args:
+            start (tuple): the (x, y) start cell
+            goal (tuple): the (x, y) goal cell
+
+        Raises:
+            ValueError: if start or goal are outside of the grid
+
+        Returns:
+            list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+        """
+        s, t = self._index(start), self._index(goal)
+        cost, g, parent, seen, closed = (
+            self._cost,
+            self._g,
+            self._parent,
+            self._seen,
+            self._closed,
+        )
+        w, h = self._width, self._height
+        self._expanded = 0
+        if cost[s] == math.inf or cost[t] == math.inf:
+            return None
+
+        self._generation += 1
+        gen = self._generation
+        tx, ty = t % w, t // w
+        mc = self._min_cost
+        diagonal = self._diagonal
+        inf = math.inf
+        # step of the 8 neighbours as (dx, dy, index offset)
+        steps = ((1, 0, 1), (-1, 0, -1), (0, 1, w), (0, -1, -w))
+        diagonals = ((1, 1, w + 1), (-1, 1, w - 1), (1, -1, 1 - w), (-1, -1, -w - 1))
+
+        def heuristic(i):
+            dx, dy = abs(i % w - tx), abs(i // w - ty)
+            if diagonal:
+                return mc * (dx + dy + (SQRT2 - 2.0) * min(dx, dy))
+            return mc * (dx + dy)
+
+        g[s], parent[s], seen[s] = 0.0, -1, gen
+        open_set = [(heuristic(s), s)]
+        push, pop = heapq.heappush, heapq.heappop
+        expanded = 0
+
+        while open_set:
+            _, i = pop(open_set)
+            if closed[i] == gen:
+                continue
+            if i == t:
+                self._expanded = expanded
+                return self._path(t)
+            closed[i] = gen
+            expanded += 1
+            x, y = i % w, i // w
+            gi = g[i]
+
+            for dx, dy, di in steps:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                j = i + di
+                c = cost[j]
+                if c == inf or closed[j] == gen:
+                    continue
+                gj = gi + c
+                if seen[j] != gen or gj < g[j]:
+                    g[j], parent[j], seen[j] = gj, i, gen
+                    push(open_set, (gj + heuristic(j), j))
+
+            if not diagonal:
+                continue
+            for dx, dy, di in diagonals:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                j = i + di
+                c = cost[j]
+                # diagonal steps must not cut a blocked corner
+                if c == inf or closed[j] == gen or cost[i + dx] == inf or cost[i + dy * w] == inf:
+                    continue
+                gj = gi + c * SQRT2
+                if seen[j] != gen or gj < g[j]:
+                    g[j], parent[j], seen[j] = gj, i, gen
+                    push(open_set, (gj + heuristic(j), j))
+
+        self._expanded = expanded
+        return None
+
+
+def astar(
+    tm: TileMap, grid_name: str, start, goal, cost_fn=None, diagonal: bool = False
+) -> list:
+    """Finds a cheapest path between two cells of a tile map layer with A*.
+    For repeated queries on the same layer, build a GridPathfinder once instead.
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer to search on
+        start (tuple): the (x, y) start cell
+        goal (tuple): the (x, y) goal cell
+        cost_fn (callable, optional): maps a tile index to its traversal cost (math.inf for blocked tiles), see cost_fn_from_types. Defaults to None, i.e. every tile costs 1.
+        diagonal (bool, optional): 8 instead of 4 connectivity. Defaults to False.
+
+    Returns:
+        list: the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+    """
+    return GridPathfinder(cost_grid(tm, grid_name, cost_fn), diagonal).find_path(
+        start, goal
+    )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .pathfinding import GridPathfinder
+
+# Path finding off the game loop. The traversal costs live in a shared memory block, which every worker process maps
+# and turns into its own GridPathfinder whenever the grid's version changed since its last search. Writes bump the
+# version first and submit the pending requests again, so a result computed from an older or half-written grid is never
+# accepted. The grid is split into square regions, each with its own version, a cached path stays valid as long as
+# none of the regions it crosses has changed.
+
+# state of a worker process, set up by _init_worker
+_worker = {}
+
+
+def _init_worker(name: str, shape: tuple, diagonal: bool) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.update(
+        shm=shm,
+        costs=np.ndarray(shape, dtype=np.float64, buffer=shm.buf),
+        diagonal=diagonal,
+        version=-1,
+        finder=None,
+    )
+
+
+def _solve(version: int, start: tuple, goal: tuple) -> list:
+    if _worker["version"] != version:
+        _worker["finder"] = GridPathfinder(_worker["costs"], _worker["diagonal"])
+        _worker["version"] = version
+    return _worker["finder"].find_path(start, goal)
+
+
+class _Request(object):
+    def __init__(self, key, start: tuple, goal: tuple):
+        self.key = key
+        self.start = start
+        self.goal = goal
+        self.future = Future()
+        self.job = None
+        self.version = -1
+
+
+class PathfindingService(object):
+    """Solves path requests on a grid of traversal costs in a pool of worker processes."""
+
+    def __init__(
+        self,
+        costs,
+        diagonal: bool = False,
+        workers: int = None,
+        region_size: int = 32,
+        cache_size: int = 4096,
+    ):
+        """Creates a new service and starts its worker processes. Call close when done, or use it as context manager.
+
+        Args:
+            costs (np.ndarray): (height, width) traversal costs, positive or math.inf for blocked cells, see cost_grid
+            diagonal (bool, optional): 8 instead of 4 connectivity. Defaults to False.
+            workers (int, optional): number of worker processes. Defaults to None, i.e. the number of processors.
+            region_size (int, optional): edge length of the regions in cells whose versions guard the cache. Defaults to 32.
+            cache_size (int, optional): maximal number of cached paths. Defaults to 4096.
+
+        Raises:
+            ValueError: if the costs are not provided, not 2D or not positive or the region size is not positive
+        """
+        super(PathfindingService, self).__init__()
+        if costs is None:
+            raise ValueError("costs not provided")
+        c = np.asarray(costs, dtype=np.float64)
+        if c.ndim != 2:
+            raise ValueError("costs have to be a 2D (height, width) array")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+        if region_size < 1:
+            raise ValueError("region size has to be positive")
+
+        self._height, self._width = c.shape
+        self._diagonal = diagonal
+        self._region_size = region_size
+        self._regions = np.zeros(
+            (-(-self._height // region_size), -(-self._width // region_size)), dtype=np.int64
+        )
+        self._cache_size = cache_size
+        self._cache = {}
+        self._version = 0
+        # futures may run their callbacks right away, e.g. when cancelled, so the lock has to be reentrant
+        self._lock = threading.RLock()
+        self._pending = set()
+        self._keys = {}
+        self._completed = []
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(c.nbytes, 1))
+        self._costs = np.ndarray(c.shape, dtype=np.float64, buffer=self._shm.buf)
+        self._costs[:] = c
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self._shm.name, c.shape, diagonal),
+        )
+
+    def __enter__(self) -> PathfindingService:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def diagonal(self) -> bool:
+        return self._diagonal
+
+    @property
+    def version(self) -> int:
+        """The grid's version, increased by every set_costs
+
+        Returns:
+            int: the version
+        """
+        return self._version
+
+    @property
+    def pending(self) -> int:
+        """Number of requests not completed yet
+
+        Returns:
+            int: number of pending requests
+        """
+        with self._lock:
+            return len(self._pending)
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self._costs.copy()
+
+    def region_version(self, x: int, y: int) -> int:
+        """The version of the region holding cell (x, y)
+
+        Args:
+            x (int): column
+            y (int): row
+
+        Returns:
+            int: the region's version
+        """
+        return int(self._regions[y // self._region_size, x // self._region_size])
+
+    def _cell(self, p) -> tuple:
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise ValueError("cell ({}, {}) outside of the grid".format(x, y))
+        return x, y
+
+    def _lookup(self, start: tuple, goal: tuple):
+        entry = self._cache.get((start, goal))
+        if entry is None:
+            return False, None
+        path, regions, versions = entry
+        if regions is None:
+            # a missing path may appear with any change of the grid
+            valid = versions == self._version
+        else:
+            valid = np.array_equal(self._regions.ravel()[regions], versions)
+        if not valid:
+            del self._cache[(start, goal)]
+            return False, None
+        return True, path
+
+    def _store(self, start: tuple, goal: tuple, path: list) -> None:
+        if self._cache_size < 1:
+            return
+        if len(self._cache) >= self._cache_size:
+            # dicts keep their insertion order, so the oldest entry goes
+            del self._cache[next(iter(self._cache))]
+        if path is None:
+            self._cache[(start, goal)] = (None, None, self._version)
+            return
+        cells = np.array(path, dtype=np.int64)
+        rs = self._region_size
+        regions = np.unique((cells[:, 1] // rs) * self._regions.shape[1] + cells[:, 0] // rs)
+        self._cache[(start, goal)] = (path, regions, self._regions.ravel()[regions])
+
+    def _submit(self, r: _Request) -> Future:
+        # called with the lock held, returns the replaced job
+        job = r.job
+        r.version = self._version
+        r.job = self._pool.submit(_solve, r.version, r.start, r.goal)
+        r.job.add_done_callback(lambda j: self._done(r, j))
+        return job
+
+    def _done(self, r: _Request, job: Future) -> None:
+        # runs on the pool's thread, results of replaced jobs are dropped
+        with self._lock:
+            if r.job is not job or r not in self._pending or job.cancelled():
+                return
+            self._finish(r)
+            error = job.exception()
+            if error is None:
+                path = job.result()
+                self._store(r.start, r.goal, path)
+                self._completed.append((r.key, r.start, r.goal, path))
+        try:
+            if error is None:
+                r.future.set_result(path)
+            else:
+                r.future.set_exception(error)
+        except InvalidStateError:
+            # cancelled by the requester in the meantime
+            pass
+
+    def _finish(self, r: _Request) -> None:
+        # called with the lock held
+        self._pending.discard(r)
+        if r.key is not None and self._keys.get(r.key) is r:
+            del self._keys[r.key]
+
+    def _cancelled(self, r: _Request) -> None:
+        if not r.future.cancelled():
+            return
+        with self._lock:
+            self._finish(r)
+        if r.job is not None:
+            r.job.cancel()
+
+    def request(self, start, goal, key=None) -> Future:
+        """Requests a path, never blocks. Cached paths complete immediately.
+
+        Args:
+            start (tuple): the (x, y) start cell
+            goal (tuple): the (x, y) goal cell
+            key (hashable, optional): the requester, e.g. an entity id. A new request cancels the requester's pending one. Defaults to None.
+
+        Raises:
+            ValueError: if start or goal are outside of the grid
+
+        Returns:
+            Future: resolves to the path as list of (x, y) cells from start to goal, or None if the goal cannot be reached
+        """
+        start, goal = self._cell(start), self._cell(goal)
+        r = _Request(key, start, goal)
+        stale = None
+        with self._lock:
+            if key is not None:
+                stale = self._keys.pop(key, None)
+            hit, path = self._lookup(start, goal)
+            if hit:
+                self._completed.append((key, start, goal, path))
+            else:
+                self._pending.add(r)
+                if key is not None:
+                    self._keys[key] = r
+                self._submit(r)
+        if stale is not None:
+            stale.future.cancel()
+        if hit:
+            r.future.set_result(path)
+        else:
+            r.future.add_done_callback(lambda _: self._cancelled(r))
+        return r.future
+
+    def poll(self) -> list:
+        """Collects the requests completed since the last poll, call it once per frame
+
+        Returns:
+            list: list of (key, start, goal, path) tuples, path is None if the goal cannot be reached
+        """
+        with self._lock:
+            completed, self._completed = self._completed, []
+        return completed
+
+    def set_costs(self, x0: int, y0: int, costs) -> None:
+        """Overwrites the costs of a rectangular region. Pending requests are solved again on the changed grid.
+
+        Args:
+            x0 (int): left column of the region
+            y0 (int): top row of the region
+            costs (np.ndarray or float): (h, w) costs of the region or a single cost for a single cell
+
+        Raises:
+            ValueError: if the region is not inside the grid or the costs are not positive
+        """
+        c = np.atleast_2d(np.asarray(costs, dtype=np.float64))
+        h, w = c.shape
+        if not (0 <= x0 and x0 + w <= self._width and 0 <= y0 and y0 + h <= self._height):
+            raise ValueError("region outside of the grid")
+        if np.any(c <= 0.0) or np.any(np.isnan(c)):
+            raise ValueError("costs have to be positive")
+
+        rs = self._region_size
+        with self._lock:
+            # bump the version before writing, workers may read the grid at any time
+            self._version += 1
+            self._regions[y0 // rs : (y0 + h - 1) // rs + 1, x0 // rs : (x0 + w - 1) // rs + 1] += 1
+            self._costs[y0 : y0 + h, x0 : x0 + w] = c
+            replaced = [self._submit(r) for r in self._pending]
+        for job in replaced:
+            job.cancel()
+
+    def close(self) -> None:
+        """Stops the workers, cancels the pending requests and frees the shared grid"""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+            self._keys.clear()
+        for r in pending:
+            r.future.cancel()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._costs = None
+        self._shm.close()
+        self._shm.unlink()
@@ -1,8 +1,11 @@
+from math import cos, radians, sin
+
+import numpy as np
+
 from elisa.linalg import (
     Vec2,
     zero2,
     zero3,
-    eye3,
     eye2,
     one2,
     one3,
@@ -58,12 +61,15 @@ class Camera2D(object):
         self._vp_xrange = self._vp_xmax - self._vp_xmin
         self._vp_yrange = self._vp_ymax - self._vp_ymin
 
-        # the individual camera components for translation, rotation and scaling
-        self._m_rot = eye3
-        self._m_scale = eye3
-        self._m_trans = eye3
+        # the individual camera components for translation, rotation (degrees) and scaling
+        self._tx, self._ty = 0.0, 0.0
+        self._alpha_deg = 0.0
+        self._sx, self._sy = 1.0, 1.0
         # the final matrix
-        self._ws = eye3
+        self._ws = Mat3(1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+        # the combined matrices local -> clip and local -> viewport, rebuilt lazily whenever _ws changes
+        self._ws_nc = None
+        self._ws_vp = None
 
         a = self._nc_xrange / self._ws_xrange
         b = -a * self._ws_xmin + self._nc_xmin
@@ -92,12 +98,58 @@ class Camera2D(object):
 
     @mat_ws.setter
     def mat_ws(self, v: Mat3):
+        if v is None:
+            raise ValueError("matrix not provided")
+        if v._v == self._ws._v:
+            return
         self._ws = v
+        self._ws_nc = None
+        self._ws_vp = None
+
+    @property
+    def mat_ws_nc(self) -> Mat3:
+        """Returns the combined transformation from local object space into normalized clip space
+
+        Returns:
+                        Mat3: the matrix nc * ws
+        """
+        if self._ws_nc is None:
+            self._ws_nc = self._nc * self._ws
+        return self._ws_nc
+
+    @property
+    def mat_ws_vp(self) -> Mat3:
+        """Returns the combined transformation from local object space into viewport space
+
+        Returns:
+                        Mat3: the matrix vp * nc * ws
+        """
+        if self._ws_vp is None:
+            self._ws_vp = self._vp * self.mat_ws_nc
+        return self._ws_vp
 
     def _update_ws(self) -> None:
-        """Combine the individual transformation matrices (scale, rotate, translate) into the one world-space transformation matrix"""
-        # apply scaling then rotation then translation
-        self._ws = (self._m_scale * self._m_rot) * self._m_trans
+        """Combine the individual transformations (scale, rotate, translate) into the one world-space transformation matrix"""
+        # apply scaling then rotation then translation, i.e. (S * R) * T written out
+        sx, sy, tx, ty = self._sx, self._sy, self._tx, self._ty
+        if self._alpha_deg == 0.0:
+            ca, sa = 1.0, 0.0
+        else:
+            alpha_rad = radians(self._alpha_deg)
+            ca, sa = cos(alpha_rad), sin(alpha_rad)
+        self._ws = Mat3(
+            sx * ca,
+            -sx * sa,
+            sx * (ca * tx - sa * ty),
+            sy * sa,
+            sy * ca,
+            sy * (sa * tx + ca * ty),
+            0.0,
+            0.0,
+            1.0,
+        )
+        self._ws_nc = None
+        self._ws_vp = None
 
     def translate(self, p: Point2) -> None:
         """Translate the camera to a point p
@@ -110,24 +162,24 @@ class Camera2D(object):
         """
         if not p:
             raise ValueError("p? point to translate to not provided: {}".format(p))
-        if Point2.is_zero(p):
-            return None
 
-        _update = False
-        if self._m_trans[2] != p.x:
-            self._m_trans[2] = p.x
-            _update = True
+        if self._tx != p[0] or self._ty != p[1]:
+            self._tx, self._ty = p[0], p[1]
+            self._update_ws()
 
-        if self._m_trans[5] != p.y:
-            self._m_trans[5] = p.y
-            _update = True
+    def rotate(self, alpha_deg: float) -> None:
+        """Rotate the camera to an angle of alpha_deg degrees (counter-clockwise around the origin)
 
-        if _update:
-            self._update_ws()
+        Args:
+                        alpha_deg (float): rotation angle in degrees
+        """
+        if alpha_deg is None:
+            raise ValueError("alpha_deg not provided")
 
-    def rotate(self, alpha_deg: float):
-        # TODO: camera2D - rotate
-        raise ValueError("TODO: rotation")
+        alpha_deg = alpha_deg % 360.0
+        if self._alpha_deg != alpha_deg:
+            self._alpha_deg = alpha_deg
+            self._update_ws()
 
     def scale(self, sx: float, sy: float) -> None:
         """Scale the current camera viewing field by some x and y amount.
@@ -139,11 +191,9 @@ class Camera2D(object):
         Returns:
                         [type]: [description]
         """
-        if sx == 1.0 and sy == 1.0:
-            return None
-
-        self._m_scale[0] = sx
-        self._m_scale[4] = sy
+        if self._sx != sx or self._sy != sy:
+            self._sx, self._sy = sx, sy
+            self._update_ws()
 
     @property
     def position(self) -> tuple:
@@ -152,12 +202,16 @@ class Camera2D(object):
         Returns:
                         tuple: 2-tuple where the first and 2nd component refer to the x and y position of the translated camera
         """
-        return (self._m_trans[2], self._m_trans[5])
+        return (self._tx, self._ty)
 
     @property
-    def rotation_angle(self):
-        # TODO: rotation_angle
-        raise ValueError("Todo")
+    def rotation_angle(self) -> float:
+        """Returns the camera's current rotation in degrees
+
+        Returns:
+                        float: rotation angle in [0, 360)
+        """
+        return self._alpha_deg
 
     @property
     def scaling(self) -> tuple:
@@ -166,7 +220,7 @@ class Camera2D(object):
         Returns:
                         tuple: 2-tuple where the first and 2nd component refer to the x and y scaling components of the camera
         """
-        return (self._m_scale[0], self._m_scale[4])
+        return (self._sx, self._sy)
 
     def clip(self, x):
         # TODO: clip
@@ -259,3 +313,72 @@ class Camera2D(object):
 
         projected = self._vp * p
         return Point2(projected.x, projected.y)
+
+    def project(self, x) -> Point2:
+        """Projects a point from its local coordinate system directly into viewport space using the cached combined matrix.
+        This is equivalent to project_vp(project_nc(project_ws(x))) but performs a single matrix application.
+
+        Args:
+                        x (tuple/Point2/Vec2): the point in local object space that we wish to transform
+
+        Raises:
+                        ValueError: no point provided.
+
+        Returns:
+                        Point2: the point in viewport space
+        """
+        if x is None:
+            raise ValueError("Missing point")
+
+        if isinstance(x, Point3):
+            projected = self.mat_ws_vp * x
+            return Point2(projected.x, projected.y)
+        if isinstance(x, (tuple, Vec2)):
+            px, py = x[0], x[1]
+        else:
+            raise ValueError("Undefined type provided: {}".format(type(x)))
+
+        a, b, c, d, e, f, _, _, _ = self.mat_ws_vp._v
+        return Point2(a * px + b * py + c, d * px + e * py + f)
+
+    def is_visible_many(self, nc_points) -> np.ndarray:
+        """Vectorized form of is_visible, tests which of the points in normalized clip space lie inside the clip rectangle.
+
+        Args:
+                        nc_points (np.ndarray): (N, 2) array of points in normalized clip space, e.g. from project_many(..., space="nc")
+
+        Returns:
+                        np.ndarray: boolean mask of length N
+        """
+        if nc_points is None:
+            raise ValueError("no points provided")
+        return np.all(np.abs(nc_points) <= 1.0, axis=1)
+
+    def project_many(self, points, space: str = "vp", out: np.ndarray = None) -> np.ndarray:
+        """Projects many points from their local coordinate system at once. The points are pushed through the
+        combined matrix of all stages up to the requested space in one vectorized call.
+
+        Args:
+                        points (np.ndarray, Vec2Array, list): (N, 2) array, Vec2Array or list of Point2/ tuples in local object space
+                        space (str, optional): target space, one of "ws" (world), "nc" (normalized clip) or "vp" (viewport). Defaults to "vp".
+                        out (np.ndarray, optional): (N, 2) float array receiving the result. Defaults to None.
+
+        Raises:
+                        ValueError: if the points are not provided or the space is unknown.
+
+        Returns:
+                        np.ndarray: (N, 2) array of projected points, which can directly be passed to pygame.draw.polygon
+        """
+        if points is None:
+            raise ValueError("points not provided")
+
+        if space == "ws":
+            m = self._ws
+        elif space == "nc":
+            m = self.mat_ws_nc
+        elif space == "vp":
+            m = self.mat_ws_vp
+        else:
+            raise ValueError("Undefined space provided: {}".format(space))
+
+        return m.transform_points(points, out=out)
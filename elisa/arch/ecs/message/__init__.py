@@ -1 +1 @@
-from .message import ClockMessage, Message
+from .message import ClockMessage, CollisionMessage, Message
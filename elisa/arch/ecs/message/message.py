@@ -21,6 +21,24 @@ class Message(ECSBase):
         """
         return self._message_type
 
+    @property
+    def sender(self):
+        """Returns the message's sender
+
+        Returns:
+                        the sender of the message, None if not provided
+        """
+        return self._sender
+
+    @property
+    def receiver(self):
+        """Returns the message's receiver
+
+        Returns:
+                        the receiver of the message, None if not provided
+        """
+        return self._receiver
+
     def __repr__(self) -> str:
         return f"[Message/ {self._message_type}]: {self._id}"
 
@@ -59,3 +77,39 @@ class ClockMessage(Message):
 
     def __str__(self) -> str:
         return self.__repr__()
+
+
+class CollisionMessage(Message):
+    """Notifies an entity about a contact with another entity. The phase is one of "Begin", "Persist" or "End",
+    the message type is the phase prefixed with "Collision".
+    """
+
+    PHASES = ("Begin", "Persist", "End")
+
+    def __init__(self, phase: str, other, manifold=None, **kwargs):
+        if phase not in CollisionMessage.PHASES:
+            raise ValueError("phase has to be one of {}".format(CollisionMessage.PHASES))
+        super(CollisionMessage, self).__init__("Collision" + phase, **kwargs)
+        self._phase = phase
+        self._other = other
+        self._manifold = manifold
+
+    @property
+    def phase(self) -> str:
+        return self._phase
+
+    @property
+    def other(self):
+        """The id of the entity collided with"""
+        return self._other
+
+    @property
+    def manifold(self):
+        """The contact manifold of the narrow phase or None if no narrow phase was run (always None for the End phase)"""
+        return self._manifold
+
+    def __repr__(self) -> str:
+        return f"[Message/{self._message_type} ({self._id})]: {self._receiver} - {self._other}"
+
+    def __str__(self) -> str:
+        return self.__repr__()
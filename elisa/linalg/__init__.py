@@ -4,8 +4,17 @@ from .mat2 import Mat2, eye2, one2, zero2
 from .mat3 import Mat3, eye3, one3, translate2D, zero3
 from .plane2 import Plane2
 from .ray2 import Ray2
-from .vec import Vec, cov, mean, sd, var
+from .sat2 import (
+    Manifold2,
+    collide2,
+    collide2_pairs,
+    collide_circle2,
+    collide_poly2,
+    collide_poly2_circle2,
+)
+from .vec import Vec, VecN, cov, mean, sd, var
 from .vec2 import Point2, Vec2
+from .vec2array import Point2Array, Vec2Array
 from .vec3 import Point3, Vec3
 
 from .linalg import (
@@ -20,9 +29,27 @@ from .linalg import (
 
 from .intersection import (
     area_of_intersection_AABB2,
+    circles_to_arrays,
+    convex_polys_to_arrays,
     inside_circle2,
+    inside_circle2_many,
+    inside_convex_poly2_many,
+    inside_poly2_many,
     inside_rect2,
+    inside_rect2_many,
     inside_square2,
+    inside_triangle2,
+    inside_triangle2_many,
     intersection2,
+    intersect_rays_planes,
     intersects_AABB2,
+    intersects_AABB2_many,
+    overlapping_AABB2_pairs,
+    planes_to_arrays,
+    point_in_circles2,
+    point_in_convex_polys2,
+    point_in_rects2,
+    point_in_triangles2,
+    rects_to_bounds,
+    triangles_to_arrays,
 )
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import math
+
+import numpy as np
+
 from .linalg import is_numeric
 from .mat2 import Mat2
+from .mat3 import Mat3
 from .ray2 import Ray2
 from .vec2 import Point2, Vec2
 
@@ -9,46 +14,70 @@ from .vec2 import Point2, Vec2
 
 
 class Poly2(object):
-    """A 2-dimensional polygon object"""
+    """A 2-dimensional polygon object
+
+    The points are kept in one contiguous (N, 2) array, so that the polygon can be translated, rotated and scaled in place.
+    The point list, edges, edge normals and the axis aligned bounding box are derived from that array on first access
+    and cached until the next transformation.
+    """
 
-    def __init__(self, points: list):
+    def __init__(self, points):
         """Create a 2-dimensional polygonal object from a list of 2-dimensional points.
 
         Args:
-                        points (list): list of tuples of numerics or point2 instances from which the polygon is to be initialized
+                        points (list or np.ndarray): list of tuples of numerics or point2 instances, or an (N, 2) array
+                        from which the polygon is to be initialized
 
         Raises:
                         ValueError: if list does not contain tuple of numerics or tuple of point2 instances
         """
         super(Poly2, self).__init__()
-        self._points = []
-        self._edges = []
-        if points and len(points) > 0:
-            for p in points:
-                if isinstance(p, Point2):
-                    self._points.append(p)
-                elif isinstance(p, tuple) and len(p) == 2 and is_numeric(p):
-                    self._points.append(Point2(p))
-                else:
-                    raise ValueError("p is not a point2 or tuple")
-
-        _len = len(self._points)
-        for _pidx in range(len(self._points)):
-            _next_p_idx = (_pidx + 1) % _len
-            pi = self._points[_pidx]
-            pj = self._points[_next_p_idx]
-            self._edges.append(pj - pi)
+        if isinstance(points, np.ndarray):
+            _v = np.array(points, dtype=np.float64).reshape(-1, 2)
+        else:
+            _v = []
+            if points and len(points) > 0:
+                for p in points:
+                    if isinstance(p, Point2):
+                        _v.append((p.x, p.y))
+                    elif isinstance(p, tuple) and len(p) == 2 and is_numeric(p):
+                        _v.append(p)
+                    else:
+                        raise ValueError("p is not a point2 or tuple")
+            _v = np.array(_v, dtype=np.float64).reshape(-1, 2)
+
+        self._v = _v
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        # drop everything derived from the points, it is rebuilt lazily
+        self._points = None
+        self._edges = None
+        self._normals = None
+        self._aabb = None
 
     def __iter__(self):
-        return self._points.__iter__()
+        return self.points.__iter__()
 
     def __len__(self):
-        return self._points.__len__()
+        return self._v.shape[0]
 
     @property
     def points(self) -> list:
+        if self._points is None:
+            self._points = [Point2(x, y) for x, y in self._v.tolist()]
         return self._points
 
+    @property
+    def vertices(self) -> np.ndarray:
+        """The (N, 2) array of polygon points. Modify the points through the transformation methods only,
+        as writing into the array directly bypasses the cache invalidation.
+
+        Returns:
+            np.ndarray: (N, 2) array of points
+        """
+        return self._v
+
     @staticmethod
     def translate(poly, x: float, y: float) -> Poly2:
         if not poly:
@@ -57,52 +86,158 @@ class Poly2(object):
         if x == 0.0 and y == 0.0:
             return poly
 
-        tv = Vec2(x, y)
+        return Poly2(points=poly.vertices + (x, y))
 
-        new_points = poly.points.copy()
+    def translate_ip(self, x: float, y: float) -> Poly2:
+        """Translates the polygon in place
 
-        for i in range(len(new_points)):
-            new_points[i] = new_points[i] + tv
+        Args:
+            x (float): displacement along x
+            y (float): displacement along y
 
-        return Poly2(points=new_points)
+        Returns:
+            Poly2: this instance
+        """
+        if x == 0.0 and y == 0.0:
+            return self
+
+        self._v += (x, y)
+        if self._aabb is not None:
+            # a translation shifts the box, edges and normals remain as they are
+            minx, miny, maxx, maxy = self._aabb
+            self._aabb = (minx + x, miny + y, maxx + x, maxy + y)
+        self._points = None
+        return self
+
+    def _pivot(self, pivot) -> tuple:
+        if pivot is None:
+            cx, cy = self._v.mean(axis=0).tolist()
+            return cx, cy
+        return pivot[0], pivot[1]
+
+    def rotate_ip(self, alpha_deg: float, pivot=None) -> Poly2:
+        """Rotates the polygon in place by alpha_deg degrees around the pivot point
+
+        Args:
+            alpha_deg (float): rotation angle in degrees
+            pivot (Point2 or tuple, optional): center of the rotation. Defaults to None, the mean of the polygon's points.
+
+        Returns:
+            Poly2: this instance
+        """
+        if alpha_deg == 0.0 or len(self) == 0:
+            return self
+
+        alpha_rad = math.radians(alpha_deg)
+        ca, sa = math.cos(alpha_rad), math.sin(alpha_rad)
+        cx, cy = self._pivot(pivot)
+        self._v -= (cx, cy)
+        self._v @= np.array([[ca, sa], [-sa, ca]])
+        self._v += (cx, cy)
+        self._invalidate()
+        return self
+
+    def scale_ip(self, sx: float, sy: float = None, pivot=None) -> Poly2:
+        """Scales the polygon in place relative to the pivot point
+
+        Args:
+            sx (float): scaling along x
+            sy (float, optional): scaling along y. Defaults to None, i.e. uniform scaling by sx.
+            pivot (Point2 or tuple, optional): fix point of the scaling. Defaults to None, the mean of the polygon's points.
+
+        Returns:
+            Poly2: this instance
+        """
+        sy = sx if sy is None else sy
+        if (sx == 1.0 and sy == 1.0) or len(self) == 0:
+            return self
+
+        cx, cy = self._pivot(pivot)
+        self._v -= (cx, cy)
+        self._v *= (sx, sy)
+        self._v += (cx, cy)
+        self._invalidate()
+        return self
+
+    def transform_ip(self, m: Mat3) -> Poly2:
+        """Transforms the polygon points in place by the homogeneous 3x3 transformation matrix m
+
+        Args:
+            m (Mat3): the transformation
+
+        Returns:
+            Poly2: this instance
+        """
+        if not m:
+            raise ValueError("m not provided")
+
+        m.transform_points(self._v, out=self._v)
+        self._invalidate()
+        return self
 
     @property
     def edges(self) -> list:
+        if self._edges is None:
+            e = np.roll(self._v, -1, axis=0) - self._v
+            self._edges = [Vec2(x, y) for x, y in e.tolist()]
         return self._edges
 
+    @property
+    def edge_normals(self) -> np.ndarray:
+        """The (N, 2) array of unit normals of the polygon edges, the i-th normal belonging to the edge from point i to point i + 1.
+        The normals point outwards independent of the winding order, i.e. for a convex polygon a point p is inside
+        if the dot product of every normal with p - point i is not positive.
+
+        Returns:
+            np.ndarray: (N, 2) array of outward edge normals
+        """
+        if self._normals is None:
+            e = np.roll(self._v, -1, axis=0) - self._v
+            n = np.stack((e[:, 1], -e[:, 0]), axis=1)
+            area2 = np.sum(self._v[:, 0] * e[:, 1] - self._v[:, 1] * e[:, 0])
+            if area2 < 0:
+                n = -n
+            mag = np.hypot(n[:, 0], n[:, 1])
+            mag[mag == 0.0] = 1.0
+            n /= mag[:, np.newaxis]
+            self._normals = n
+        return self._normals
+
     def __add__(self, v) -> Poly2:
         if not v:
             raise ValueError("v not provided")
 
         _displace = Vec2(v)
-        _p = self._points.copy()
+        return Poly2(self._v + (_displace.x, _displace.y))
 
-        for i in range(len(_p)):
-            _p[i] = _p[i] + _displace
+    def __sub__(self, v) -> Poly2:
+        if not v:
+            raise ValueError("v not provided")
 
-        return Poly2(_p)
+        _displace = Vec2(v)
+        return Poly2(self._v - (_displace.x, _displace.y))
 
-    def __sub__(self, v) -> Poly2:
+    def __iadd__(self, v) -> Poly2:
         if not v:
             raise ValueError("v not provided")
 
         _displace = Vec2(v)
-        _p = self._points.copy()
+        return self.translate_ip(_displace.x, _displace.y)
 
-        for i in range(len(_p)):
-            _p[i] = _p[i] - _displace
+    def __isub__(self, v) -> Poly2:
+        if not v:
+            raise ValueError("v not provided")
 
-        return Poly2(_p)
+        _displace = Vec2(v)
+        return self.translate_ip(-_displace.x, -_displace.y)
 
     @property
     def AABB(self) -> tuple:
-        # TODO: this can be optimized, but for now sufficient
-        x = [p.x for p in self._points]
-        y = [p.y for p in self._points]
-        minx, miny = min(x), min(y)
-        maxx, maxy = max(x), max(y)
-
-        return (minx, miny, maxx, maxy)
+        if self._aabb is None:
+            minx, miny = self._v.min(axis=0).tolist()
+            maxx, maxy = self._v.max(axis=0).tolist()
+            self._aabb = (minx, miny, maxx, maxy)
+        return self._aabb
 
 
 # Circle is not a Poly per se, but nonetheless
@@ -113,7 +248,7 @@ class Circle2(Poly2):
 
     @property
     def center(self) -> Point2:
-        return self._points[0]
+        return self.points[0]
 
     @property
     def radius(self) -> float:
@@ -121,15 +256,45 @@ class Circle2(Poly2):
 
     @property
     def center_x(self) -> float:
-        return self._points[0].x
+        return float(self._v[0, 0])
 
     @property
     def center_y(self) -> float:
-        return self._points[0].y
+        return float(self._v[0, 1])
+
+    @property
+    def AABB(self) -> tuple:
+        if self._aabb is None:
+            cx, cy = self._v[0].tolist()
+            r = self._radius
+            self._aabb = (cx - r, cy - r, cx + r, cy + r)
+        return self._aabb
+
+    def scale_ip(self, sx: float, sy: float = None, pivot=None) -> Circle2:
+        """Scales the circle in place. Only uniform scaling keeps a circle a circle, so sy has to equal sx if provided.
+
+        Args:
+            sx (float): scaling of the radius
+            sy (float, optional): has to be None or equal to sx. Defaults to None.
+            pivot (Point2 or tuple, optional): fix point of the scaling. Defaults to None, the center of the circle.
+
+        Raises:
+            ValueError: if a non-uniform scaling is requested
+
+        Returns:
+            Circle2: this instance
+        """
+        if sy is not None and sy != sx:
+            raise ValueError("a circle can only be scaled uniformly")
+
+        super(Circle2, self).scale_ip(sx, sx, pivot)
+        self._radius *= abs(sx)
+        self._aabb = None
+        return self
 
     def __repr__(self):
         return "Circle({}^2 + {}^2 = {}^2)".format(
-            self._points[0].x, self._points[0].y, self._radius
+            self.center_x, self.center_y, self._radius
         )
 
     def __eq__(self, o: object) -> bool:
@@ -153,40 +318,32 @@ class Tri2(Poly2):
                         p2 (Point2 or 2D numerical tuple): third point
         """
         super(Tri2, self).__init__([p0, p1, p2])
-        self._p0 = (p0,)
-        self._p1 = p1
-        self._p2 = p2
-        self._edge0 = p1 - p0
-        self._edge1 = p2 - p1
-        self._edge2 = p0 - p2
-        self._r0 = Ray2(p0, self._edge0)
-        self._r1 = Ray2(p1, self._edge1)
-        self._r2 = Ray2(p2, self._edge2)
 
     @property
     def edge0(self):
-        return self._edge0
+        return self.edges[0]
 
     @property
     def edge1(self):
-        return self._edge1
+        return self.edges[1]
 
     @property
     def edge2(self):
-        return self._edge2
+        return self.edges[2]
 
     @staticmethod
     def intersect_ray(r: Ray2):
         raise ValueError("Not Implemented")
 
     def __iter__(self):
-        return self._points.__iter__()
+        return self.points.__iter__()
 
     def __getitem__(self, i: int) -> Point2:
-        return self._points.__getitem__(i)
+        return self.points.__getitem__(i)
 
     def inside(self, p: Point2) -> bool:
         """Determines if the point p lies inside or on the edge of the triangle by performing a half-space test of the point against the individual triangle edges.
+        The triangle may be given in either winding order.
 
         Args:
                         p (Point2): point to test
@@ -194,52 +351,45 @@ class Tri2(Poly2):
         Returns:
                         bool: True if the point lies inside the triangle or on the it's edges, else False.
         """
-        hs0 = self._r0.half_space(p)
-        hs1 = self._r1.half_space(p)
-        hs2 = self._r2.half_space(p)
+        if not p:
+            raise ValueError("p not provided")
 
-        return hs0 <= 0 and hs1 <= 0 and hs2 <= 0
+        # the edge normals point outwards, so p is inside if it lies behind all three edges
+        px, py = p.x, p.y
+        for (ox, oy), (nx, ny) in zip(self._v.tolist(), self.edge_normals.tolist()):
+            if nx * (px - ox) + ny * (py - oy) > 0.0:
+                return False
+        return True
 
     @property
     def x0(self) -> Point2:
-        return self._points[0]
+        return self.points[0]
 
     @property
     def x1(self) -> Point2:
-        return self._points[1]
+        return self.points[1]
 
     @property
     def x2(self) -> Point2:
-        return self._points[2]
+        return self.points[2]
 
     @property
     def e0(self) -> Vec2:
-        return self._points[1] - self._points[0]
+        return self.edges[0]
 
     @property
     def e1(self) -> Vec2:
-        return self._points[2] - self._points[1]
+        return self.edges[1]
 
     @property
     def e2(self) -> Vec2:
-        return self._points[0] - self._points[2]
+        return self.edges[2]
 
     def bounding_rect(self) -> tuple:
-        minx, miny = min([self.x0.x, self.x1.x, self.x2.x]), min(
-            [self.x0.y, self.x1.y, self.x2.y]
-        )
-        maxx, maxy = max([self.x0.x, self.x1.x, self.x2.x]), max(
-            [self.x0.y, self.x1.y, self.x2.y]
-        )
-
-        return (minx, miny, maxx, maxy)
-
-    @property
-    def AABB(self) -> tuple:
-        return self.bounding_rect()
+        return self.AABB
 
     def __repr__(self) -> str:
-        return "Tri2: {}, {}, {}".format(self._p0, self._p1, self._p2)
+        return "Tri2: {}, {}, {}".format(*self.points)
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -248,7 +398,7 @@ class Tri2(Poly2):
         return (
             isinstance(o, Poly2)
             and len(o.points) == len(self.points)
-            and all([self[i] == o[i] for i in range(len(self._points))])
+            and all([self[i] == o[i] for i in range(len(self))])
         )
 
 
@@ -266,20 +416,6 @@ class Rect2(Poly2):
         """
         # TODO: ensure proper order/ clockwise
         super(Rect2, self).__init__([p0, p1, p2, p3])
-        self._p0 = p0
-        self._p1 = p1
-        self._p2 = p2
-        self._p3 = p3
-        self._edge0 = self._edges[0]
-        self._edge1 = self._edges[1]
-        self._edge2 = self._edges[2]
-        self._edge3 = self._edges[3]
-        self._r0 = Ray2(p0, self._edge0)
-        self._r1 = Ray2(p1, self._edge1)
-        self._r2 = Ray2(p2, self._edge2)
-        self._r3 = Ray2(p2, self._edge3)
-        self._w = self._p2.x - self._p0.x
-        self._h = self._p2.y - self._p0.y
 
     @property
     def width(self) -> float:
@@ -288,7 +424,7 @@ class Rect2(Poly2):
         Returns:
             float: width
         """
-        return self._w
+        return float(self._v[2, 0] - self._v[0, 0])
 
     @property
     def height(self) -> float:
@@ -297,23 +433,23 @@ class Rect2(Poly2):
         Returns:
             float: height
         """
-        return self._h
+        return float(self._v[2, 1] - self._v[0, 1])
 
     @property
     def edge0(self):
-        return self._edge0
+        return self.edges[0]
 
     @property
     def edge1(self):
-        return self._edge1
+        return self.edges[1]
 
     @property
     def edge2(self):
-        return self._edge2
+        return self.edges[2]
 
     @property
     def edge3(self):
-        return self._edge3
+        return self.edges[3]
 
     @staticmethod
     def intersect_ray(self, r: Ray2):
@@ -327,16 +463,7 @@ class Rect2(Poly2):
         Returns:
             tuple: four tuple of the minimum and maximum coordinates respectively.
         """
-        # TODO: this can be optimized, such that it is computed initially and
-        # cashed until the points are transformed
-        minx, miny = min([self.x0.x, self.x1.x, self.x2.x, self.x3.x]), min(
-            [self.x0.y, self.x1.y, self.x2.y, self.x3.y]
-        )
-        maxx, maxy = max([self.x0.x, self.x1.x, self.x2.x, self.x3.x]), max(
-            [self.x0.y, self.x1.y, self.x2.y, self.x3.y]
-        )
-
-        return minx, miny, maxx, maxy
+        return self.AABB
 
     def inside(self, p) -> bool:
         """Determines wether a single point (Point2 or x,y tuple) or a list of points is fully located inside this Rect2 instance.
@@ -354,37 +481,39 @@ class Rect2(Poly2):
             raise ValueError("p not provided")
 
         if isinstance(p, Poly2):
-            return self.inside(p.points)
+            xmin, ymin, xmax, ymax = self.AABB
+            pxmin, pymin, pxmax, pymax = p.AABB
+            return pxmin >= xmin and pxmax <= xmax and pymin >= ymin and pymax <= ymax
         if isinstance(p, list):
             point_list = p
             tests = [self.inside(_p) for _p in point_list]
             return all(tests)
         else:
             _p: Point2 = Point2(p)
-            xmin, ymin, xmax, ymax = self.bounding_rect
+            xmin, ymin, xmax, ymax = self.AABB
             return _p.x >= xmin and _p.x <= xmax and _p.y >= ymin and _p.y <= ymax
 
     def __repr__(self) -> str:
-        return "Rect2: {}, {}, {}, {}".format(self._p0, self._p1, self._p2, self._p3)
+        return "Rect2: {}, {}, {}, {}".format(*self.points)
 
     def __str__(self) -> str:
         return self.__repr__()
 
     @property
     def x0(self) -> Point2:
-        return self._points[0]
+        return self.points[0]
 
     @property
     def x1(self) -> Point2:
-        return self._points[1]
+        return self.points[1]
 
     @property
     def x2(self) -> Point2:
-        return self._points[2]
+        return self.points[2]
 
     @property
     def x3(self) -> Point2:
-        return self._points[3]
+        return self.points[3]
 
     def as_p_wh(self) -> tuple:
         """Returns the Rect2 in the format (x, y, w, h). This is suitable for pygame
@@ -395,7 +524,7 @@ class Rect2(Poly2):
         return (self.x0.x, self.x0.y, self.x2.x - self.x0.x, self.x2.y - self.x0.y)
 
     def __getitem__(self, i: int) -> Point2:
-        return self._points.__getitem__(i)
+        return self.points.__getitem__(i)
 
     def __eq__(self, o: object) -> bool:
         return (
@@ -1,7 +1,10 @@
+import numpy as np
+
 from .ray2 import Ray2
 from .plane2 import Plane2
 from .vec2 import Vec2, Point2
-from .geom2 import Tri2, Rect2
+from .vec2array import as_points_array
+from .geom2 import Circle2, Poly2, Tri2, Rect2
 
 
 def intersection2(ray: Ray2, plane: Plane2):
@@ -32,6 +35,101 @@ def intersection2(ray: Ray2, plane: Plane2):
     return intersects, t, pos
 
 
+def planes_to_arrays(planes: list) -> tuple:
+    """Turns a list of Plane2 instances into the array form used by intersect_rays_planes.
+
+    Args:
+                    planes (list): list of Plane2
+
+    Returns:
+                    tuple: (M, 2) array of plane normals and (M,) array of plane offsets w
+    """
+    if planes is None:
+        raise ValueError("planes not provided")
+    normals = np.array([pl.normal.to_tuple() for pl in planes], dtype=np.float64).reshape(-1, 2)
+    ws = np.array([pl.w for pl in planes], dtype=np.float64)
+    return normals, ws
+
+
+def intersect_rays_planes(
+    origins,
+    dirs,
+    normals,
+    ws,
+    max_t: float = None,
+    bounds=None,
+    eps: float = 1e-9,
+) -> tuple:
+    """Intersects N rays with M planes (normal * x = w) at once and returns the nearest hit per ray. This is the batch form of
+    intersection2, with the difference that the ray directions are not normalized, i.e. t is measured in multiples of the
+    respective direction vector. A ray hits a plane if it is not parallel to the plane, 0 <= t (<= max_t) and, if bounds are given,
+    the point of intersection lies inside the bounds of that plane.
+
+    Args:
+                    origins (np.ndarray, Point2): (N, 2) ray origins or a single origin shared by all rays
+                    dirs (np.ndarray, Vec2Array, list): (N, 2) ray directions
+                    normals (np.ndarray): (M, 2) plane normals, see planes_to_arrays
+                    ws (np.ndarray): (M,) plane offsets
+                    max_t (float, optional): largest accepted ray parameter, e.g. 1 to clip the rays at origin + dir. Defaults to None.
+                    bounds (np.ndarray, optional): (M, 4) rect (xmin, ymin, xmax, ymax) per plane, hits outside of it are discarded.
+                    Using the bounds of a face segment or of the owning box replaces a separate inside test. Defaults to None.
+                    eps (float, optional): tolerance of the parallel and bounds tests. Defaults to 1e-9.
+
+    Returns:
+                    tuple: (N,) array of nearest t (inf if no hit), (N,) array of the index of the hit plane (-1 if no hit) and
+                    (N, 2) array of the hit points (nan if no hit)
+    """
+    d = as_points_array(dirs)
+    if isinstance(origins, Vec2):
+        o = np.array(origins.to_tuple(), dtype=np.float64)[np.newaxis, :]
+    else:
+        o = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    n = np.asarray(normals, dtype=np.float64).reshape(-1, 2)
+    w = np.asarray(ws, dtype=np.float64).reshape(-1)
+
+    if n.shape[0] != w.shape[0]:
+        raise ValueError("normals and ws need to have the same length")
+
+    no_rays = d.shape[0]
+    if n.shape[0] == 0 or no_rays == 0:
+        return (
+            np.full(no_rays, np.inf),
+            np.full(no_rays, -1, dtype=np.intp),
+            np.full((no_rays, 2), np.nan),
+        )
+
+    # (N, M) matrices of n * d and n * o
+    d_n_rd = d @ n.T
+    d_n_rp = o @ n.T
+    parallel = np.abs(d_n_rd) <= eps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (w[np.newaxis, :] - d_n_rp) / np.where(parallel, 1.0, d_n_rd)
+
+    valid = ~parallel & (t >= 0.0)
+    if max_t is not None:
+        valid &= t <= max_t
+
+    if bounds is not None:
+        b = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        hx = o[:, 0:1] + t * d[:, 0:1]
+        hy = o[:, 1:2] + t * d[:, 1:2]
+        valid &= (
+            (hx >= b[:, 0] - eps)
+            & (hx <= b[:, 2] + eps)
+            & (hy >= b[:, 1] - eps)
+            & (hy <= b[:, 3] + eps)
+        )
+
+    t = np.where(valid, t, np.inf)
+    index = np.argmin(t, axis=1)
+    t_min = t[np.arange(no_rays), index]
+    hit = np.isfinite(t_min)
+    index = np.where(hit, index, -1)
+    t_hit = np.where(hit, t_min, 0.0)
+    points = np.where(hit[:, np.newaxis], o + d * t_hit[:, np.newaxis], np.nan)
+    return t_min, index, points
+
+
 def inside_rect2(rleftx: float, rlefty: float, w: float, h: float, p: Point2) -> bool:
     """Check if the point p is contained within the rect defined by left upper point (rleftx, rlefty) and
     tracing out the edges with width and height
@@ -59,13 +157,35 @@ def inside_square2(rleftx: float, rlefty: float, w: float, p: Point2) -> bool:
     return inside_rect2(rleftx, rlefty, w, w, p)
 
 
-def inside_circle2(rleftx: float, rlefty: float, r: float, p: Point2) -> bool:
-    # TODO: inside_circle2
-    raise ValueError("Todo")
+def inside_circle2(cx: float, cy: float, r: float, p: Point2) -> bool:
+    """Check if the point p is contained within or on the circle of radius r around the center (cx, cy)
+
+    Args:
+                    cx (float): x coordinate of the circle center
+                    cy (float): y coordinate of the circle center
+                    r (float): radius of the circle
+                    p (Point2): point to check for containment
+
+    Returns:
+                    bool: True if the point is contained inside of the circle
+    """
+    dx = p.x - cx
+    dy = p.y - cy
+    return dx * dx + dy * dy <= r * r
 
 
 def inside_triangle2(p0x, p0y, p1x, p1y, p2x, p2y, p: Point2) -> bool:
-    return Tri2(Point2(p0x, p0y), Point2(p1x, p1y), Point2(p2x, p2y)).inside(p)
+    """Check if the point p is contained within or on the edges of the triangle p0, p1, p2 (in either winding order)
+
+    Returns:
+                    bool: True if the point is contained inside of the triangle
+    """
+    px, py = p.x, p.y
+    # the sign of the cross product of edge and point tells on which side of the edge the point lies
+    hs0 = (p1x - p0x) * (py - p0y) - (p1y - p0y) * (px - p0x)
+    hs1 = (p2x - p1x) * (py - p1y) - (p2y - p1y) * (px - p1x)
+    hs2 = (p0x - p2x) * (py - p2y) - (p0y - p2y) * (px - p2x)
+    return (hs0 <= 0 and hs1 <= 0 and hs2 <= 0) or (hs0 >= 0 and hs1 >= 0 and hs2 >= 0)
 
 
 def intersects_AABB2(a: Rect2, b: Rect2) -> bool:
@@ -119,3 +239,390 @@ def area_of_intersection_AABB2(a: Rect2, b: Rect2) -> Rect2:
     y0, y1 = max(a0y, b0y), min(a2y, b2y)
 
     return Rect2.from_points(x0, y0, x1, y1)
+
+
+def rects_to_bounds(rects: list) -> np.ndarray:
+    """Turns a list of Rect2 (or any shape with a bounding_rect/ AABB) or 4-tuples into an (N, 4) array of
+    (xmin, ymin, xmax, ymax) rows as used by the vectorized AABB queries.
+
+    Args:
+                    rects (list): list of Rect2, Poly2 or (xmin, ymin, xmax, ymax) tuples
+
+    Returns:
+                    np.ndarray: (N, 4) array of bounds
+    """
+    if rects is None:
+        raise ValueError("rects not provided")
+
+    def _bounds(r):
+        if isinstance(r, Rect2):
+            return r.bounding_rect
+        if isinstance(r, Tri2):
+            return r.bounding_rect()
+        if hasattr(r, "AABB"):
+            return r.AABB
+        return r
+
+    return np.array([_bounds(r) for r in rects], dtype=np.float64).reshape(-1, 4)
+
+
+def _as_bounds(b) -> np.ndarray:
+    if isinstance(b, np.ndarray):
+        return b.reshape(-1, 4)
+    if isinstance(b, Rect2):
+        return np.array([b.bounding_rect], dtype=np.float64)
+    if isinstance(b, tuple):
+        return np.array([b], dtype=np.float64)
+    return rects_to_bounds(b)
+
+
+def intersects_AABB2_many(a, bounds) -> np.ndarray:
+    """One-vs-many form of intersects_AABB2. Touching boxes count as intersecting.
+
+    Args:
+                    a (Rect2 or tuple): the box (xmin, ymin, xmax, ymax) to test
+                    bounds (np.ndarray or list): (M, 4) boxes to test against
+
+    Returns:
+                    np.ndarray: boolean mask of length M
+    """
+    if a is None:
+        raise ValueError("a not provided")
+    if bounds is None:
+        raise ValueError("bounds not provided")
+
+    a0x, a0y, a2x, a2y = _as_bounds(a)[0]
+    b = _as_bounds(bounds)
+    return ~((a0x > b[:, 2]) | (a2x < b[:, 0]) | (a0y > b[:, 3]) | (a2y < b[:, 1]))
+
+
+def overlapping_AABB2_pairs(
+    a_bounds,
+    b_bounds=None,
+    return_intersections: bool = False,
+    block_size: int = 1024,
+):
+    """Finds all pairs of overlapping axis aligned bounding boxes between the (N, 4) boxes a_bounds and the (M, 4) boxes b_bounds.
+    If b_bounds is not provided, the boxes of a_bounds are tested against each other and every pair (i, j) is reported once with i < j.
+    The boxes are sorted along x and tested block-wise, so that a block of block_size boxes is only compared against the boxes
+    that start left of its right edge and at most block_size x M comparisons are held in memory at once.
+
+    Args:
+                    a_bounds (np.ndarray or list): (N, 4) boxes (xmin, ymin, xmax, ymax), or list of Rect2
+                    b_bounds (np.ndarray or list, optional): (M, 4) boxes, or list of Rect2. Defaults to None.
+                    return_intersections (bool, optional): also return the area of intersection per pair (like area_of_intersection_AABB2). Defaults to False.
+                    block_size (int, optional): number of rows of a_bounds tested at once. Defaults to 1024.
+
+    Returns:
+                    np.ndarray or tuple: (K, 2) array of index pairs (i into a_bounds, j into b_bounds) and, if requested, the
+                    (K, 4) array of intersection rects
+    """
+    if a_bounds is None:
+        raise ValueError("a_bounds not provided")
+    if block_size < 1:
+        raise ValueError("block_size has to be positive")
+
+    a = _as_bounds(a_bounds)
+    self_test = b_bounds is None
+    b = a if self_test else _as_bounds(b_bounds)
+
+    # sorting both sets by xmin lets every block of a only look at the boxes of b starting left of the block's largest xmax
+    a_order = np.argsort(a[:, 0], kind="stable")
+    b_order = a_order if self_test else np.argsort(b[:, 0], kind="stable")
+    a_s, b_s = a[a_order], b[b_order]
+    b_xmin = b_s[:, 0]
+
+    pairs = []
+    for i0 in range(0, a_s.shape[0], block_size):
+        ab = a_s[i0 : i0 + block_size]
+        j0 = i0 if self_test else 0
+        j1 = np.searchsorted(b_xmin, ab[:, 2].max(), side="right")
+        if j1 <= j0:
+            continue
+        bb = b_s[j0:j1]
+        overlap = ~(
+            (ab[:, 0:1] > bb[:, 2])
+            | (ab[:, 2:3] < bb[:, 0])
+            | (ab[:, 1:2] > bb[:, 3])
+            | (ab[:, 3:4] < bb[:, 1])
+        )
+        if self_test:
+            # every pair once, i.e. keep the entries right of the diagonal
+            overlap &= np.arange(j0, j1)[np.newaxis, :] > np.arange(
+                i0, i0 + ab.shape[0]
+            )[:, np.newaxis]
+        ii, jj = np.nonzero(overlap)
+        pairs.append(np.stack((a_order[ii + i0], b_order[jj + j0]), axis=1))
+
+    if pairs:
+        pairs = np.concatenate(pairs)
+    else:
+        pairs = np.empty((0, 2), dtype=np.intp)
+
+    if self_test:
+        pairs.sort(axis=1)
+    # report the pairs in index order, independent of the internal sorting
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    if not return_intersections:
+        return pairs
+
+    ra, rb = a[pairs[:, 0]], b[pairs[:, 1]]
+    rects = np.concatenate(
+        (np.maximum(ra[:, :2], rb[:, :2]), np.minimum(ra[:, 2:], rb[:, 2:])), axis=1
+    )
+    return pairs, rects
+
+
+def _half_planes(vertices: np.ndarray) -> tuple:
+    # (..., K, 2) convex polygon vertices -> edge origins and edge normals, the normals being oriented such that
+    # dot(normal, p - origin) <= 0 holds for the points inside of the polygon, independent of the winding order
+    e = np.roll(vertices, -1, axis=-2) - vertices
+    normals = np.stack((-e[..., 1], e[..., 0]), axis=-1)
+    area2 = np.sum(vertices[..., 0] * e[..., 1] - vertices[..., 1] * e[..., 0], axis=-1)
+    normals *= np.where(area2 > 0, -1.0, 1.0)[..., np.newaxis, np.newaxis]
+    return vertices, normals
+
+
+def _vertices(shape) -> np.ndarray:
+    if isinstance(shape, Poly2):
+        return shape.vertices
+    return np.asarray(shape, dtype=np.float64).reshape(-1, 2)
+
+
+def convex_polys_to_arrays(polys: list) -> tuple:
+    """Turns a list of convex polygons (Tri2, Rect2, Poly2 or lists of points) into the half-plane form used by point_in_convex_polys2.
+    Polygons with less vertices than the largest polygon are padded with degenerate edges, which never reject a point.
+
+    Args:
+                    polys (list): list of convex polygons
+
+    Returns:
+                    tuple: (M, K, 2) array of edge origins and (M, K, 2) array of edge normals
+    """
+    if polys is None:
+        raise ValueError("polys not provided")
+
+    vs = [_vertices(p) for p in polys]
+    k = max([v.shape[0] for v in vs], default=3)
+    origins = np.zeros((len(vs), k, 2), dtype=np.float64)
+    normals = np.zeros((len(vs), k, 2), dtype=np.float64)
+    for i, v in enumerate(vs):
+        origins[i, : v.shape[0]], normals[i, : v.shape[0]] = _half_planes(v)
+    return origins, normals
+
+
+def triangles_to_arrays(tris: list) -> tuple:
+    """Turns a list of Tri2 instances or (p0, p1, p2) vertex triples into the half-plane form used by point_in_triangles2.
+
+    Args:
+                    tris (list): list of Tri2 or vertex triples, or an (M, 3, 2) array of vertices
+
+    Returns:
+                    tuple: (M, 3, 2) array of edge origins and (M, 3, 2) array of edge normals
+    """
+    if tris is None:
+        raise ValueError("tris not provided")
+    if isinstance(tris, np.ndarray):
+        return _half_planes(tris.reshape(-1, 3, 2).astype(np.float64))
+    return _half_planes(np.array([_vertices(t) for t in tris], dtype=np.float64).reshape(-1, 3, 2))
+
+
+def circles_to_arrays(circles: list) -> tuple:
+    """Turns a list of Circle2 instances or (cx, cy, r) tuples into the array form used by point_in_circles2.
+
+    Args:
+                    circles (list): list of Circle2 or (cx, cy, r) tuples
+
+    Returns:
+                    tuple: (M, 2) array of centers and (M,) array of radii
+    """
+    if circles is None:
+        raise ValueError("circles not provided")
+    c = np.array(
+        [(ci.center_x, ci.center_y, ci.radius) if isinstance(ci, Circle2) else ci for ci in circles],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    return c[:, :2], c[:, 2]
+
+
+def inside_rect2_many(rect, points) -> np.ndarray:
+    """Many-points form of Rect2.inside, i.e. tests the points against the axis aligned bounding rect of rect.
+
+    Args:
+                    rect (Rect2 or tuple): the rect or its bounds (xmin, ymin, xmax, ymax)
+                    points (np.ndarray, Vec2Array or list): (N, 2) points
+
+    Returns:
+                    np.ndarray: boolean mask of length N, True where the point lies inside or on the edge of the rect
+    """
+    if rect is None:
+        raise ValueError("rect not provided")
+    xmin, ymin, xmax, ymax = _as_bounds(rect)[0]
+    p = as_points_array(points)
+    return (p[:, 0] >= xmin) & (p[:, 0] <= xmax) & (p[:, 1] >= ymin) & (p[:, 1] <= ymax)
+
+
+def inside_circle2_many(circle, points) -> np.ndarray:
+    """Many-points form of inside_circle2
+
+    Args:
+                    circle (Circle2 or tuple): the circle or a (cx, cy, r) tuple
+                    points (np.ndarray, Vec2Array or list): (N, 2) points
+
+    Returns:
+                    np.ndarray: boolean mask of length N, True where the point lies inside or on the circle
+    """
+    if circle is None:
+        raise ValueError("circle not provided")
+    cx, cy, r = (circle.center_x, circle.center_y, circle.radius) if isinstance(circle, Circle2) else circle
+    p = as_points_array(points)
+    dx = p[:, 0] - cx
+    dy = p[:, 1] - cy
+    return dx * dx + dy * dy <= r * r
+
+
+def inside_convex_poly2_many(poly, points) -> np.ndarray:
+    """Many-points containment test against a convex polygon (Tri2, Rect2 or convex Poly2) in either winding order.
+    Each point is tested against the half-planes spanned by the polygon edges.
+
+    Args:
+                    poly (Poly2 or list): the convex polygon or its vertices
+                    points (np.ndarray, Vec2Array or list): (N, 2) points
+
+    Returns:
+                    np.ndarray: boolean mask of length N, True where the point lies inside or on the edge of the polygon
+    """
+    if poly is None:
+        raise ValueError("poly not provided")
+    if isinstance(poly, Poly2):
+        # the polygon keeps its edge normals cached until it is transformed
+        origins, normals = poly.vertices, poly.edge_normals
+    else:
+        origins, normals = _half_planes(_vertices(poly))
+    p = as_points_array(points)
+    inside = np.ones(p.shape[0], dtype=bool)
+    for (ox, oy), (nx, ny) in zip(origins.tolist(), normals.tolist()):
+        inside &= nx * (p[:, 0] - ox) + ny * (p[:, 1] - oy) <= 0.0
+    return inside
+
+
+def inside_triangle2_many(tri, points) -> np.ndarray:
+    """Many-points form of inside_triangle2
+
+    Args:
+                    tri (Tri2 or list): the triangle or its three vertices
+                    points (np.ndarray, Vec2Array or list): (N, 2) points
+
+    Returns:
+                    np.ndarray: boolean mask of length N, True where the point lies inside or on the edge of the triangle
+    """
+    return inside_convex_poly2_many(tri, points)
+
+
+def inside_poly2_many(poly, points) -> np.ndarray:
+    """Many-points containment test against an arbitrary simple, possibly concave polygon using the even-odd crossing rule.
+    Points exactly on the boundary may be reported either way, use inside_convex_poly2_many for convex polygons.
+
+    Args:
+                    poly (Poly2 or list): the polygon or its vertices
+                    points (np.ndarray, Vec2Array or list): (N, 2) points
+
+    Returns:
+                    np.ndarray: boolean mask of length N, True where the point lies inside of the polygon
+    """
+    if poly is None:
+        raise ValueError("poly not provided")
+    v = _vertices(poly)
+    p = as_points_array(points)
+    px, py = p[:, 0], p[:, 1]
+    inside = np.zeros(p.shape[0], dtype=bool)
+    for (ax, ay), (bx, by) in zip(v.tolist(), np.roll(v, -1, axis=0).tolist()):
+        if ay == by:
+            continue
+        crosses = (ay > py) != (by > py)
+        # x coordinate where the edge crosses the horizontal line through the point
+        xc = ax + (py - ay) * ((bx - ax) / (by - ay))
+        inside ^= crosses & (px < xc)
+    return inside
+
+
+def point_in_rects2(p, bounds) -> np.ndarray:
+    """One-point-vs-many-rects form of inside_rect2_many
+
+    Args:
+                    p (Point2 or tuple): the point
+                    bounds (np.ndarray or list): (M, 4) boxes (xmin, ymin, xmax, ymax), or list of Rect2
+
+    Returns:
+                    np.ndarray: boolean mask of length M, True for the rects containing the point
+    """
+    if p is None:
+        raise ValueError("p not provided")
+    px, py = p[0], p[1]
+    b = _as_bounds(bounds)
+    return (b[:, 0] <= px) & (px <= b[:, 2]) & (b[:, 1] <= py) & (py <= b[:, 3])
+
+
+def point_in_circles2(p, centers, radii=None) -> np.ndarray:
+    """One-point-vs-many-circles form of inside_circle2_many
+
+    Args:
+                    p (Point2 or tuple): the point
+                    centers (np.ndarray or list): (M, 2) circle centers, or list of Circle2/ (cx, cy, r) if radii is not provided
+                    radii (np.ndarray, optional): (M,) circle radii. Defaults to None.
+
+    Returns:
+                    np.ndarray: boolean mask of length M, True for the circles containing the point
+    """
+    if p is None:
+        raise ValueError("p not provided")
+    if centers is None:
+        raise ValueError("centers not provided")
+    if radii is None:
+        centers, radii = circles_to_arrays(centers)
+    c = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    r = np.asarray(radii, dtype=np.float64)
+    dx = c[:, 0] - p[0]
+    dy = c[:, 1] - p[1]
+    return dx * dx + dy * dy <= r * r
+
+
+def point_in_convex_polys2(p, origins, normals=None) -> np.ndarray:
+    """One-point-vs-many-polygons containment test against convex polygons in the half-plane form of convex_polys_to_arrays.
+    Convert the polygons once and reuse the arrays as long as the polygons do not move.
+
+    Args:
+                    p (Point2 or tuple): the point
+                    origins (np.ndarray or list): (M, K, 2) edge origins, or a list of convex polygons if normals is not provided
+                    normals (np.ndarray, optional): (M, K, 2) edge normals. Defaults to None.
+
+    Returns:
+                    np.ndarray: boolean mask of length M, True for the polygons containing the point
+    """
+    if p is None:
+        raise ValueError("p not provided")
+    if origins is None:
+        raise ValueError("origins not provided")
+    if normals is None:
+        origins, normals = convex_polys_to_arrays(origins)
+    hs = normals[..., 0] * (p[0] - origins[..., 0]) + normals[..., 1] * (p[1] - origins[..., 1])
+    return np.all(hs <= 0.0, axis=-1)
+
+
+def point_in_triangles2(p, origins, normals=None) -> np.ndarray:
+    """One-point-vs-many-triangles form of inside_triangle2_many, see point_in_convex_polys2
+
+    Args:
+                    p (Point2 or tuple): the point
+                    origins (np.ndarray or list): (M, 3, 2) edge origins, or a list of Tri2 if normals is not provided
+                    normals (np.ndarray, optional): (M, 3, 2) edge normals of triangles_to_arrays. Defaults to None.
+
+    Returns:
+                    np.ndarray: boolean mask of length M, True for the triangles containing the point
+    """
+    if origins is None:
+        raise ValueError("origins not provided")
+    if normals is None:
+        origins, normals = triangles_to_arrays(origins)
+    return point_in_convex_polys2(p, origins, normals)
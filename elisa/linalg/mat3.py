@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import math
+
+import numpy as np
+
 from .linalg import is_numeric
+from .vec2array import as_points_array
 from .vec3 import Point3, Vec3
 
 # TODO: is orthogonal
@@ -305,6 +309,51 @@ class Mat3:
             self._v[8],
         )
 
+    def to_array(self) -> np.ndarray:
+        """Returns the matrix as a 3x3 numpy array in row-wise order
+
+        Returns:
+                        np.ndarray: the matrix
+        """
+        return np.array(self._v, dtype=np.float64).reshape(3, 3)
+
+    def transform_points(self, points, out: np.ndarray = None) -> np.ndarray:
+        """Transforms many 2D points at once, i.e. computes M * (x, y, 1) for every point. If the last
+        row of the matrix is not (0, 0, 1) the result is divided by the homogeneous coordinate.
+
+        Args:
+                        points (np.ndarray, Vec2Array, list): (N, 2) array, Vec2Array or list of Point2/ tuples
+                        out (np.ndarray, optional): (N, 2) float array receiving the result. Defaults to None.
+
+        Returns:
+                        np.ndarray: the (N, 2) array of transformed points
+        """
+        p = as_points_array(points)
+        a, b, c, d, e, f, g, h, i = self._v
+
+        if out is None:
+            out = np.empty(p.shape, dtype=np.float64)
+        elif out.shape != p.shape:
+            raise ValueError("out has to be of shape {}".format(p.shape))
+        elif np.shares_memory(out, p):
+            p = p.copy()
+
+        x, y = p[:, 0], p[:, 1]
+        if g == 0.0 and h == 0.0 and i == 1.0:
+            # affine transformation, no division necessary
+            np.multiply(x, a, out=out[:, 0])
+            out[:, 0] += b * y
+            out[:, 0] += c
+            np.multiply(x, d, out=out[:, 1])
+            out[:, 1] += e * y
+            out[:, 1] += f
+        else:
+            w = g * x + h * y + i
+            out[:, 0] = (a * x + b * y + c) / w
+            out[:, 1] = (d * x + e * y + f) / w
+
+        return out
+
     def __str__(self):
         return """[Mat3]
                 [{}, {}, {}
@@ -1,49 +1,441 @@
-import sys
-from math import floor, ceil
-from .linalg import lerp1D
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # pygame is only needed to bake noise into a surface, see noise_to_surface
+    import pygame
 
 # https://mzucker.github.io/html/perlin-noise-math-faq.html
 # http://staff.fh-hagenberg.at/burger/publications/reports/2008GradientNoise/Burger-GradientNoiseGerman-2008.pdf
+# https://mrl.cs.nyu.edu/~perlin/noise/ (improved noise, 2002)
 
+# 1D gradients evenly spread in [-1, 1]
+_GRAD1 = np.array([-1.0, -0.75, -0.5, -0.25, 0.25, 0.5, 0.75, 1.0])
+# 2D gradients pointing to the edges and corners of the unit square
+_GRAD2 = np.array(
+    [
+        [1.0, 1.0],
+        [-1.0, 1.0],
+        [1.0, -1.0],
+        [-1.0, -1.0],
+        [1.0, 0.0],
+        [-1.0, 0.0],
+        [0.0, 1.0],
+        [0.0, -1.0],
+    ]
+)
+# 3D gradients pointing to the edge midpoints of the unit cube, padded to 16 entries (Perlin 2002)
+_GRAD3 = np.array(
+    [
+        [1.0, 1.0, 0.0],
+        [-1.0, 1.0, 0.0],
+        [1.0, -1.0, 0.0],
+        [-1.0, -1.0, 0.0],
+        [1.0, 0.0, 1.0],
+        [-1.0, 0.0, 1.0],
+        [1.0, 0.0, -1.0],
+        [-1.0, 0.0, -1.0],
+        [0.0, 1.0, 1.0],
+        [0.0, -1.0, 1.0],
+        [0.0, 1.0, -1.0],
+        [0.0, -1.0, -1.0],
+        [1.0, 1.0, 0.0],
+        [0.0, -1.0, 1.0],
+        [-1.0, 1.0, 0.0],
+        [0.0, -1.0, -1.0],
+    ]
+)
 
-def perlin_noise(x, y=None):
-    def ease_curve(p):
-        return (3.0 * (p ** 2.0)) - (2.0 * (p ** 3.0))
 
-    def g1(x_: int):
+def _fade(t):
+    # quintic ease curve 6t^5 - 15t^4 + 10t^3, its first and second derivative vanish at 0 and 1
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def _lerp(a, b, t):
+    return a + t * (b - a)
+
+
+def _as_result(v, is_scalar: bool):
+    return float(v) if is_scalar else v
+
+
+class GradientNoise(object):
+    """Seeded gradient (Perlin) noise in one, two and three dimensions.
+    All noise functions take numbers or numpy arrays of coordinates and evaluate all of them in one vectorized pass.
+    The results lie roughly in [-1, 1] and are 0 at integer lattice points.
+    """
+
+    def __init__(self, seed: int = None):
+        """Creates a new noise generator
+
+        Args:
+            seed (int, optional): seed of the permutation table, the same seed yields the same noise. Defaults to None (random).
+        """
+        super(GradientNoise, self).__init__()
+        self._seed = seed
+        p = np.random.default_rng(seed).permutation(256)
+        # doubled so that perm[perm[x] + y + 1] never needs a wrap-around
+        self._perm = np.concatenate((p, p)).astype(np.intp)
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def permutation(self) -> np.ndarray:
+        return self._perm[:256]
+
+    def noise1(self, x):
+        """Evaluates 1D gradient noise at x
+
+        Args:
+            x (float or np.ndarray): coordinates
+
+        Returns:
+            float or np.ndarray: noise values of the same shape as x
+        """
+        is_scalar = np.isscalar(x)
+        x = np.asarray(x, dtype=np.float64)
+        x0 = np.floor(x)
+        xf = x - x0
+        xi = x0.astype(np.intp) & 255
+        perm = self._perm
+
+        g0 = _GRAD1[perm[xi] & 7]
+        g1 = _GRAD1[perm[xi + 1] & 7]
+        n = _lerp(g0 * xf, g1 * (xf - 1.0), _fade(xf))
+        # the largest possible value of the interpolation is 0.5
+        return _as_result(2.0 * n, is_scalar)
+
+    def noise2(self, x, y):
+        """Evaluates 2D gradient noise at (x, y)
+
+        Args:
+            x (float or np.ndarray): x coordinates
+            y (float or np.ndarray): y coordinates, broadcastable against x
+
+        Returns:
+            float or np.ndarray: noise values of the broadcast shape of x and y
+        """
+        is_scalar = np.isscalar(x) and np.isscalar(y)
+        x, y = np.broadcast_arrays(
+            np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        )
+        x0, y0 = np.floor(x), np.floor(y)
+        xf, yf = x - x0, y - y0
+        xi = x0.astype(np.intp) & 255
+        yi = y0.astype(np.intp) & 255
+        perm = self._perm
+
+        pa, pb = perm[xi] + yi, perm[xi + 1] + yi
+        g_aa = _GRAD2[perm[pa] & 7]
+        g_ab = _GRAD2[perm[pa + 1] & 7]
+        g_ba = _GRAD2[perm[pb] & 7]
+        g_bb = _GRAD2[perm[pb + 1] & 7]
+
+        xf1, yf1 = xf - 1.0, yf - 1.0
+        n_aa = g_aa[..., 0] * xf + g_aa[..., 1] * yf
+        n_ba = g_ba[..., 0] * xf1 + g_ba[..., 1] * yf
+        n_ab = g_ab[..., 0] * xf + g_ab[..., 1] * yf1
+        n_bb = g_bb[..., 0] * xf1 + g_bb[..., 1] * yf1
+
+        u, v = _fade(xf), _fade(yf)
+        n = _lerp(_lerp(n_aa, n_ba, u), _lerp(n_ab, n_bb, u), v)
+        return _as_result(n, is_scalar)
+
+    def noise3(self, x, y, z):
+        """Evaluates 3D gradient noise at (x, y, z), e.g. 2D noise animated over time z
+
+        Args:
+            x (float or np.ndarray): x coordinates
+            y (float or np.ndarray): y coordinates, broadcastable against x
+            z (float or np.ndarray): z coordinates, broadcastable against x
+
+        Returns:
+            float or np.ndarray: noise values of the broadcast shape of x, y and z
+        """
+        is_scalar = np.isscalar(x) and np.isscalar(y) and np.isscalar(z)
+        x, y, z = np.broadcast_arrays(
+            np.asarray(x, dtype=np.float64),
+            np.asarray(y, dtype=np.float64),
+            np.asarray(z, dtype=np.float64),
+        )
+        x0, y0, z0 = np.floor(x), np.floor(y), np.floor(z)
+        xf, yf, zf = x - x0, y - y0, z - z0
+        xi = x0.astype(np.intp) & 255
+        yi = y0.astype(np.intp) & 255
+        zi = z0.astype(np.intp) & 255
+        perm = self._perm
+
+        a = perm[xi] + yi
+        aa, ab = perm[a] + zi, perm[a + 1] + zi
+        b = perm[xi + 1] + yi
+        ba, bb = perm[b] + zi, perm[b + 1] + zi
+
+        def grad(h, dx, dy, dz):
+            g = _GRAD3[perm[h] & 15]
+            return g[..., 0] * dx + g[..., 1] * dy + g[..., 2] * dz
+
+        xf1, yf1, zf1 = xf - 1.0, yf - 1.0, zf - 1.0
+        u, v, w = _fade(xf), _fade(yf), _fade(zf)
+
+        n0 = _lerp(
+            _lerp(grad(aa, xf, yf, zf), grad(ba, xf1, yf, zf), u),
+            _lerp(grad(ab, xf, yf1, zf), grad(bb, xf1, yf1, zf), u),
+            v,
+        )
+        n1 = _lerp(
+            _lerp(grad(aa + 1, xf, yf, zf1), grad(ba + 1, xf1, yf, zf1), u),
+            _lerp(grad(ab + 1, xf, yf1, zf1), grad(bb + 1, xf1, yf1, zf1), u),
+            v,
+        )
+        return _as_result(_lerp(n0, n1, w), is_scalar)
+
+    def fbm2(
+        self,
+        x,
+        y,
+        octaves: int = 4,
+        lacunarity: float = 2.0,
+        persistence: float = 0.5,
+    ):
+        """Fractional Brownian motion, i.e. the sum of several octaves of 2D noise with rising frequency and falling amplitude.
+        The result is normalized by the sum of amplitudes, so that it stays in the range of a single octave.
+
+        Args:
+            x (float or np.ndarray): x coordinates
+            y (float or np.ndarray): y coordinates
+            octaves (int, optional): number of summed noise layers. Defaults to 4.
+            lacunarity (float, optional): frequency multiplier between octaves. Defaults to 2.0.
+            persistence (float, optional): amplitude multiplier between octaves. Defaults to 0.5.
+
+        Returns:
+            float or np.ndarray: the fBm values
+        """
+        if octaves < 1:
+            raise ValueError("at least one octave required")
+
+        is_scalar = np.isscalar(x) and np.isscalar(y)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        total, amplitude, frequency, amplitude_sum = 0.0, 1.0, 1.0, 0.0
+        for _ in range(octaves):
+            total = total + amplitude * self.noise2(x * frequency, y * frequency)
+            amplitude_sum += amplitude
+            amplitude *= persistence
+            frequency *= lacunarity
+        return _as_result(total / amplitude_sum, is_scalar)
+
+    def fbm3(
+        self,
+        x,
+        y,
+        z,
+        octaves: int = 4,
+        lacunarity: float = 2.0,
+        persistence: float = 0.5,
+    ):
+        """Fractional Brownian motion over 3D noise, see fbm2.
+
+        Args:
+            x (float or np.ndarray): x coordinates
+            y (float or np.ndarray): y coordinates
+            z (float or np.ndarray): z coordinates
+            octaves (int, optional): number of summed noise layers. Defaults to 4.
+            lacunarity (float, optional): frequency multiplier between octaves. Defaults to 2.0.
+            persistence (float, optional): amplitude multiplier between octaves. Defaults to 0.5.
+
+        Returns:
+            float or np.ndarray: the fBm values
         """
-        one dimensional pseudo-random gradient vector function. mapping values from [0, n] to [-1, 1]
-        :param x_:
-        :return:
+        if octaves < 1:
+            raise ValueError("at least one octave required")
+
+        is_scalar = np.isscalar(x) and np.isscalar(y) and np.isscalar(z)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+        total, amplitude, frequency, amplitude_sum = 0.0, 1.0, 1.0, 0.0
+        for _ in range(octaves):
+            total = total + amplitude * self.noise3(
+                x * frequency, y * frequency, z * frequency
+            )
+            amplitude_sum += amplitude
+            amplitude *= persistence
+            frequency *= lacunarity
+        return _as_result(total / amplitude_sum, is_scalar)
+
+    def grid2(
+        self,
+        width: int,
+        height: int,
+        scale: float = 1.0 / 32.0,
+        offset: tuple = (0.0, 0.0),
+        octaves: int = 1,
+        lacunarity: float = 2.0,
+        persistence: float = 0.5,
+        z: float = None,
+    ) -> np.ndarray:
+        """Evaluates (fBm) noise for a whole width x height grid of cells at once.
+        Cell (x, y) is sampled at ((x + offset_x) * scale, (y + offset_y) * scale).
+
+        Args:
+            width (int): number of cells in x
+            height (int): number of cells in y
+            scale (float, optional): noise units per cell, smaller values give smoother noise. Defaults to 1/32.
+            offset (tuple, optional): offset of the grid in cells, e.g. to scroll through the noise. Defaults to (0, 0).
+            octaves (int, optional): number of fBm octaves. Defaults to 1.
+            lacunarity (float, optional): frequency multiplier between octaves. Defaults to 2.0.
+            persistence (float, optional): amplitude multiplier between octaves. Defaults to 0.5.
+            z (float, optional): if provided, the grid is a slice through 3D noise at z. Defaults to None.
+
+        Returns:
+            np.ndarray: (height, width) array of noise values, indexed [y, x] like the TileMap grids
         """
-        if x_ == 0.0:
-            return -1
-        return 2.0 * (1.0 / hash(x_)) - 1.0
-
-    def g2(x_, y_):
-        pass
-
-    def pnoise1(x_):
-        x0 = floor(x_)
-        x1 = ceil(x_)
-        gx0, gx1 = g1(x0), g1(x1)
-        xx0 = x_ - x0
-        xx1 = x_ - x1
-        # similarity between the pseudo-random gradient and the vector to x determines the influence
-        # of the pseudo-random vector on the final blending
-        s = gx0 * xx0
-        t = gx1 * xx1
-        s_x = ease_curve(x_ - x0)
-        a = lerp1D(s, t, s_x)
-        return a
-
-    def pnoise2(x_, y_):
-        # TODO: pnoise2
-        raise ValueError("TODO: Not implemented")
+        if width < 1 or height < 1:
+            raise ValueError("grid extents need to be positive")
+
+        xs = (np.arange(width, dtype=np.float64) + offset[0]) * scale
+        ys = (np.arange(height, dtype=np.float64) + offset[1]) * scale
+        gx, gy = xs[np.newaxis, :], ys[:, np.newaxis]
+
+        if z is None:
+            return self.fbm2(gx, gy, octaves, lacunarity, persistence)
+        return self.fbm3(gx, gy, z, octaves, lacunarity, persistence)
 
+
+_default_noise = GradientNoise(seed=0)
+
+
+def perlin_noise(x, y=None):
+    """Evaluates gradient noise of the module default (seed 0) generator in 1D or 2D.
+
+    Args:
+        x (float or np.ndarray): x coordinates
+        y (float or np.ndarray, optional): y coordinates, if omitted 1D noise is returned. Defaults to None.
+
+    Raises:
+        ValueError: if x is not provided
+
+    Returns:
+        float or np.ndarray: the noise values
+    """
     if x is None:
         raise ValueError("x cannot be None")
     if y is None:
-        return pnoise1(x)
+        return _default_noise.noise1(x)
     else:
-        return pnoise2(x, y)
+        return _default_noise.noise2(x, y)
+
+
+def noise_to_surface(
+    values: np.ndarray,
+    surface: pygame.Surface = None,
+    vmin: float = None,
+    vmax: float = None,
+    palette: np.ndarray = None,
+) -> pygame.Surface:
+    """Bakes a (height, width) array of noise values into a pygame Surface via surfarray.
+    The values are mapped linearly from [vmin, vmax] to gray levels 0..255 or, if a palette is provided, to its colours.
+
+    Args:
+        values (np.ndarray): (height, width) noise values, e.g. from GradientNoise.grid2
+        surface (pygame.Surface, optional): surface of size (width, height) to write into, a new one is created if None. Defaults to None.
+        vmin (float, optional): value mapped to the lowest level. Defaults to None (minimum of values).
+        vmax (float, optional): value mapped to the highest level. Defaults to None (maximum of values).
+        palette (np.ndarray, optional): (K, 3) array of rgb colours the value range is divided into. Defaults to None.
+
+    Raises:
+        ValueError: if values are not a 2D array, or the surface has a different size.
+
+    Returns:
+        pygame.Surface: the surface holding the baked noise
+    """
+    import pygame
+
+    if values is None or np.ndim(values) != 2:
+        raise ValueError("values need to be a 2D (height, width) array")
+
+    vmin = float(np.min(values)) if vmin is None else vmin
+    vmax = float(np.max(values)) if vmax is None else vmax
+    span = vmax - vmin if vmax > vmin else 1.0
+    t = np.clip((values - vmin) / span, 0.0, 1.0)
+
+    if palette is None:
+        level = (t * 255.0).astype(np.uint8)
+        rgb = np.repeat(level[:, :, np.newaxis], 3, axis=2)
+    else:
+        palette = np.asarray(palette, dtype=np.uint8)
+        idx = np.minimum((t * len(palette)).astype(np.intp), len(palette) - 1)
+        rgb = palette[idx]
+
+    # surfarray is indexed [x, y]
+    rgb = rgb.transpose(1, 0, 2)
+    if surface is None:
+        return pygame.surfarray.make_surface(rgb)
+
+    if surface.get_size() != rgb.shape[:2]:
+        raise ValueError("surface size does not match the value grid")
+    pygame.surfarray.blit_array(surface, rgb)
+    return surface
+
+
+def noise_to_tiles(values: np.ndarray, thresholds: list, tile_indices: list) -> np.ndarray:
+    """Classifies noise values into tile indices. Values below thresholds[0] become tile_indices[0], values in
+    [thresholds[i - 1], thresholds[i]) become tile_indices[i] and values above the last threshold the last tile index.
+
+    Args:
+        values (np.ndarray): noise values
+        thresholds (list): increasing band limits
+        tile_indices (list): len(thresholds) + 1 tile indices
+
+    Raises:
+        ValueError: if the number of tile indices does not match the thresholds
+
+    Returns:
+        np.ndarray: integer array of tile indices with the shape of values
+    """
+    if len(tile_indices) != len(thresholds) + 1:
+        raise ValueError("tile_indices needs one entry more than thresholds")
+    bands = np.digitize(values, np.asarray(thresholds, dtype=np.float64))
+    return np.asarray(tile_indices, dtype=np.int64)[bands]
+
+
+def noise_to_tilemap(
+    values: np.ndarray,
+    tile_map,
+    grid_name: str,
+    thresholds: list,
+    tile_indices: list,
+    visible: bool = True,
+    props: dict = None,
+):
+    """Classifies a (map height, map width) array of noise values into tile indices (see noise_to_tiles) and
+    adds the result as a new grid layer to the tile map.
+
+    Args:
+        values (np.ndarray): (map height, map width) noise values
+        tile_map (TileMap): tile map receiving the layer
+        grid_name (str): name of the new grid
+        thresholds (list): increasing band limits
+        tile_indices (list): len(thresholds) + 1 tile indices
+        visible (bool, optional): is this a visible layer. Defaults to True.
+        props (dict, optional): additional layer properties. Defaults to None.
+
+    Raises:
+        ValueError: if the value grid does not match the map dimensions
+
+    Returns:
+        TileMap: the tile map with the grid added
+    """
+    if tile_map is None:
+        raise ValueError("tile map not provided")
+    if np.shape(values) != (tile_map.map_height, tile_map.map_width):
+        raise ValueError("values need to be of shape (map height, map width)")
+
+    tiles = noise_to_tiles(values, thresholds, tile_indices)
+    return tile_map.add_grid(grid_name, tiles, visible, props)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import math
+
+from .geom2 import Circle2, Poly2
+from .vec2 import Point2, Vec2
+
+# Narrow phase collision detection of convex shapes by means of the separating axis theorem (SAT).
+# Two convex shapes do not intersect, if there is an axis onto which their projections do not overlap. For polygons it
+# suffices to test the edge normals of both polygons. If no separating axis exists, the axis of least overlap gives the
+# collision normal and the penetration depth.
+
+
+class Manifold2(object):
+    """The contact manifold of two colliding shapes a and b. The normal points from a towards b, i.e. moving b by
+    normal * depth (or a by -normal * depth) resolves the collision.
+    """
+
+    def __init__(self, normal: Vec2, depth: float, points: list):
+        """Create a new contact manifold
+
+        Args:
+            normal (Vec2): unit collision normal pointing from a towards b
+            depth (float): penetration depth along the normal
+            points (list): one or two Point2 contact points
+        """
+        super(Manifold2, self).__init__()
+        self._normal = normal
+        self._depth = depth
+        self._points = points
+
+    @property
+    def normal(self) -> Vec2:
+        return self._normal
+
+    @property
+    def depth(self) -> float:
+        return self._depth
+
+    @property
+    def points(self) -> list:
+        return self._points
+
+    def flip(self) -> Manifold2:
+        """Returns the manifold as seen from the other shape, i.e. with the normal pointing from b towards a
+
+        Returns:
+            Manifold2: the flipped manifold
+        """
+        return Manifold2(-self._normal, self._depth, self._points)
+
+    def __repr__(self) -> str:
+        return "Manifold2: normal={}, depth={}, points={}".format(
+            self._normal, self._depth, self._points
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def _min_separation(normals: list, verts: list, other: list) -> tuple:
+    # for every edge (normal, vertex) of the reference polygon, the separation is the distance of the
+    # deepest vertex of the other polygon in front of the edge. A positive separation is a separating axis.
+    best, best_i = -math.inf, -1
+    for i, (nx, ny) in enumerate(normals):
+        vx, vy = verts[i]
+        s = min([nx * (ox - vx) + ny * (oy - vy) for ox, oy in other])
+        if s > 0.0:
+            return s, i
+        if s > best:
+            best, best_i = s, i
+    return best, best_i
+
+
+def _clip(p0: tuple, p1: tuple, nx: float, ny: float, c: float) -> list:
+    # keeps the part of the segment p0, p1 with dot((nx, ny), p) <= c
+    d0 = nx * p0[0] + ny * p0[1] - c
+    d1 = nx * p1[0] + ny * p1[1] - c
+    out = []
+    if d0 <= 0.0:
+        out.append(p0)
+    if d1 <= 0.0:
+        out.append(p1)
+    if d0 * d1 < 0.0:
+        t = d0 / (d0 - d1)
+        out.append((p0[0] + t * (p1[0] - p0[0]), p0[1] + t * (p1[1] - p0[1])))
+    return out
+
+
+def _contacts(ref_v: list, ref_n: list, ref_i: int, inc_v: list, inc_n: list) -> list:
+    # clips the incident edge of the other polygon against the reference edge ref_i and
+    # returns the clipped points lying behind the reference edge
+    nx, ny = ref_n[ref_i]
+    # the incident edge is the one facing the reference edge the most
+    inc_i = min(range(len(inc_n)), key=lambda k: nx * inc_n[k][0] + ny * inc_n[k][1])
+    i0 = inc_v[inc_i]
+    i1 = inc_v[(inc_i + 1) % len(inc_v)]
+
+    r0 = ref_v[ref_i]
+    r1 = ref_v[(ref_i + 1) % len(ref_v)]
+    tx, ty = r1[0] - r0[0], r1[1] - r0[1]
+
+    # the side planes of the reference edge
+    seg = _clip(i0, i1, -tx, -ty, -(tx * r0[0] + ty * r0[1]))
+    if len(seg) < 2:
+        return [Point2(x, y) for x, y in seg]
+    seg = _clip(seg[0], seg[1], tx, ty, tx * r1[0] + ty * r1[1])
+
+    front = nx * r0[0] + ny * r0[1]
+    return [Point2(x, y) for x, y in seg if nx * x + ny * y - front <= 0.0]
+
+
+def collide_poly2(a: Poly2, b: Poly2) -> Manifold2:
+    """Tests the two convex polygons a and b for intersection. The edge normals cached by the polygons are used as
+    candidate axes and the test stops at the first separating axis found.
+
+    Args:
+        a (Poly2): first convex polygon (Poly2, Tri2 or Rect2)
+        b (Poly2): second convex polygon (Poly2, Tri2 or Rect2)
+
+    Raises:
+        ValueError: if either polygon is not provided
+
+    Returns:
+        Manifold2: the contact manifold with the normal pointing from a towards b, or None if the polygons do not intersect
+    """
+    if not a:
+        raise ValueError("a not provided")
+    if not b:
+        raise ValueError("b not provided")
+
+    av, an = a.vertices.tolist(), a.edge_normals.tolist()
+    bv, bn = b.vertices.tolist(), b.edge_normals.tolist()
+
+    sa, ia = _min_separation(an, av, bv)
+    if sa > 0.0:
+        return None
+    sb, ib = _min_separation(bn, bv, av)
+    if sb > 0.0:
+        return None
+
+    # prefer the edges of a, unless the edges of b are clearly better
+    if sb > sa + 1e-9:
+        nx, ny = bn[ib]
+        points = _contacts(bv, bn, ib, av, an)
+        return Manifold2(Vec2(-nx, -ny), -sb, points)
+
+    nx, ny = an[ia]
+    points = _contacts(av, an, ia, bv, bn)
+    return Manifold2(Vec2(nx, ny), -sa, points)
+
+
+def collide_poly2_circle2(a: Poly2, b: Circle2) -> Manifold2:
+    """Tests the convex polygon a and the circle b for intersection.
+
+    Args:
+        a (Poly2): convex polygon (Poly2, Tri2 or Rect2)
+        b (Circle2): circle
+
+    Raises:
+        ValueError: if either shape is not provided
+
+    Returns:
+        Manifold2: the contact manifold with the normal pointing from a towards b, or None if the shapes do not intersect
+    """
+    if not a:
+        raise ValueError("a not provided")
+    if not b:
+        raise ValueError("b not provided")
+
+    cx, cy, r = b.center_x, b.center_y, b.radius
+    av, an = a.vertices.tolist(), a.edge_normals.tolist()
+
+    # the edge the circle center lies furthest in front of
+    best, best_i = -math.inf, -1
+    for i, (nx, ny) in enumerate(an):
+        s = nx * (cx - av[i][0]) + ny * (cy - av[i][1])
+        if s > r:
+            return None
+        if s > best:
+            best, best_i = s, i
+
+    nx, ny = an[best_i]
+    if best <= 0.0:
+        # the center lies inside of the polygon
+        return Manifold2(Vec2(nx, ny), r - best, [Point2(cx - nx * best, cy - ny * best)])
+
+    # closest point of the edge to the center, which may be one of its end points
+    v0x, v0y = av[best_i]
+    v1x, v1y = av[(best_i + 1) % len(av)]
+    ex, ey = v1x - v0x, v1y - v0y
+    ee = ex * ex + ey * ey
+    t = 0.0 if ee == 0.0 else min(max(((cx - v0x) * ex + (cy - v0y) * ey) / ee, 0.0), 1.0)
+    px, py = v0x + t * ex, v0y + t * ey
+    dx, dy = cx - px, cy - py
+    d = math.hypot(dx, dy)
+    if d > r:
+        return None
+    if d > 0.0:
+        nx, ny = dx / d, dy / d
+    return Manifold2(Vec2(nx, ny), r - d, [Point2(px, py)])
+
+
+def collide_circle2(a: Circle2, b: Circle2) -> Manifold2:
+    """Tests the two circles a and b for intersection.
+
+    Args:
+        a (Circle2): first circle
+        b (Circle2): second circle
+
+    Raises:
+        ValueError: if either circle is not provided
+
+    Returns:
+        Manifold2: the contact manifold with the normal pointing from a towards b, or None if the circles do not intersect
+    """
+    if not a:
+        raise ValueError("a not provided")
+    if not b:
+        raise ValueError("b not provided")
+
+    dx, dy = b.center_x - a.center_x, b.center_y - a.center_y
+    rs = a.radius + b.radius
+    d2 = dx * dx + dy * dy
+    if d2 > rs * rs:
+        return None
+
+    d = math.sqrt(d2)
+    nx, ny = (dx / d, dy / d) if d > 0.0 else (1.0, 0.0)
+    return Manifold2(
+        Vec2(nx, ny),
+        rs - d,
+        [Point2(a.center_x + nx * a.radius, a.center_y + ny * a.radius)],
+    )
+
+
+def collide2(a: Poly2, b: Poly2) -> Manifold2:
+    """Narrow phase collision test of two convex shapes, dispatching on Circle2 and convex Poly2 (including Tri2 and Rect2).
+
+    Args:
+        a (Poly2 or Circle2): first shape
+        b (Poly2 or Circle2): second shape
+
+    Returns:
+        Manifold2: the contact manifold with the normal pointing from a towards b, or None if the shapes do not intersect
+    """
+    if isinstance(a, Circle2):
+        if isinstance(b, Circle2):
+            return collide_circle2(a, b)
+        m = collide_poly2_circle2(b, a)
+        return m.flip() if m is not None else None
+    if isinstance(b, Circle2):
+        return collide_poly2_circle2(a, b)
+    return collide_poly2(a, b)
+
+
+def collide2_pairs(shapes: list, pairs) -> list:
+    """Runs the narrow phase on a list of candidate pairs, e.g. as reported by overlapping_AABB2_pairs or a broadphase structure.
+
+    Args:
+        shapes (list): the shapes (Poly2, Tri2, Rect2 or Circle2)
+        pairs (np.ndarray or list): (K, 2) index pairs (i, j) into shapes
+
+    Returns:
+        list: list of (i, j, Manifold2) for the colliding pairs, the normal pointing from shapes[i] towards shapes[j]
+    """
+    if shapes is None:
+        raise ValueError("shapes not provided")
+    if pairs is None:
+        raise ValueError("pairs not provided")
+
+    if hasattr(pairs, "tolist"):
+        pairs = pairs.tolist()
+
+    contacts = []
+    for i, j in pairs:
+        m = collide2(shapes[i], shapes[j])
+        if m is not None:
+            contacts.append((i, j, m))
+    return contacts
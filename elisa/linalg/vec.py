@@ -9,6 +9,8 @@ from .linalg import is_numeric
 class Vec:
     """A general n-dimensional vector class"""
 
+    __slots__ = ("_v",)
+
     def __init__(self, v=None):
         super(Vec, self).__init__()
         if v is None:
@@ -24,10 +26,10 @@ class Vec:
                 raise ValueError("v not a Vec, list or tuple type")
 
     def __copy__(self):
-        return Vec(self.v)
+        return type(self)(self.v)
 
     def __deepcopy__(self, memo):
-        return Vec(copy.deepcopy(self.v, memo))
+        return type(self)(copy.deepcopy(self.v, memo))
 
     def __repr__(self) -> str:
         return "Vec-{}: {}".format(self.dim, self._v.__repr__())
@@ -114,7 +116,7 @@ class Vec:
             raise AttributeError("vectors are of different dimensionality")
 
         if isinstance(other, Vec):
-            return Vec([a + b for a, b in zip(self._v, other.v)])
+            return type(self)([a + b for a, b in zip(self._v, other.v)])
         elif isinstance(other, tuple) or isinstance(other, list):
             return self.__add__(Vec(other))
         elif is_numeric(other):
@@ -129,7 +131,7 @@ class Vec:
             raise AttributeError("vectors are of different dimensionality")
 
         if isinstance(other, Vec):
-            return Vec([a - b for a, b in zip(self._v, other.v)])
+            return type(self)([a - b for a, b in zip(self._v, other.v)])
         elif isinstance(other, tuple) or isinstance(other, list):
             return self.__sub__(Vec(other))
         elif is_numeric(other):
@@ -293,3 +295,11 @@ def perp_u_v(u: Vec, v: Vec) -> Vec:
     """
     p_u_v = proj_u_v(u, v)
     return u - p_u_v
+
+
+class VecN(Vec):
+    """A general n-dimensional vector whose components are held in a list, i.e. Vec under a name that sets it apart
+    from the fixed size Vec2, Vec3 and Vec4. Copies and sums of VecN instances are VecN instances again.
+    """
+
+    __slots__ = ()
@@ -6,13 +6,27 @@ from .linalg import angle_to_rad, is_numeric
 from .vec import Vec
 
 
+_NUMERIC_TYPES = (float, int)
+_new = object.__new__
+
+
 class Vec2(Vec):
     """A two-dimensional floating point vector
 
+    The components are kept in two slots rather than a list, so that creating and combining
+    vectors does not allocate anything besides the vector itself.
+
+    A Vec2 is mutable: the augmented operators (u += v, u -= v, u *= s), item assignment, set and
+    the *_into helpers change the vector in place, so every other reference to it observes the change.
+    Use u = u + v to obtain a new vector instead. The shared constants ZeroVec2 and OneVec2 never change,
+    their augmented operators return a new vector.
+
     Args:
                     Vec ([type]): [description]
     """
 
+    __slots__ = ("_x", "_y")
+
     def __init__(self, a, b=None):
         """Generates a new Vec2 instance from individual components, a tuple or an existing Vec2
 
@@ -24,49 +38,101 @@ class Vec2(Vec):
         Raises:
                         ValueError: if neither of argument types hold.
         """
-        super(Vec2, self).__init__()
-        _a = 0.0
-        _b = 0.0
-        if isinstance(a, Vec2):
-            _a = a.x
-            _b = a.y
+        # fast path, two plain numbers
+        if type(a) in _NUMERIC_TYPES and type(b) in _NUMERIC_TYPES:
+            self._x = a
+            self._y = b
+        elif isinstance(a, Vec2):
+            self._x = a._x
+            self._y = a._y
         elif isinstance(a, tuple):
-            _a = a[0]
-            _b = a[1]
+            self._x = a[0]
+            self._y = a[1]
         elif is_numeric(a) and is_numeric(b):
-            _a = a
-            _b = b
+            self._x = a
+            self._y = b
         elif a and b:
-            _a = float(a)
-            _b = float(b)
+            self._x = float(a)
+            self._y = float(b)
         else:
             raise ValueError(
                 "No value provided ... you can initialize from a vector, from a tuple or from two floats"
             )
-        self._v = [_a, _b]
+
+    @property
+    def _v(self) -> list:
+        return [self._x, self._y]
+
+    @property
+    def v(self) -> list:
+        """Returns the components as a new list [x, y]. Changing the list does not change the vector.
+
+        Returns:
+                        list: the vector components
+        """
+        return [self._x, self._y]
+
+    @property
+    def dim(self):
+        return 2
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter((self._x, self._y))
+
+    def __getitem__(self, a):
+        if a == 0:
+            return self._x
+        if a == 1:
+            return self._y
+        return Vec.__getitem__(self, a)
+
+    def __copy__(self):
+        return _vec2(self._x, self._y)
+
+    def __deepcopy__(self, memo):
+        return _vec2(self._x, self._y)
+
+    def __reduce__(self):
+        return Vec2, (self._x, self._y)
+
+    @property
+    def length(self) -> float:
+        return math.sqrt(self._x * self._x + self._y * self._y)
+
+    @property
+    def length_squared(self) -> float:
+        return self._x * self._x + self._y * self._y
 
     def __repr__(self):
-        return "Vec2[{}, {}]".format(self._v[0], self._v[1])
+        return "Vec2[{}, {}]".format(self._x, self._y)
 
     def is_zero(self):
-        return self._v[0] == 0.0 and self._v[1] == 0.0
+        return self._x == 0.0 and self._y == 0.0
 
     def __add__(self, other) -> Vec2:
-        if not other:
+        if other is None:
             raise ValueError("other not provided")
-
-        return Vec2(self._v[0] + other[0], self._v[1] + other[1])
+        if type(other) is Vec2:
+            return _vec2(self._x + other._x, self._y + other._y)
+        return _vec2(self._x + other[0], self._y + other[1])
 
     def __sub__(self, other):
-        if not other:
+        if other is None:
             raise ValueError("other not provided")
-        return Vec2(self._v[0] - other[0], self._v[1] - other[1])
+        if type(other) is Vec2:
+            return _vec2(self._x - other._x, self._y - other._y)
+        return _vec2(self._x - other[0], self._y - other[1])
 
     def __neg__(self):
-        return Vec2(-self._v[0], -self._v[1])
+        return _vec2(-self._x, -self._y)
 
     @staticmethod
     def dot(u: Vec2, v: Vec2) -> float:
+        if type(u) is Vec2 and type(v) is Vec2:
+            return u._x * v._x + u._y * v._y
         return u[0] * v[0] + u[1] * v[1]
 
     def project_onto(self, v: Vec2):
@@ -88,12 +154,14 @@ class Vec2(Vec):
         Returns:
                         [Vec2, float]: The result of multiplying the two arguments together element-wise
         """
+        if isinstance(u, Vec2) and type(v) in _NUMERIC_TYPES:
+            return _vec2(u._x * v, u._y * v)
         if isinstance(u, Vec2) and is_numeric(v):
             return Vec2(u[0] * v, u[1] * v)
         if is_numeric(u) and isinstance(v, Vec2):
             return Vec2.mul(v, u)
         if isinstance(u, Vec2) and isinstance(v, Vec2):
-            return Vec2(u[0] * v[0], u[1] * v[1])
+            return _vec2(u._x * v._x, u._y * v._y)
         if is_numeric(u) and is_numeric(v):
             return u * v
         raise ValueError("u and v must be numeric or Vec2 types")
@@ -101,19 +169,161 @@ class Vec2(Vec):
     @staticmethod
     def div(u, v):
         if isinstance(u, Vec2) and is_numeric(v):
-            return Vec2(u[0] / v, u[1] / v)
+            return _vec2(u._x / v, u._y / v)
         if is_numeric(u) and isinstance(v, Vec2):
             return Vec2.div(v, u)
         if isinstance(u, Vec2) and isinstance(v, Vec2):
-            return Vec2(u[0] / v[0], u[1] / v[1])
+            return _vec2(u._x / v._x, u._y / v._y)
         raise ValueError("u and v must be numeric or Vec2 types")
 
     def __mul__(self, other):
+        if type(other) in _NUMERIC_TYPES:
+            return _vec2(self._x * other, self._y * other)
         return Vec2.mul(self, other)
 
     def __truediv__(self, other):
         return Vec2.div(self, other)
 
+    def __iadd__(self, other) -> Vec2:
+        """In-place addition, i.e. u += v changes u instead of creating a new vector.
+        Mind that every other reference to u observes the change as well.
+
+        Args:
+                        other (Vec2, tuple): vector to add
+
+        Returns:
+                        Vec2: this instance
+        """
+        if other is None:
+            raise ValueError("other not provided")
+        self._x += other[0]
+        self._y += other[1]
+        return self
+
+    def __isub__(self, other) -> Vec2:
+        """In-place subtraction, i.e. u -= v changes u instead of creating a new vector.
+
+        Args:
+                        other (Vec2, tuple): vector to subtract
+
+        Returns:
+                        Vec2: this instance
+        """
+        if other is None:
+            raise ValueError("other not provided")
+        self._x -= other[0]
+        self._y -= other[1]
+        return self
+
+    def __imul__(self, other) -> Vec2:
+        """In-place multiplication with a numeric (uniform stretch) or a Vec2 (element-wise).
+
+        Args:
+                        other (Vec2, float): the factor
+
+        Raises:
+                        ValueError: if other is neither numeric nor a Vec2
+
+        Returns:
+                        Vec2: this instance
+        """
+        if is_numeric(other):
+            self._x *= other
+            self._y *= other
+        elif isinstance(other, Vec2):
+            self._x *= other._x
+            self._y *= other._y
+        else:
+            raise ValueError("other must be numeric or Vec2 type")
+        return self
+
+    def __setitem__(self, a, c):
+        if a == 0:
+            self._x = c
+        elif a == 1:
+            self._y = c
+        else:
+            raise ValueError("a outside of bounds")
+
+    def set(self, x, y) -> Vec2:
+        """Overwrites both components of the vector
+
+        Args:
+                        x (float): new x component
+                        y (float): new y component
+
+        Returns:
+                        Vec2: this instance
+        """
+        self._x = x
+        self._y = y
+        return self
+
+    @staticmethod
+    def add_into(out: Vec2, u: Vec2, v: Vec2) -> Vec2:
+        """Writes u + v into the existing vector out, no new vector is created. out may be u or v.
+
+        Args:
+                        out (Vec2): vector receiving the result
+                        u (Vec2): first operand
+                        v (Vec2): second operand
+
+        Returns:
+                        Vec2: out
+        """
+        out._x = u[0] + v[0]
+        out._y = u[1] + v[1]
+        return out
+
+    @staticmethod
+    def sub_into(out: Vec2, u: Vec2, v: Vec2) -> Vec2:
+        """Writes u - v into the existing vector out, no new vector is created. out may be u or v.
+
+        Args:
+                        out (Vec2): vector receiving the result
+                        u (Vec2): first operand
+                        v (Vec2): second operand
+
+        Returns:
+                        Vec2: out
+        """
+        out._x = u[0] - v[0]
+        out._y = u[1] - v[1]
+        return out
+
+    @staticmethod
+    def mul_into(out: Vec2, u: Vec2, s: float) -> Vec2:
+        """Writes u * s for a numeric s into the existing vector out. out may be u.
+
+        Args:
+                        out (Vec2): vector receiving the result
+                        u (Vec2): vector to scale
+                        s (float): scaling factor
+
+        Returns:
+                        Vec2: out
+        """
+        out._x = u[0] * s
+        out._y = u[1] * s
+        return out
+
+    @staticmethod
+    def madd_into(out: Vec2, u: Vec2, v: Vec2, s: float) -> Vec2:
+        """Writes u + v * s into the existing vector out, e.g. to step a point along a direction. out may be u or v.
+
+        Args:
+                        out (Vec2): vector receiving the result
+                        u (Vec2): base vector
+                        v (Vec2): direction vector
+                        s (float): scaling applied to v
+
+        Returns:
+                        Vec2: out
+        """
+        out._x = u[0] + v[0] * s
+        out._y = u[1] + v[1] * s
+        return out
+
     def to_unit(self):
         """Returns the two-dimensional unit vector of the underlying vec2 instance. If the input vector is the zero vector, it is directly returned.
 
@@ -123,24 +333,23 @@ class Vec2(Vec):
         if self.is_zero():
             return self
 
-        d = Vec2.magnitude(self)
-        d_inv = 1.0 / d
-        return Vec2(self.x * d_inv, self.y * d_inv)
+        d_inv = 1.0 / math.sqrt(self._x * self._x + self._y * self._y)
+        return _vec2(self._x * d_inv, self._y * d_inv)
 
     @property
     def x(self):
-        return self._v[0]
+        return self._x
 
     @property
     def y(self):
-        return self._v[1]
+        return self._y
 
     @staticmethod
     def orthogonal(v: Vec2):
         if not v:
             raise ValueError("Missing vector")
 
-        return Vec2(-v.y, v.x)
+        return _vec2(-v.y, v.x)
 
     @staticmethod
     def orthonormal(v: Vec2):
@@ -173,7 +382,7 @@ class Vec2(Vec):
 
         _x = u.x
         _y = u.y
-        return math.sqrt(_x ** 2 + _y ** 2)
+        return math.sqrt(_x * _x + _y * _y)
 
     @staticmethod
     def unit_vector(u):
@@ -200,13 +409,13 @@ class Vec2(Vec):
         Returns:
                         tuple: the vector representated as a tuple
         """
-        return self._v[0], self._v[1]
+        return self._x, self._y
 
     @staticmethod
     def from_angle(angle_rad: float, to_unit: bool = True):
         y = math.sin(angle_rad)
         x = math.cos(angle_rad)
-        v = Vec2(a=x, b=y)
+        v = _vec2(x, y)
         if to_unit:
             v = v.to_unit()
         return v
@@ -217,15 +426,53 @@ class Vec2(Vec):
         Returns:
                         [float]: The angle in radians
         """
-        return math.atan2(self.y, self.x)
+        return math.atan2(self._y, self._x)
 
     def __eq__(self, o: object) -> bool:
-        return isinstance(o, Vec2) and self.x == o.x and self.y == o.y
+        return isinstance(o, Vec2) and self._x == o._x and self._y == o._y
+
+
+def _vec2(x, y) -> Vec2:
+    # creates a Vec2 from two already validated components, skipping the argument dispatch of Vec2.__init__
+    v = _new(Vec2)
+    v._x = x
+    v._y = y
+    return v
+
+
+class _ConstVec2(Vec2):
+    """A Vec2 shared as a module constant. The augmented operators return a new vector and setting a component
+    raises, so that e.g. v = ZeroVec2; v += u leaves ZeroVec2 untouched.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, x, y):
+        object.__setattr__(self, "_x", x)
+        object.__setattr__(self, "_y", y)
+
+    def __setattr__(self, name, value):
+        raise ValueError("constant vector can not be changed")
+
+    def __iadd__(self, other) -> Vec2:
+        return _vec2(self._x, self._y).__iadd__(other)
+
+    def __isub__(self, other) -> Vec2:
+        return _vec2(self._x, self._y).__isub__(other)
+
+    def __imul__(self, other) -> Vec2:
+        return _vec2(self._x, self._y).__imul__(other)
+
+    def __setitem__(self, a, c):
+        raise ValueError("constant vector can not be changed")
+
+    def set(self, x, y) -> Vec2:
+        raise ValueError("constant vector can not be changed")
 
 
 Point2 = Vec2
-ZeroVec2 = Vec2(0, 0)
-OneVec2 = Vec2(1, 1)
+ZeroVec2 = _ConstVec2(0, 0)
+OneVec2 = _ConstVec2(1, 1)
 
 
 def proj2_u_v(u: Vec2, v: Vec2) -> Vec2:
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .linalg import is_numeric
+from .vec2 import Point2, Vec2
+
+
+class Vec2Array(object):
+    """A batch of two-dimensional vectors stored in one contiguous (N, 2) float array.
+    Vec2Array mirrors the operations of Vec2, but applies them to all of the contained vectors at once.
+    """
+
+    def __init__(self, data, dtype=np.float64):
+        """Generates a new Vec2Array instance from an (N, 2) array-like, a list of Vec2/Point2 or tuples, or an existing Vec2Array
+
+        Args:
+            data (Vec2Array, np.ndarray, list): the vectors to store. A flat array of length 2N is reshaped into (N, 2).
+            dtype (optional): floating point type of the underlying storage (np.float64 or np.float32). Defaults to np.float64.
+
+        Raises:
+            ValueError: if the data cannot be interpreted as a batch of two-dimensional vectors.
+        """
+        super(Vec2Array, self).__init__()
+        if data is None:
+            raise ValueError("data not provided")
+
+        if isinstance(data, Vec2Array):
+            _v = np.array(data.v, dtype=dtype)
+        elif isinstance(data, list) and len(data) > 0 and isinstance(data[0], Vec2):
+            _v = np.array([p.to_tuple() for p in data], dtype=dtype)
+        else:
+            _v = np.array(data, dtype=dtype)
+
+        if _v.size == 0:
+            _v = _v.reshape(0, 2)
+        elif _v.ndim == 1 and _v.shape[0] % 2 == 0:
+            _v = _v.reshape(-1, 2)
+
+        if _v.ndim != 2 or _v.shape[1] != 2:
+            raise ValueError("data cannot be interpreted as (N, 2) vectors")
+
+        self._v = np.ascontiguousarray(_v)
+
+    @classmethod
+    def _wrap(cls, v: np.ndarray) -> Vec2Array:
+        # wrap an existing (N, 2) array without copying it
+        o = cls.__new__(cls)
+        o._v = v
+        return o
+
+    @staticmethod
+    def zeros(n: int, dtype=np.float64) -> Vec2Array:
+        """Creates a batch of n zero vectors
+
+        Args:
+            n (int): number of vectors
+            dtype (optional): floating point type of the storage. Defaults to np.float64.
+
+        Returns:
+            Vec2Array: the zero vectors
+        """
+        if n < 0:
+            raise ValueError("n has to be non-negative")
+        return Vec2Array._wrap(np.zeros((n, 2), dtype=dtype))
+
+    @staticmethod
+    def from_vec2(vs: list, dtype=np.float64) -> Vec2Array:
+        """Creates a batch from a list of Vec2/Point2 instances
+
+        Args:
+            vs (list): list of Vec2 or Point2
+            dtype (optional): floating point type of the storage. Defaults to np.float64.
+
+        Returns:
+            Vec2Array: the batch holding the vectors of vs in order
+        """
+        if vs is None:
+            raise ValueError("vs not provided")
+        return Vec2Array(np.array([v.to_tuple() for v in vs], dtype=dtype).reshape(-1, 2))
+
+    def to_vec2(self) -> list:
+        """Turns the batch into a list of Vec2 instances
+
+        Returns:
+            list: list of Vec2
+        """
+        return [Vec2(float(x), float(y)) for x, y in self._v]
+
+    def to_point2(self) -> list:
+        """Turns the batch into a list of Point2 instances
+
+        Returns:
+            list: list of Point2
+        """
+        return [Point2(float(x), float(y)) for x, y in self._v]
+
+    def to_tuples(self) -> list:
+        """Turns the batch into a list of (x, y) tuples, e.g. to pass the points on to pygame.draw.polygon
+
+        Returns:
+            list: list of 2-tuples
+        """
+        return [(x, y) for x, y in self._v.tolist()]
+
+    @property
+    def v(self) -> np.ndarray:
+        return self._v
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._v[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._v[:, 1]
+
+    @property
+    def dtype(self):
+        return self._v.dtype
+
+    def __len__(self):
+        return self._v.shape[0]
+
+    def __iter__(self):
+        return iter(self.to_vec2())
+
+    def __repr__(self):
+        return "Vec2Array[{}]: {}".format(len(self), self._v.__repr__())
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            x, y = self._v[i]
+            return Vec2(float(x), float(y))
+        return Vec2Array._wrap(self._v[i])
+
+    def __setitem__(self, i, v):
+        if v is None:
+            raise ValueError("v not provided")
+        if isinstance(v, Vec2):
+            self._v[i] = v.to_tuple()
+        elif isinstance(v, Vec2Array):
+            self._v[i] = v.v
+        else:
+            self._v[i] = v
+
+    def copy(self) -> Vec2Array:
+        return Vec2Array._wrap(self._v.copy())
+
+    @staticmethod
+    def _operand(o):
+        # brings the other operand into a form that broadcasts against (N, 2)
+        if isinstance(o, Vec2Array):
+            return o.v
+        if isinstance(o, Vec2):
+            return np.array(o.to_tuple(), dtype=np.float64)
+        if isinstance(o, np.ndarray):
+            return o[:, np.newaxis] if o.ndim == 1 else o
+        if isinstance(o, tuple) and len(o) == 2 and is_numeric(o):
+            return np.array(o, dtype=np.float64)
+        if is_numeric(o):
+            return o
+        raise ValueError("other not a Vec2Array, Vec2, tuple, array or numeric type")
+
+    def __add__(self, other) -> Vec2Array:
+        return Vec2Array._wrap(self._v + Vec2Array._operand(other))
+
+    def __sub__(self, other) -> Vec2Array:
+        return Vec2Array._wrap(self._v - Vec2Array._operand(other))
+
+    def __mul__(self, other) -> Vec2Array:
+        return Vec2Array._wrap(self._v * Vec2Array._operand(other))
+
+    def __rmul__(self, other) -> Vec2Array:
+        return self.__mul__(other)
+
+    def __truediv__(self, other) -> Vec2Array:
+        return Vec2Array._wrap(self._v / Vec2Array._operand(other))
+
+    def __neg__(self) -> Vec2Array:
+        return Vec2Array._wrap(-self._v)
+
+    def __eq__(self, o: object) -> bool:
+        return isinstance(o, Vec2Array) and np.array_equal(self._v, o.v)
+
+    @staticmethod
+    def add(u: Vec2Array, v) -> Vec2Array:
+        return u + v
+
+    @staticmethod
+    def sub(u: Vec2Array, v) -> Vec2Array:
+        return u - v
+
+    @staticmethod
+    def scale(u: Vec2Array, s) -> Vec2Array:
+        """Scales every vector of u by s. s can be a single numeric, an array of N factors (one per vector)
+        or a Vec2 for non-uniform scaling.
+
+        Args:
+            u (Vec2Array): the vectors to scale
+            s (numeric, np.ndarray, Vec2): the scaling factor(s)
+
+        Returns:
+            Vec2Array: the scaled vectors
+        """
+        return u * s
+
+    @staticmethod
+    def dot(u, v) -> np.ndarray:
+        """Computes the row-wise dot product. One of u or v may also be a single Vec2 which is broadcast against the other batch.
+
+        Args:
+            u (Vec2Array, Vec2): first operand
+            v (Vec2Array, Vec2): second operand
+
+        Returns:
+            np.ndarray: array of N dot products
+        """
+        _u = Vec2Array._operand(u)
+        _v = Vec2Array._operand(v)
+        return np.einsum("...i,...i->...", _u, _v)
+
+    @property
+    def length_squared(self) -> np.ndarray:
+        return np.einsum("ij,ij->i", self._v, self._v)
+
+    @property
+    def length(self) -> np.ndarray:
+        return np.sqrt(self.length_squared)
+
+    @staticmethod
+    def magnitude(u: Vec2Array) -> np.ndarray:
+        """Computes the magnitude/ length of every vector in u
+
+        Args:
+            u (Vec2Array): the vectors
+
+        Returns:
+            np.ndarray: array of N magnitudes
+        """
+        return u.length
+
+    def to_unit(self) -> Vec2Array:
+        """Returns the unit vectors of the batch. Like Vec2.to_unit, zero vectors are returned as is.
+
+        Returns:
+            Vec2Array: the normalized vectors
+        """
+        mag = self.length
+        mag[mag == 0.0] = 1.0
+        return Vec2Array._wrap(self._v / mag[:, np.newaxis])
+
+    def normalize(self) -> Vec2Array:
+        """Normalizes the batch in-place, zero vectors are left untouched.
+
+        Returns:
+            Vec2Array: this instance
+        """
+        mag = self.length
+        mag[mag == 0.0] = 1.0
+        self._v /= mag[:, np.newaxis].astype(self._v.dtype)
+        return self
+
+    def to_orthogonal(self) -> Vec2Array:
+        return Vec2Array._wrap(np.stack((-self._v[:, 1], self._v[:, 0]), axis=1))
+
+    @staticmethod
+    def from_angle(angle_rad, length=1.0, dtype=np.float64) -> Vec2Array:
+        """Creates a batch of vectors pointing into the provided directions
+
+        Args:
+            angle_rad (array-like): angles in radians measured against the x-axis
+            length (float or array-like, optional): length of the created vectors. Defaults to 1.0.
+            dtype (optional): floating point type of the storage. Defaults to np.float64.
+
+        Returns:
+            Vec2Array: the direction vectors
+        """
+        a = np.asarray(angle_rad, dtype=dtype).ravel()
+        v = np.empty((a.shape[0], 2), dtype=dtype)
+        np.cos(a, out=v[:, 0])
+        np.sin(a, out=v[:, 1])
+        if not (is_numeric(length) and length == 1.0):
+            v *= np.asarray(length, dtype=dtype).reshape(-1, 1)
+        return Vec2Array._wrap(v)
+
+    def to_angle(self) -> np.ndarray:
+        """Returns the angles in radians formed by the vectors and the 2D x-axis
+
+        Returns:
+            np.ndarray: array of N angles in radians
+        """
+        return np.arctan2(self._v[:, 1], self._v[:, 0])
+
+    @staticmethod
+    def lerp(u, v, t) -> Vec2Array:
+        """Linear interpolation u + t * (v - u) between the vectors of u and v
+
+        Args:
+            u (Vec2Array, Vec2): start
+            v (Vec2Array, Vec2): end
+            t (float or np.ndarray): interpolation parameter, a single float or one per vector
+
+        Returns:
+            Vec2Array: the interpolated vectors
+        """
+        _u = Vec2Array._operand(u)
+        _v = Vec2Array._operand(v)
+        _t = Vec2Array._operand(t)
+        return Vec2Array._wrap(_u + (_v - _u) * _t)
+
+
+Point2Array = Vec2Array
+
+
+def as_points_array(points, dtype=np.float64) -> np.ndarray:
+    """Returns the points as an (N, 2) array. Arrays and Vec2Array instances of the requested dtype are returned without copying,
+    sequences of Vec2, Point2, Vec3 or tuples are converted (only the first two components are used).
+
+    Args:
+        points (Vec2Array, np.ndarray, list): the points
+        dtype (optional): floating point type of the result. Defaults to np.float64.
+
+    Raises:
+        ValueError: if points are not provided or cannot be interpreted as (N, 2) points.
+
+    Returns:
+        np.ndarray: (N, 2) array of points
+    """
+    if points is None:
+        raise ValueError("points not provided")
+
+    if isinstance(points, Vec2Array):
+        p = points.v
+    elif isinstance(points, np.ndarray):
+        p = points
+    else:
+        p = np.array([(q[0], q[1]) for q in points], dtype=dtype).reshape(-1, 2)
+
+    if p.ndim != 2 or p.shape[1] != 2:
+        raise ValueError("points cannot be interpreted as (N, 2) points")
+    return np.asarray(p, dtype=dtype)
@@ -4,15 +4,48 @@ from .linalg import is_numeric
 from .vec import proj_u_v
 import math
 
+_new = object.__new__
+
 
 class Vec3(object):
-    """A 3-dimensional vector with float components."""
+    """A 3-dimensional vector with float components.
+
+    A Vec3 is mutable: the augmented operators, item assignment, set and the *_into helpers change the vector in
+    place. The shared constants zero3 and one3 never change, their augmented operators return a new vector.
+    """
+
+    __slots__ = ("_x", "_y", "_z")
 
     def __init__(self, a=0.0, b=0.0, c=0.0):
-        self._v = [float(a), float(b), float(c)]
+        if type(a) is float and type(b) is float and type(c) is float:
+            self._x = a
+            self._y = b
+            self._z = c
+        else:
+            self._x = float(a)
+            self._y = float(b)
+            self._z = float(c)
+
+    @property
+    def _v(self) -> list:
+        return [self._x, self._y, self._z]
 
     def __repr__(self):
-        return "Vec3[{}, {}, {}]".format(self._v[0], self._v[1], self._v[2])
+        return "Vec3[{}, {}, {}]".format(self._x, self._y, self._z)
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self._x, self._y, self._z))
+
+    def to_tuple(self) -> tuple:
+        """Turns the vector into a tuple representation
+
+        Returns:
+                        tuple: the vector representated as a tuple
+        """
+        return self._x, self._y, self._z
 
     @staticmethod
     def is_zero(v):
@@ -27,15 +60,19 @@ class Vec3(object):
         Returns:
                         Vec3: resulting vector
         """
-        if not other:
+        if other is None:
             raise ValueError("no vector for addition provided")
-        return Vec3(self._v[0] + other[0], self._v[1] + other[1], self._v[2] + other[2])
+        if type(other) is Vec3:
+            return _vec3(self._x + other._x, self._y + other._y, self._z + other._z)
+        return Vec3(self._x + other[0], self._y + other[1], self._z + other[2])
 
     def __sub__(self, other):
-        return Vec3(self._v[0] - other[0], self._v[1] - other[1], self._v[2] - other[2])
+        if type(other) is Vec3:
+            return _vec3(self._x - other._x, self._y - other._y, self._z - other._z)
+        return Vec3(self._x - other[0], self._y - other[1], self._z - other[2])
 
     def __neg__(self):
-        return Vec3(-self._v[0], -self._v[1], -self._v[2])
+        return _vec3(-self._x, -self._y, -self._z)
 
     @staticmethod
     def dot(u: Vec3, v: Vec3) -> float:
@@ -51,29 +88,31 @@ class Vec3(object):
         Returns:
                         float: The dot product between the two vectors
         """
-        if not u or not v:
+        if u is None or v is None:
             raise ValueError("No vectors provided for dot-product computation")
+        if type(u) is Vec3 and type(v) is Vec3:
+            return u._x * v._x + u._y * v._y + u._z * v._z
         return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
 
     @staticmethod
     def mul(u, v):
         if isinstance(u, Vec3) and is_numeric(v):
-            return Vec3(u[0] * v, u[1] * v, u[2] * v)
+            return _vec3(u._x * v, u._y * v, u._z * v)
         if is_numeric(u) and isinstance(v, Vec3):
             return Vec3.mul(v, u)
         if isinstance(u, Vec3) and isinstance(v, Vec3):
-            return Vec3(u[0] * v[0], u[1] * v[1], u[2] * v[2])
+            return _vec3(u._x * v._x, u._y * v._y, u._z * v._z)
         raise ValueError("u and v must be numeric or Vec3 types")
 
     @staticmethod
     def div(u, v):
         if isinstance(u, Vec3) and is_numeric(v):
             vinv = 1.0 / v
-            return Vec3(u[0] * vinv, u[1] * vinv, u[2] * vinv)
+            return _vec3(u._x * vinv, u._y * vinv, u._z * vinv)
         if is_numeric(u) and isinstance(v, Vec3):
             return Vec3.div(v, u)
         if isinstance(u, Vec3) and isinstance(v, Vec3):
-            return Vec3(u[0] / v[0], u[1] / v[1], u[2] / v[2])
+            return _vec3(u._x / v._x, u._y / v._y, u._z / v._z)
         raise ValueError("u and v must be numeric or Vec3 types")
 
     def __mul__(self, other):
@@ -82,19 +121,149 @@ class Vec3(object):
     def __truediv__(self, other):
         return Vec3.div(self, other)
 
+    def __iadd__(self, other) -> Vec3:
+        """In-place addition, i.e. u += v changes u instead of creating a new vector.
+        Mind that every other reference to u observes the change as well.
+
+        Args:
+                        other (Vec3): vector to add
+
+        Returns:
+                        Vec3: this instance
+        """
+        if other is None:
+            raise ValueError("no vector for addition provided")
+        self._x += other[0]
+        self._y += other[1]
+        self._z += other[2]
+        return self
+
+    def __isub__(self, other) -> Vec3:
+        """In-place subtraction, i.e. u -= v changes u instead of creating a new vector.
+
+        Args:
+                        other (Vec3): vector to subtract
+
+        Returns:
+                        Vec3: this instance
+        """
+        if other is None:
+            raise ValueError("no vector for subtraction provided")
+        self._x -= other[0]
+        self._y -= other[1]
+        self._z -= other[2]
+        return self
+
+    def __imul__(self, other) -> Vec3:
+        """In-place multiplication with a numeric (uniform stretch) or a Vec3 (element-wise).
+
+        Args:
+                        other (Vec3, float): the factor
+
+        Raises:
+                        ValueError: if other is neither numeric nor a Vec3
+
+        Returns:
+                        Vec3: this instance
+        """
+        if is_numeric(other):
+            self._x *= other
+            self._y *= other
+            self._z *= other
+        elif isinstance(other, Vec3):
+            self._x *= other._x
+            self._y *= other._y
+            self._z *= other._z
+        else:
+            raise ValueError("other must be numeric or Vec3 type")
+        return self
+
+    def set(self, x: float, y: float, z: float) -> Vec3:
+        """Overwrites all components of the vector
+
+        Args:
+                        x (float): new x component
+                        y (float): new y component
+                        z (float): new z component
+
+        Returns:
+                        Vec3: this instance
+        """
+        self._x = float(x)
+        self._y = float(y)
+        self._z = float(z)
+        return self
+
+    @staticmethod
+    def add_into(out: Vec3, u: Vec3, v: Vec3) -> Vec3:
+        """Writes u + v into the existing vector out, no new vector is created. out may be u or v.
+
+        Args:
+                        out (Vec3): vector receiving the result
+                        u (Vec3): first operand
+                        v (Vec3): second operand
+
+        Returns:
+                        Vec3: out
+        """
+        out._x = u[0] + v[0]
+        out._y = u[1] + v[1]
+        out._z = u[2] + v[2]
+        return out
+
+    @staticmethod
+    def sub_into(out: Vec3, u: Vec3, v: Vec3) -> Vec3:
+        """Writes u - v into the existing vector out, no new vector is created. out may be u or v.
+
+        Args:
+                        out (Vec3): vector receiving the result
+                        u (Vec3): first operand
+                        v (Vec3): second operand
+
+        Returns:
+                        Vec3: out
+        """
+        out._x = u[0] - v[0]
+        out._y = u[1] - v[1]
+        out._z = u[2] - v[2]
+        return out
+
+    @staticmethod
+    def mul_into(out: Vec3, u: Vec3, s: float) -> Vec3:
+        """Writes u * s for a numeric s into the existing vector out. out may be u.
+
+        Args:
+                        out (Vec3): vector receiving the result
+                        u (Vec3): vector to scale
+                        s (float): scaling factor
+
+        Returns:
+                        Vec3: out
+        """
+        out._x = u[0] * s
+        out._y = u[1] * s
+        out._z = u[2] * s
+        return out
+
     @property
     def x(self):
-        return self._v[0]
+        return self._x
 
     @property
     def y(self):
-        return self._v[1]
+        return self._y
 
     @property
     def z(self):
-        return self._v[2]
+        return self._z
 
     def __getitem__(self, a):
+        if a == 0:
+            return self._x
+        if a == 1:
+            return self._y
+        if a == 2:
+            return self._z
         _a, _b = None, None
         if isinstance(a, int):
             _a, _b = a, a
@@ -130,10 +299,12 @@ class Vec3(object):
             _a, _b = a.start, a.stop
             if a.start > a.stop or a.stop > 2:
                 raise ValueError("upper index outside of bounds or invalid")
+        _v = self._v
         if _a == _b:
-            self._v[_a] = c
+            _v[_a] = c
         else:
-            self._v[_a:_b] = c
+            _v[_a:_b] = c
+        self._x, self._y, self._z = float(_v[0]), float(_v[1]), float(_v[2])
 
     @staticmethod
     def magnitude(u: Vec3) -> float:
@@ -142,7 +313,7 @@ class Vec3(object):
         _x = u.x
         _y = u.y
         _z = u.z
-        return math.sqrt(_x ** 2 + _y ** 2 + _z ** 2)
+        return math.sqrt(_x * _x + _y * _y + _z * _z)
 
     @staticmethod
     def unit_vector(u: Vec3) -> Vec3:
@@ -164,8 +335,48 @@ class Vec3(object):
         return u * linv
 
 
+def _vec3(x: float, y: float, z: float) -> Vec3:
+    # creates a Vec3 from three floats, skipping the conversion in Vec3.__init__
+    v = _new(Vec3)
+    v._x = x
+    v._y = y
+    v._z = z
+    return v
+
+
+class _ConstVec3(Vec3):
+    """A Vec3 shared as a module constant. The augmented operators return a new vector and setting a component
+    raises, so that e.g. v = zero3; v += u leaves zero3 untouched.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, x, y, z):
+        object.__setattr__(self, "_x", float(x))
+        object.__setattr__(self, "_y", float(y))
+        object.__setattr__(self, "_z", float(z))
+
+    def __setattr__(self, name, value):
+        raise ValueError("constant vector can not be changed")
+
+    def __iadd__(self, other) -> Vec3:
+        return _vec3(self._x, self._y, self._z).__iadd__(other)
+
+    def __isub__(self, other) -> Vec3:
+        return _vec3(self._x, self._y, self._z).__isub__(other)
+
+    def __imul__(self, other) -> Vec3:
+        return _vec3(self._x, self._y, self._z).__imul__(other)
+
+    def __setitem__(self, a, c):
+        raise ValueError("constant vector can not be changed")
+
+    def set(self, x: float, y: float, z: float) -> Vec3:
+        raise ValueError("constant vector can not be changed")
+
+
 # alias
 Point3 = Vec3
 
-zero3 = Vec3(0, 0, 0)
-one3 = Vec3(1, 1, 1)
+zero3 = _ConstVec3(0, 0, 0)
+one3 = _ConstVec3(1, 1, 1)
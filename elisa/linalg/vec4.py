@@ -2,19 +2,48 @@ from __future__ import annotations
 import math
 from .linalg import is_numeric
 
+_new = object.__new__
+
 
 class Vec4:
     """[summary]
     A simple 4D vector class to represent things like homogenous coordinates or rgba quadruples.
     """
 
+    __slots__ = ("_w", "_x", "_y", "_z")
+
     def __init__(self, a=0.0, b=0.0, c=0.0, d=0.0):
-        self._v = [float(a), float(b), float(c), float(d)]
+        if type(a) is float and type(b) is float and type(c) is float and type(d) is float:
+            self._w = a
+            self._x = b
+            self._y = c
+            self._z = d
+        else:
+            self._w = float(a)
+            self._x = float(b)
+            self._y = float(c)
+            self._z = float(d)
+
+    @property
+    def _v(self) -> list:
+        return [self._w, self._x, self._y, self._z]
 
     def __repr__(self):
-        return "Vec4[{}, {}, {}, {}]".format(
-            self._v[0], self._v[1], self._v[2], self._v[3]
-        )
+        return "Vec4[{}, {}, {}, {}]".format(self._w, self._x, self._y, self._z)
+
+    def __len__(self):
+        return 4
+
+    def __iter__(self):
+        return iter((self._w, self._x, self._y, self._z))
+
+    def to_tuple(self) -> tuple:
+        """Turns the vector into a tuple representation
+
+        Returns:
+                        tuple: the vector representated as a tuple
+        """
+        return self._w, self._x, self._y, self._z
 
     @staticmethod
     def is_zero(v):
@@ -29,11 +58,18 @@ class Vec4:
         Returns:
                         Vec4: The newly created vector that results from component-wise vector addition.
         """
+        if type(other) is Vec4:
+            return _vec4(
+                self._w + other._w,
+                self._x + other._x,
+                self._y + other._y,
+                self._z + other._z,
+            )
         return Vec4(
-            self._v[0] + other[0],
-            self._v[1] + other[1],
-            self._v[2] + other[2],
-            self._v[3] + other[3],
+            self._w + other[0],
+            self._x + other[1],
+            self._y + other[2],
+            self._z + other[3],
         )
 
     def __sub__(self, other):
@@ -45,15 +81,22 @@ class Vec4:
         Returns:
                         Vec4: The newly created vector that results from component-wise vector subtraction.
         """
+        if type(other) is Vec4:
+            return _vec4(
+                self._w - other._w,
+                self._x - other._x,
+                self._y - other._y,
+                self._z - other._z,
+            )
         return Vec4(
-            self._v[0] - other[0],
-            self._v[1] - other[1],
-            self._v[2] - other[2],
-            self._v[3] - other[3],
+            self._w - other[0],
+            self._x - other[1],
+            self._y - other[2],
+            self._z - other[3],
         )
 
     def __neg__(self):
-        return Vec4(-self._v[0], -self._v[1], -self._v[2], -self._v[3])
+        return _vec4(-self._w, -self._x, -self._y, -self._z)
 
     @staticmethod
     def dot(u, v):
@@ -62,22 +105,22 @@ class Vec4:
     @staticmethod
     def mul(u, v):
         if isinstance(u, Vec4) and is_numeric(v):
-            return Vec4(u[0] * v, u[1] * v, u[2] * v, u[3] * v)
+            return _vec4(u._w * v, u._x * v, u._y * v, u._z * v)
         if is_numeric(u) and isinstance(v, Vec4):
             return Vec4.mul(v, u)
         if isinstance(u, Vec4) and isinstance(v, Vec4):
-            return Vec4(u[0] * v[0], u[1] * v[1], u[2] * v[2], u[3] * v[3])
+            return _vec4(u._w * v._w, u._x * v._x, u._y * v._y, u._z * v._z)
         raise ValueError("u and v must be numeric or Vec4 types")
 
     @staticmethod
     def div(u, v):
         if isinstance(u, Vec4) and is_numeric(v):
             vinv = 1.0 / v
-            return Vec4(u[0] * vinv, u[1] * vinv, u[2] * vinv, u[3] * vinv)
+            return _vec4(u._w * vinv, u._x * vinv, u._y * vinv, u._z * vinv)
         if is_numeric(u) and isinstance(v, Vec4):
             return Vec4.div(v, u)
         if isinstance(u, Vec4) and isinstance(v, Vec4):
-            return Vec4(u[0] / v[0], u[1] / v[1], u[2] / v[2], u[3] / v[3])
+            return _vec4(u._w / v._w, u._x / v._x, u._y / v._y, u._z / v._z)
         raise ValueError("u and v must be numeric or Vec4 types")
 
     def __mul__(self, other):
@@ -88,21 +131,29 @@ class Vec4:
 
     @property
     def w(self):
-        return self._v[0]
+        return self._w
 
     @property
     def x(self):
-        return self._v[1]
+        return self._x
 
     @property
     def y(self):
-        return self._v[2]
+        return self._y
 
     @property
     def z(self):
-        return self._v[3]
+        return self._z
 
     def __getitem__(self, a):
+        if a == 0:
+            return self._w
+        if a == 1:
+            return self._x
+        if a == 2:
+            return self._y
+        if a == 3:
+            return self._z
         _a, _b = None, None
         if isinstance(a, int):
             _a, _b = a, a
@@ -123,7 +174,7 @@ class Vec4:
         _x = u.x
         _y = u.y
         _z = u.z
-        return math.sqrt(_w ** 2 + _x ** 2 + _y ** 2 + _z ** 2)
+        return math.sqrt(_w * _w + _x * _x + _y * _y + _z * _z)
 
     @staticmethod
     def unit_vector(u: Vec4) -> Vec4:
@@ -157,10 +208,27 @@ class Vec4:
             _a, _b = a.start, a.stop
             if a.start > a.stop or a.stop > 3:
                 raise ValueError("upper index outside of bounds or invalid")
+        _v = self._v
         if _a == _b:
-            self._v[_a] = c
+            _v[_a] = c
         else:
-            self._v[_a:_b] = c
+            _v[_a:_b] = c
+        self._w, self._x, self._y, self._z = (
+            float(_v[0]),
+            float(_v[1]),
+            float(_v[2]),
+            float(_v[3]),
+        )
+
+
+def _vec4(w: float, x: float, y: float, z: float) -> Vec4:
+    # creates a Vec4 from four floats, skipping the conversion in Vec4.__init__
+    v = _new(Vec4)
+    v._w = w
+    v._x = x
+    v._y = y
+    v._z = z
+    return v
 
 
 zero4 = Vec4(0, 0, 0, 0)
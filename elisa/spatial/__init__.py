@@ -0,0 +1,6 @@
+from .aabbtree import DynamicAABBTree
+from .core import bounds_of
+from .hashgrid import SpatialHashGrid
+from .quadtree import QuadTree
+from .sap import SweepAndPrune, collide_pairs
+from .systems import SpatialHashSystem, SweepAndPruneSystem
@@ -0,0 +1,555 @@
+from __future__ import annotations
+
+import math
+
+from elisa.linalg import Ray2
+
+from .core import bounds_of
+
+# A dynamic bounding volume hierarchy of axis aligned boxes, following the dynamic tree of Box2D.
+# Leaves store a fat box - the object's box grown by a margin - so that small movements do not require any change
+# of the tree. Inserting picks the sibling by the perimeter cost of the grown boxes, and the tree is kept balanced by
+# AVL like rotations on the way back up. Nodes live in parallel lists and are addressed by index, freed nodes are reused.
+
+_NULL = -1
+
+
+def _union(a: tuple, b: tuple) -> tuple:
+    return (
+        a[0] if a[0] < b[0] else b[0],
+        a[1] if a[1] < b[1] else b[1],
+        a[2] if a[2] > b[2] else b[2],
+        a[3] if a[3] > b[3] else b[3],
+    )
+
+
+def _perimeter(a: tuple) -> float:
+    return 2.0 * ((a[2] - a[0]) + (a[3] - a[1]))
+
+
+def _contains(a: tuple, b: tuple) -> bool:
+    return a[0] <= b[0] and a[1] <= b[1] and b[2] <= a[2] and b[3] <= a[3]
+
+
+class DynamicAABBTree(object):
+    """A dynamic AABB tree (bounding volume hierarchy) supporting incremental insert, remove and refit, answering
+    region, ray, and segment queries while only visiting the nodes overlapping the query.
+    Objects are identified by a hashable id (e.g. an entity id).
+    """
+
+    def __init__(self, margin: float = 1.0):
+        """Creates a new empty tree.
+
+        Args:
+            margin (float, optional): amount by which the leaf boxes are grown on either side. Defaults to 1.0.
+
+        Raises:
+            ValueError: if the margin is negative
+        """
+        super(DynamicAABBTree, self).__init__()
+        if margin < 0.0:
+            raise ValueError("margin has to be non-negative")
+        self._margin = margin
+        self._root = _NULL
+        # per node: (fat) box, parent, children, height, and for the leaves the object id and its tight box
+        self._box = []
+        self._parent = []
+        self._child1 = []
+        self._child2 = []
+        self._height = []
+        self._oid = []
+        self._tight = []
+        self._free = []
+        self._leaf = {}
+
+    @property
+    def margin(self) -> float:
+        return self._margin
+
+    @property
+    def height(self) -> int:
+        return 0 if self._root == _NULL else self._height[self._root]
+
+    def __len__(self) -> int:
+        return len(self._leaf)
+
+    def __contains__(self, oid) -> bool:
+        return oid in self._leaf
+
+    def __repr__(self) -> str:
+        return "DynamicAABBTree(margin={}): {} objects, height {}".format(
+            self._margin, len(self), self.height
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def ids(self) -> list:
+        return list(self._leaf.keys())
+
+    def bounds(self, oid) -> tuple:
+        """Returns the (tight) bounds stored for the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            tuple: (xmin, ymin, xmax, ymax)
+        """
+        return self._tight[self._leaf[oid]]
+
+    def fat_bounds(self, oid) -> tuple:
+        return self._box[self._leaf[oid]]
+
+    def _alloc(self) -> int:
+        if self._free:
+            n = self._free.pop()
+            self._parent[n] = self._child1[n] = self._child2[n] = _NULL
+            self._height[n] = 0
+            self._oid[n] = self._tight[n] = None
+            return n
+        self._box.append(None)
+        self._parent.append(_NULL)
+        self._child1.append(_NULL)
+        self._child2.append(_NULL)
+        self._height.append(0)
+        self._oid.append(None)
+        self._tight.append(None)
+        return len(self._box) - 1
+
+    def _release(self, n: int) -> None:
+        self._box[n] = self._oid[n] = self._tight[n] = None
+        self._height[n] = -1
+        self._free.append(n)
+
+    def _fatten(self, b: tuple, dx: float = 0.0, dy: float = 0.0) -> tuple:
+        m = self._margin
+        x0, y0, x1, y1 = b[0] - m, b[1] - m, b[2] + m, b[3] + m
+        # predict the movement by growing the box into the direction of the displacement
+        if dx < 0.0:
+            x0 += dx
+        else:
+            x1 += dx
+        if dy < 0.0:
+            y0 += dy
+        else:
+            y1 += dy
+        return x0, y0, x1, y1
+
+    def insert(self, oid, bounds) -> DynamicAABBTree:
+        """Inserts the object oid with the provided bounds
+
+        Args:
+            oid: hashable object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the object's bounds (xmin, ymin, xmax, ymax) or a shape providing its AABB
+
+        Raises:
+            ValueError: if the object is already contained
+
+        Returns:
+            DynamicAABBTree: this instance
+        """
+        if oid is None:
+            raise ValueError("oid not provided")
+        if oid in self._leaf:
+            raise ValueError("object {} already contained".format(oid))
+
+        b = bounds_of(bounds)
+        leaf = self._alloc()
+        self._oid[leaf] = oid
+        self._tight[leaf] = b
+        self._box[leaf] = self._fatten(b)
+        self._leaf[oid] = leaf
+        self._insert_leaf(leaf)
+        return self
+
+    def remove(self, oid) -> bool:
+        """Removes the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            bool: True if the object was removed, False if it was not contained
+        """
+        leaf = self._leaf.pop(oid, None)
+        if leaf is None:
+            return False
+        self._remove_leaf(leaf)
+        self._release(leaf)
+        return True
+
+    def move(self, oid, bounds, displacement=None) -> bool:
+        """Refits the object oid to its new bounds. As long as the bounds stay within the fat box of the leaf, only the
+        stored bounds change. Otherwise the leaf is taken out and reinserted with a new fat box, which is additionally grown
+        into the direction of the displacement if one is given.
+
+        Args:
+            oid: the object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the new bounds
+            displacement (Vec2 or tuple, optional): the expected movement until the next update. Defaults to None.
+
+        Raises:
+            ValueError: if the object is not contained
+
+        Returns:
+            bool: True if the leaf was reinserted, else False
+        """
+        leaf = self._leaf.get(oid)
+        if leaf is None:
+            raise ValueError("object {} not contained".format(oid))
+
+        b = bounds_of(bounds)
+        self._tight[leaf] = b
+        if _contains(self._box[leaf], b):
+            return False
+
+        self._remove_leaf(leaf)
+        if displacement is not None:
+            self._box[leaf] = self._fatten(b, 2.0 * displacement[0], 2.0 * displacement[1])
+        else:
+            self._box[leaf] = self._fatten(b)
+        self._insert_leaf(leaf)
+        return True
+
+    def clear(self) -> None:
+        self.__init__(self._margin)
+
+    def _insert_leaf(self, leaf: int) -> None:
+        if self._root == _NULL:
+            self._root = leaf
+            self._parent[leaf] = _NULL
+            return
+
+        box, child1, child2 = self._box, self._child1, self._child2
+        lb = box[leaf]
+
+        # descend to the sibling with the least growth in perimeter
+        index = self._root
+        while child1[index] != _NULL:
+            c1, c2 = child1[index], child2[index]
+            area = _perimeter(box[index])
+            combined = _perimeter(_union(box[index], lb))
+            # cost of making a new parent of this node and the leaf, and the cost pushed down to the children
+            cost = 2.0 * combined
+            inheritance = 2.0 * (combined - area)
+
+            cost1 = _perimeter(_union(lb, box[c1])) + inheritance
+            if child1[c1] != _NULL:
+                cost1 -= _perimeter(box[c1])
+            cost2 = _perimeter(_union(lb, box[c2])) + inheritance
+            if child1[c2] != _NULL:
+                cost2 -= _perimeter(box[c2])
+
+            if cost < cost1 and cost < cost2:
+                break
+            index = c1 if cost1 < cost2 else c2
+
+        sibling = index
+        old_parent = self._parent[sibling]
+        new_parent = self._alloc()
+        self._parent[new_parent] = old_parent
+        box[new_parent] = _union(lb, box[sibling])
+        self._height[new_parent] = self._height[sibling] + 1
+
+        if old_parent != _NULL:
+            if child1[old_parent] == sibling:
+                child1[old_parent] = new_parent
+            else:
+                child2[old_parent] = new_parent
+        else:
+            self._root = new_parent
+        child1[new_parent] = sibling
+        child2[new_parent] = leaf
+        self._parent[sibling] = new_parent
+        self._parent[leaf] = new_parent
+
+        self._refit_upwards(self._parent[leaf])
+
+    def _remove_leaf(self, leaf: int) -> None:
+        if leaf == self._root:
+            self._root = _NULL
+            return
+
+        parent = self._parent[leaf]
+        grand_parent = self._parent[parent]
+        sibling = self._child2[parent] if self._child1[parent] == leaf else self._child1[parent]
+
+        if grand_parent != _NULL:
+            if self._child1[grand_parent] == parent:
+                self._child1[grand_parent] = sibling
+            else:
+                self._child2[grand_parent] = sibling
+            self._parent[sibling] = grand_parent
+            self._release(parent)
+            self._refit_upwards(grand_parent)
+        else:
+            self._root = sibling
+            self._parent[sibling] = _NULL
+            self._release(parent)
+        self._parent[leaf] = _NULL
+
+    def _refit_upwards(self, index: int) -> None:
+        box, child1, child2, height = self._box, self._child1, self._child2, self._height
+        while index != _NULL:
+            index = self._balance(index)
+            c1, c2 = child1[index], child2[index]
+            height[index] = 1 + max(height[c1], height[c2])
+            box[index] = _union(box[c1], box[c2])
+            index = self._parent[index]
+
+    def _balance(self, a: int) -> int:
+        # rotates the higher child of a up, if the heights of the children differ by more than one
+        child1, child2, parent, height, box = self._child1, self._child2, self._parent, self._height, self._box
+        if child1[a] == _NULL or height[a] < 2:
+            return a
+
+        b, c = child1[a], child2[a]
+        balance = height[c] - height[b]
+
+        if balance > 1:
+            f, g = child1[c], child2[c]
+            child1[c] = a
+            parent[c] = parent[a]
+            parent[a] = c
+            self._replace_child(parent[c], a, c)
+            if height[f] > height[g]:
+                child2[c] = f
+                child2[a] = g
+                parent[g] = a
+                box[a] = _union(box[b], box[g])
+                box[c] = _union(box[a], box[f])
+                height[a] = 1 + max(height[b], height[g])
+                height[c] = 1 + max(height[a], height[f])
+            else:
+                child2[c] = g
+                child2[a] = f
+                parent[f] = a
+                box[a] = _union(box[b], box[f])
+                box[c] = _union(box[a], box[g])
+                height[a] = 1 + max(height[b], height[f])
+                height[c] = 1 + max(height[a], height[g])
+            return c
+
+        if balance < -1:
+            d, e = child1[b], child2[b]
+            child1[b] = a
+            parent[b] = parent[a]
+            parent[a] = b
+            self._replace_child(parent[b], a, b)
+            if height[d] > height[e]:
+                child2[b] = d
+                child1[a] = e
+                parent[e] = a
+                box[a] = _union(box[c], box[e])
+                box[b] = _union(box[a], box[d])
+                height[a] = 1 + max(height[c], height[e])
+                height[b] = 1 + max(height[a], height[d])
+            else:
+                child2[b] = e
+                child1[a] = d
+                parent[d] = a
+                box[a] = _union(box[c], box[d])
+                box[b] = _union(box[a], box[e])
+                height[a] = 1 + max(height[c], height[d])
+                height[b] = 1 + max(height[a], height[e])
+            return b
+
+        return a
+
+    def _replace_child(self, p: int, old: int, new: int) -> None:
+        if p == _NULL:
+            self._root = new
+        elif self._child1[p] == old:
+            self._child1[p] = new
+        else:
+            self._child2[p] = new
+
+    def query(self, region) -> list:
+        """Returns the ids of all objects whose bounds overlap the region. Touching bounds count as overlapping.
+
+        Args:
+            region (Rect2 or tuple): the query region (xmin, ymin, xmax, ymax)
+
+        Returns:
+            list: ids of the overlapping objects
+        """
+        xmin, ymin, xmax, ymax = bounds_of(region)
+        out = []
+        if self._root == _NULL:
+            return out
+
+        box, child1, child2 = self._box, self._child1, self._child2
+        stack = [self._root]
+        while stack:
+            n = stack.pop()
+            b = box[n]
+            if b[0] > xmax or b[2] < xmin or b[1] > ymax or b[3] < ymin:
+                continue
+            if child1[n] == _NULL:
+                t = self._tight[n]
+                if not (t[0] > xmax or t[2] < xmin or t[1] > ymax or t[3] < ymin):
+                    out.append(self._oid[n])
+            else:
+                stack.append(child1[n])
+                stack.append(child2[n])
+        return out
+
+    def query_point(self, x: float, y: float) -> list:
+        return self.query((x, y, x, y))
+
+    @staticmethod
+    def _slab(b: tuple, ox: float, oy: float, idx: float, idy: float, max_t: float) -> float:
+        # entry parameter of the ray into the box b, or None if the ray misses the box within [0, max_t]
+        t0, t1 = 0.0, max_t
+        if idx is None:
+            if ox < b[0] or ox > b[2]:
+                return None
+        else:
+            ta, tb = (b[0] - ox) * idx, (b[2] - ox) * idx
+            if ta > tb:
+                ta, tb = tb, ta
+            t0, t1 = max(t0, ta), min(t1, tb)
+        if idy is None:
+            if oy < b[1] or oy > b[3]:
+                return None
+        else:
+            ta, tb = (b[1] - oy) * idy, (b[3] - oy) * idy
+            if ta > tb:
+                ta, tb = tb, ta
+            t0, t1 = max(t0, ta), min(t1, tb)
+        return t0 if t0 <= t1 else None
+
+    def _cast(self, ox: float, oy: float, dx: float, dy: float, max_t: float, callback, first: bool) -> list:
+        hits = []
+        if self._root == _NULL:
+            return hits
+
+        idx = 1.0 / dx if dx != 0.0 else None
+        idy = 1.0 / dy if dy != 0.0 else None
+        box, child1, child2, tight, oid = self._box, self._child1, self._child2, self._tight, self._oid
+        slab = DynamicAABBTree._slab
+
+        best = max_t
+        stack = [(0.0, self._root)]
+        while stack:
+            t_enter, n = stack.pop()
+            if first and t_enter > best:
+                continue
+            if child1[n] == _NULL:
+                if callback is None:
+                    t = slab(tight[n], ox, oy, idx, idy, best if first else max_t)
+                else:
+                    t = callback(oid[n], best if first else max_t)
+                if t is None:
+                    continue
+                if first:
+                    if t <= best:
+                        best = t
+                        hits = [(t, oid[n])]
+                else:
+                    hits.append((t, oid[n]))
+                continue
+
+            limit = best if first else max_t
+            c1, c2 = child1[n], child2[n]
+            t1 = slab(box[c1], ox, oy, idx, idy, limit)
+            t2 = slab(box[c2], ox, oy, idx, idy, limit)
+            # visit the nearer child first
+            if t1 is not None and t2 is not None and t1 < t2:
+                stack.append((t2, c2))
+                stack.append((t1, c1))
+            else:
+                if t1 is not None:
+                    stack.append((t1, c1))
+                if t2 is not None:
+                    stack.append((t2, c2))
+
+        hits.sort(key=lambda h: h[0])
+        return hits
+
+    def raycast(self, ray: Ray2, max_t: float = None, callback=None) -> tuple:
+        """Finds the first object hit by the ray. Subtrees lying behind the closest hit found so far are skipped.
+        Without callback, the ray is tested against the objects' bounds. For exact tests provide callback(oid, max_t) returning
+        the ray parameter t of the hit with the object (or None on a miss), e.g. from intersection2 against the object's planes.
+
+        Args:
+            ray (Ray2): the ray
+            max_t (float, optional): maximum ray parameter, i.e. the distance for normalized rays. Defaults to None, unlimited.
+            callback (callable, optional): exact hit test callback(oid, max_t) -> t or None. Defaults to None.
+
+        Returns:
+            tuple: (t, oid) of the first hit, or None
+        """
+        if ray is None:
+            raise ValueError("ray not provided")
+        o, d = ray.origin, ray.direction
+        hits = self._cast(o.x, o.y, d.x, d.y, math.inf if max_t is None else max_t, callback, True)
+        return hits[0] if hits else None
+
+    def raycast_all(self, ray: Ray2, max_t: float = None, callback=None) -> list:
+        """Finds all objects hit by the ray, see raycast
+
+        Args:
+            ray (Ray2): the ray
+            max_t (float, optional): maximum ray parameter. Defaults to None, unlimited.
+            callback (callable, optional): exact hit test callback(oid, max_t) -> t or None. Defaults to None.
+
+        Returns:
+            list: list of (t, oid) ordered by t
+        """
+        if ray is None:
+            raise ValueError("ray not provided")
+        o, d = ray.origin, ray.direction
+        return self._cast(o.x, o.y, d.x, d.y, math.inf if max_t is None else max_t, callback, False)
+
+    def query_segment(self, p0, p1, first: bool = False, callback=None):
+        """Finds the objects crossed by the line segment from p0 to p1, e.g. for line of sight tests.
+        The hit parameters t are relative to the segment, i.e. 0 at p0 and 1 at p1.
+
+        Args:
+            p0 (Point2 or tuple): start of the segment
+            p1 (Point2 or tuple): end of the segment
+            first (bool, optional): only report the first hit. Defaults to False.
+            callback (callable, optional): exact hit test callback(oid, max_t) -> t or None. Defaults to None.
+
+        Returns:
+            list or tuple: list of (t, oid) ordered by t, or (t, oid) of the first hit (or None) if first is set
+        """
+        if p0 is None or p1 is None:
+            raise ValueError("segment end points not provided")
+        ox, oy = p0[0], p0[1]
+        hits = self._cast(ox, oy, p1[0] - ox, p1[1] - oy, 1.0, callback, first)
+        if first:
+            return hits[0] if hits else None
+        return hits
+
+    def validate(self) -> bool:
+        """Checks the structural invariants of the tree (parent links, heights and enclosing boxes), e.g. for debugging
+
+        Returns:
+            bool: True if the tree is consistent
+        """
+        if self._root == _NULL:
+            return len(self._leaf) == 0
+        leaves = 0
+        stack = [self._root]
+        while stack:
+            n = stack.pop()
+            c1, c2 = self._child1[n], self._child2[n]
+            if c1 == _NULL:
+                leaves += 1
+                if self._height[n] != 0 or self._leaf.get(self._oid[n]) != n:
+                    return False
+                continue
+            if self._parent[c1] != n or self._parent[c2] != n:
+                return False
+            if self._height[n] != 1 + max(self._height[c1], self._height[c2]):
+                return False
+            if abs(self._height[c1] - self._height[c2]) > 1:
+                return False
+            if not (_contains(self._box[n], self._box[c1]) and _contains(self._box[n], self._box[c2])):
+                return False
+            stack.append(c1)
+            stack.append(c2)
+        return leaves == len(self._leaf)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from elisa.linalg import Circle2, Poly2
+
+
+def bounds_of(o) -> tuple:
+    """Returns the axis aligned bounds (xmin, ymin, xmax, ymax) of o as used by the spatial structures.
+
+    Args:
+        o (Poly2, Rect2, Tri2, Circle2 or tuple): a shape providing an AABB, an (xmin, ymin, xmax, ymax) tuple or an (x, y) point
+
+    Raises:
+        ValueError: if o is not provided or cannot be interpreted as bounds
+
+    Returns:
+        tuple: (xmin, ymin, xmax, ymax)
+    """
+    if o is None:
+        raise ValueError("o not provided")
+
+    if isinstance(o, (Poly2, Circle2)):
+        return o.AABB
+    if len(o) == 4:
+        xmin, ymin, xmax, ymax = o
+    elif len(o) == 2:
+        xmin, ymin = o
+        xmax, ymax = xmin, ymin
+    else:
+        raise ValueError("o is neither a shape nor a bounds or point tuple")
+
+    if xmax < xmin or ymax < ymin:
+        raise ValueError("bounds not ordered as (xmin, ymin, xmax, ymax)")
+    return float(xmin), float(ymin), float(xmax), float(ymax)
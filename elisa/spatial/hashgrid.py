@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .core import bounds_of
+
+# A uniform grid over the unbounded plane. Cell (cx, cy) = floor(p / cell_size) of an object's center is hashed into a
+# fixed number of buckets. Every bucket is the head of an intrusive doubly linked list threaded through the per object
+# arrays, so inserting, moving and removing an object only touches a handful of array entries.
+# Objects are kept in the cell of their center only, queries grow the searched area by the largest half extent seen.
+
+_KEY_SHIFT = 1 << 32
+_KEY_OFFSET = 1 << 31
+
+
+class SpatialHashGrid(object):
+    """A spatial hash grid for many similarly sized moving objects, e.g. bullets, particles or NPCs.
+    Objects are axis aligned boxes given by center and half extents and identified by a hashable id (e.g. an entity id).
+    """
+
+    def __init__(self, cell_size: float, table_size: int = 4096, capacity: int = 1024):
+        """Creates a new empty grid.
+
+        Args:
+            cell_size (float): edge length of the square grid cells, ideally about the size of the stored objects
+            table_size (int, optional): number of hash buckets, rounded up to a power of two. Defaults to 4096.
+            capacity (int, optional): initial number of objects the arrays can hold, grown on demand. Defaults to 1024.
+
+        Raises:
+            ValueError: if the parameters are out of range
+        """
+        super(SpatialHashGrid, self).__init__()
+        if cell_size <= 0.0:
+            raise ValueError("cell_size has to be positive")
+        if table_size < 1:
+            raise ValueError("table_size has to be positive")
+
+        self._cell = float(cell_size)
+        self._inv_cell = 1.0 / self._cell
+        n = 1 << max(int(table_size) - 1, 0).bit_length()
+        self._mask = n - 1
+        self._head = np.full(n, -1, dtype=np.int32)
+
+        capacity = max(capacity, 1)
+        # per object slot: center, half extents, cell, bucket links and liveness
+        self._pos = np.zeros((capacity, 2), dtype=np.float64)
+        self._half = np.zeros((capacity, 2), dtype=np.float64)
+        self._cxy = np.zeros((capacity, 2), dtype=np.int64)
+        self._next = np.full(capacity, -1, dtype=np.int32)
+        self._prev = np.full(capacity, -1, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids = []
+        self._free = []
+        self._slot = {}
+        # the largest half extents ever stored, queries look this far beyond their region
+        self._max_hw = 0.0
+        self._max_hh = 0.0
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, oid) -> bool:
+        return oid in self._slot
+
+    def __repr__(self) -> str:
+        return "SpatialHashGrid(cell_size={}, buckets={}): {} objects".format(
+            self._cell, self._mask + 1, len(self)
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def ids(self) -> list:
+        return list(self._slot.keys())
+
+    def position(self, oid) -> tuple:
+        x, y = self._pos[self._slot[oid]].tolist()
+        return x, y
+
+    def bounds(self, oid) -> tuple:
+        """Returns the box (xmin, ymin, xmax, ymax) stored for the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            tuple: (xmin, ymin, xmax, ymax)
+        """
+        slot = self._slot[oid]
+        x, y = self._pos[slot].tolist()
+        hw, hh = self._half[slot].tolist()
+        return x - hw, y - hh, x + hw, y + hh
+
+    def _bucket(self, cx: int, cy: int) -> int:
+        return ((cx * 73856093) ^ (cy * 19349663)) & self._mask
+
+    def _grow(self) -> None:
+        n = self._pos.shape[0]
+        self._pos = np.concatenate((self._pos, np.zeros_like(self._pos)))
+        self._half = np.concatenate((self._half, np.zeros_like(self._half)))
+        self._cxy = np.concatenate((self._cxy, np.zeros_like(self._cxy)))
+        self._next = np.concatenate((self._next, np.full(n, -1, dtype=np.int32)))
+        self._prev = np.concatenate((self._prev, np.full(n, -1, dtype=np.int32)))
+        self._alive = np.concatenate((self._alive, np.zeros(n, dtype=bool)))
+
+    def _link(self, slot: int, cx: int, cy: int) -> None:
+        self._cxy[slot] = cx, cy
+        b = self._bucket(cx, cy)
+        h = int(self._head[b])
+        self._prev[slot] = -1
+        self._next[slot] = h
+        if h >= 0:
+            self._prev[h] = slot
+        self._head[b] = slot
+
+    def _unlink(self, slot: int) -> None:
+        p, n = int(self._prev[slot]), int(self._next[slot])
+        if p >= 0:
+            self._next[p] = n
+        else:
+            cx, cy = self._cxy[slot].tolist()
+            self._head[self._bucket(cx, cy)] = n
+        if n >= 0:
+            self._prev[n] = p
+
+    def insert(self, oid, x: float, y: float, hw: float = 0.0, hh: float = None) -> SpatialHashGrid:
+        """Inserts the object oid as box centered at (x, y)
+
+        Args:
+            oid: hashable object id
+            x (float): x coordinate of the center
+            y (float): y coordinate of the center
+            hw (float, optional): half width of the object. Defaults to 0.0, i.e. a point.
+            hh (float, optional): half height of the object. Defaults to None, i.e. hw.
+
+        Raises:
+            ValueError: if the object is already contained or the extents are negative
+
+        Returns:
+            SpatialHashGrid: this instance
+        """
+        if oid is None:
+            raise ValueError("oid not provided")
+        if oid in self._slot:
+            raise ValueError("object {} already contained".format(oid))
+        hh = hw if hh is None else hh
+        if hw < 0.0 or hh < 0.0:
+            raise ValueError("extents have to be non-negative")
+
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = oid
+        else:
+            slot = len(self._ids)
+            if slot == self._pos.shape[0]:
+                self._grow()
+            self._ids.append(oid)
+        self._slot[oid] = slot
+
+        self._pos[slot] = x, y
+        self._half[slot] = hw, hh
+        self._alive[slot] = True
+        self._max_hw = max(self._max_hw, hw)
+        self._max_hh = max(self._max_hh, hh)
+        self._link(slot, math.floor(x * self._inv_cell), math.floor(y * self._inv_cell))
+        return self
+
+    def insert_bounds(self, oid, bounds) -> SpatialHashGrid:
+        """Inserts the object oid from its bounds
+
+        Args:
+            oid: hashable object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the object's bounds (xmin, ymin, xmax, ymax) or a shape providing its AABB
+
+        Returns:
+            SpatialHashGrid: this instance
+        """
+        xmin, ymin, xmax, ymax = bounds_of(bounds)
+        return self.insert(
+            oid, (xmin + xmax) * 0.5, (ymin + ymax) * 0.5, (xmax - xmin) * 0.5, (ymax - ymin) * 0.5
+        )
+
+    def move(self, oid, x: float, y: float) -> bool:
+        """Moves the center of object oid to (x, y)
+
+        Args:
+            oid: the object id
+            x (float): new x coordinate of the center
+            y (float): new y coordinate of the center
+
+        Raises:
+            ValueError: if the object is not contained
+
+        Returns:
+            bool: True if the object changed its cell, else False
+        """
+        slot = self._slot.get(oid)
+        if slot is None:
+            raise ValueError("object {} not contained".format(oid))
+
+        self._pos[slot] = x, y
+        cx, cy = math.floor(x * self._inv_cell), math.floor(y * self._inv_cell)
+        ocx, ocy = self._cxy[slot].tolist()
+        if cx == ocx and cy == ocy:
+            return False
+        self._unlink(slot)
+        self._link(slot, cx, cy)
+        return True
+
+    def move_many(self, oids: list, positions) -> int:
+        """Moves many objects at once. New cells are computed in one vectorized pass and only the objects
+        changing their cell are relinked.
+
+        Args:
+            oids (list): the object ids
+            positions (np.ndarray, Vec2Array or list): (N, 2) new centers
+
+        Raises:
+            ValueError: if the number of ids and positions differ
+
+        Returns:
+            int: number of objects that changed their cell
+        """
+        if oids is None:
+            raise ValueError("oids not provided")
+        if positions is None:
+            raise ValueError("positions not provided")
+
+        p = positions.v if hasattr(positions, "v") else positions
+        p = np.asarray([(q[0], q[1]) for q in p] if isinstance(p, list) else p, dtype=np.float64).reshape(-1, 2)
+        if p.shape[0] != len(oids):
+            raise ValueError("number of oids and positions differ")
+        if p.shape[0] == 0:
+            return 0
+
+        slots = np.fromiter((self._slot[oid] for oid in oids), dtype=np.intp, count=len(oids))
+        self._pos[slots] = p
+        cxy = np.floor(p * self._inv_cell).astype(np.int64)
+        changed = np.flatnonzero(np.any(cxy != self._cxy[slots], axis=1))
+        for i, (cx, cy) in zip(changed.tolist(), cxy[changed].tolist()):
+            slot = int(slots[i])
+            self._unlink(slot)
+            self._link(slot, cx, cy)
+        return changed.shape[0]
+
+    def remove(self, oid) -> bool:
+        """Removes the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            bool: True if the object was removed, False if it was not contained
+        """
+        slot = self._slot.pop(oid, None)
+        if slot is None:
+            return False
+        self._unlink(slot)
+        self._alive[slot] = False
+        self._ids[slot] = None
+        self._free.append(slot)
+        return True
+
+    def clear(self) -> None:
+        self._head[:] = -1
+        self._alive[:] = False
+        self._ids, self._free, self._slot = [], [], {}
+        self._max_hw = self._max_hh = 0.0
+
+    def _candidates(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        # slots of all objects whose cell lies within the region grown by the largest half extents
+        cx0 = math.floor((xmin - self._max_hw) * self._inv_cell)
+        cx1 = math.floor((xmax + self._max_hw) * self._inv_cell)
+        cy0 = math.floor((ymin - self._max_hh) * self._inv_cell)
+        cy1 = math.floor((ymax + self._max_hh) * self._inv_cell)
+
+        n = len(self._ids)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) * 4 > len(self._slot):
+            # walking that many cells costs more than one vectorized pass over all objects
+            c = self._cxy[:n]
+            m = self._alive[:n] & (c[:, 0] >= cx0) & (c[:, 0] <= cx1) & (c[:, 1] >= cy0) & (c[:, 1] <= cy1)
+            return np.flatnonzero(m)
+
+        head, nxt, cxy = self._head, self._next, self._cxy
+        out = []
+        buckets = {self._bucket(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)}
+        for b in buckets:
+            s = int(head[b])
+            while s >= 0:
+                out.append(s)
+                s = int(nxt[s])
+        out = np.array(out, dtype=np.intp)
+        # drop the objects of other cells sharing the buckets
+        c = cxy[out]
+        m = (c[:, 0] >= cx0) & (c[:, 0] <= cx1) & (c[:, 1] >= cy0) & (c[:, 1] <= cy1)
+        return out[m]
+
+    def _result(self, slots: np.ndarray) -> list:
+        ids = self._ids
+        return [ids[s] for s in slots.tolist()]
+
+    def query(self, region) -> list:
+        """Returns the ids of all objects whose boxes overlap the region. Touching boxes count as overlapping.
+
+        Args:
+            region (Rect2 or tuple): the query region (xmin, ymin, xmax, ymax)
+
+        Returns:
+            list: ids of the overlapping objects
+        """
+        xmin, ymin, xmax, ymax = bounds_of(region)
+        s = self._candidates(xmin, ymin, xmax, ymax)
+        p, h = self._pos[s], self._half[s]
+        hit = (
+            (p[:, 0] - h[:, 0] <= xmax)
+            & (p[:, 0] + h[:, 0] >= xmin)
+            & (p[:, 1] - h[:, 1] <= ymax)
+            & (p[:, 1] + h[:, 1] >= ymin)
+        )
+        return self._result(s[hit])
+
+    def query_point(self, x: float, y: float) -> list:
+        return self.query((x, y, x, y))
+
+    def query_radius(self, x: float, y: float, r: float) -> list:
+        """Returns the ids of all objects whose boxes intersect the circle of radius r around (x, y)
+
+        Args:
+            x (float): x coordinate of the center
+            y (float): y coordinate of the center
+            r (float): radius
+
+        Returns:
+            list: ids of the objects within reach
+        """
+        if r < 0.0:
+            raise ValueError("r has to be non-negative")
+        s = self._candidates(x - r, y - r, x + r, y + r)
+        p, h = self._pos[s], self._half[s]
+        dx = np.maximum(np.abs(p[:, 0] - x) - h[:, 0], 0.0)
+        dy = np.maximum(np.abs(p[:, 1] - y) - h[:, 1], 0.0)
+        return self._result(s[dx * dx + dy * dy <= r * r])
+
+    def pair_slots(self, max_distance: float = None) -> np.ndarray:
+        """Finds all pairs of neighboring objects in one vectorized pass over the occupied cells.
+        Without max_distance, the pairs of overlapping boxes are reported, else the pairs with centers at most max_distance apart.
+
+        Args:
+            max_distance (float, optional): maximum distance of the centers. Defaults to None.
+
+        Returns:
+            np.ndarray: (K, 2) array of internal slot pairs, see pairs for the id form
+        """
+        act = np.flatnonzero(self._alive[: len(self._ids)])
+        if act.shape[0] < 2:
+            return np.empty((0, 2), dtype=np.intp)
+
+        if max_distance is None:
+            reach_x, reach_y = 2.0 * self._max_hw, 2.0 * self._max_hh
+        else:
+            if max_distance < 0.0:
+                raise ValueError("max_distance has to be non-negative")
+            reach_x = reach_y = max_distance
+        rx = int(math.ceil(reach_x * self._inv_cell))
+        ry = int(math.ceil(reach_y * self._inv_cell))
+
+        c = self._cxy[act]
+        key = c[:, 0] * _KEY_SHIFT + (c[:, 1] + _KEY_OFFSET)
+        order = np.argsort(key, kind="stable")
+        ks, sl = key[order], act[order]
+        m = ks.shape[0]
+        idx = np.arange(m)
+
+        out = []
+        for dx in range(0, rx + 1):
+            for dy in range(-ry, ry + 1):
+                if dx == 0 and dy < 0:
+                    continue
+                target = ks + (dx * _KEY_SHIFT + dy)
+                hi = np.searchsorted(ks, target, side="right")
+                # within the own cell, every pair is taken once
+                lo = idx + 1 if dx == 0 and dy == 0 else np.searchsorted(ks, target, side="left")
+                cnt = np.maximum(hi - lo, 0)
+                total = int(cnt.sum())
+                if total == 0:
+                    continue
+                ii = np.repeat(idx, cnt)
+                jj = lo[ii] + (np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+                out.append(np.stack((sl[ii], sl[jj]), axis=1))
+
+        if not out:
+            return np.empty((0, 2), dtype=np.intp)
+        pairs = np.concatenate(out)
+
+        pa, pb = self._pos[pairs[:, 0]], self._pos[pairs[:, 1]]
+        d = np.abs(pa - pb)
+        if max_distance is None:
+            keep = np.all(d <= self._half[pairs[:, 0]] + self._half[pairs[:, 1]], axis=1)
+        else:
+            keep = np.einsum("ij,ij->i", d, d) <= max_distance * max_distance
+        return pairs[keep]
+
+    def pairs(self, max_distance: float = None) -> list:
+        """Finds all pairs of neighboring objects, see pair_slots
+
+        Args:
+            max_distance (float, optional): maximum distance of the centers. Defaults to None, i.e. overlapping boxes.
+
+        Returns:
+            list: list of (id, id) tuples, every pair reported once
+        """
+        ids = self._ids
+        return [(ids[a], ids[b]) for a, b in self.pair_slots(max_distance).tolist()]
+
+    def sync(self, entities: list, hw: float = 0.0, hh: float = None, component_type: str = "Transform2D") -> int:
+        """Brings the grid in line with the positions of the entities' Transform2DComponent. Entities are keyed by their id,
+        new entities are inserted and known ones moved. Ids of the grid that are not among the active entities with the
+        component are removed.
+
+        Args:
+            entities (list): the entities
+            hw (float, optional): half width of newly inserted entities. Defaults to 0.0.
+            hh (float, optional): half height of newly inserted entities. Defaults to None, i.e. hw.
+            component_type (str, optional): type name of the transform component. Defaults to "Transform2D".
+
+        Returns:
+            int: number of entities that changed their cell
+        """
+        if entities is None:
+            raise ValueError("entities not provided")
+
+        known, positions, seen = [], [], set()
+        for e in entities:
+            if not e.is_active or not e.has_component_type(component_type):
+                continue
+            seen.add(e.id)
+            p = e.get_of_type(component_type).position
+            if e.id in self._slot:
+                known.append(e.id)
+                positions.append((p.x, p.y))
+            else:
+                self.insert(e.id, p.x, p.y, hw, hh)
+        for oid in [oid for oid in self._slot if oid not in seen]:
+            self.remove(oid)
+        return self.move_many(known, np.array(positions, dtype=np.float64).reshape(-1, 2))
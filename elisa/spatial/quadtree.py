@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .core import bounds_of
+
+# A loose quad tree. Every node covers a quadrant of its parent (the tight cell), but accepts objects
+# reaching beyond the cell as long as they stay within the loose bounds - the cell grown by the looseness factor.
+# An object is kept in the deepest node whose loose bounds can hold it and whose cell contains the object's center.
+# The node follows from the object's center and size directly, i.e. no descent through the tree is required,
+# and an object moving a little within its cell stays where it is.
+# Nodes are addressed by (depth, ix, iy) and only exist as long as their subtree holds objects.
+
+
+class QuadTree(object):
+    """A loose quad tree over axis aligned bounds. Objects are identified by a hashable id (e.g. an entity id),
+    their bounds are held in one compact (N, 4) array and queries return the ids of the matching objects.
+    """
+
+    def __init__(
+        self,
+        area,
+        max_depth: int = 8,
+        looseness: float = 2.0,
+        capacity: int = 64,
+    ):
+        """Creates a new empty quad tree covering area.
+
+        Args:
+            area (Rect2 or tuple): the world bounds (xmin, ymin, xmax, ymax). Objects outside are still accepted, but kept at
+                the border cells or further up the tree.
+            max_depth (int, optional): depth of the deepest nodes. Defaults to 8.
+            looseness (float, optional): size of the loose node bounds relative to the node's cell, >= 1. Defaults to 2.0.
+            capacity (int, optional): initial number of objects the bounds storage can hold. Defaults to 64.
+
+        Raises:
+            ValueError: if the parameters are out of range
+        """
+        super(QuadTree, self).__init__()
+        if area is None:
+            raise ValueError("area not provided")
+        if max_depth < 0:
+            raise ValueError("max_depth has to be non-negative")
+        if looseness < 1.0:
+            raise ValueError("looseness has to be >= 1")
+
+        self._x0, self._y0, x1, y1 = bounds_of(area)
+        self._w, self._h = x1 - self._x0, y1 - self._y0
+        if self._w <= 0.0 or self._h <= 0.0:
+            raise ValueError("area has to be non-empty")
+
+        self._max_depth = max_depth
+        self._looseness = looseness
+        # margin of the loose bounds on either side of a cell, relative to the cell size
+        self._margin = (looseness - 1.0) * 0.5
+
+        # per object slot: bounds, id and node
+        self._b = np.zeros((max(capacity, 1), 4), dtype=np.float64)
+        self._ids = []
+        self._node_of = []
+        self._free = []
+        self._slot = {}
+
+        # node key (depth, ix, iy) -> set of slots, and number of objects in the node's subtree
+        self._nodes = {}
+        self._count = {}
+
+    @property
+    def area(self) -> tuple:
+        return self._x0, self._y0, self._x0 + self._w, self._y0 + self._h
+
+    @property
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    @property
+    def looseness(self) -> float:
+        return self._looseness
+
+    @property
+    def depth(self) -> int:
+        """Depth of the deepest node currently holding objects
+
+        Returns:
+            int: the depth
+        """
+        return max([k[0] for k in self._nodes], default=0)
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, oid) -> bool:
+        return oid in self._slot
+
+    def __repr__(self) -> str:
+        return "QuadTree(max_depth={}, looseness={}): {} with {} objects".format(
+            self._max_depth, self._looseness, self.area, len(self)
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def ids(self) -> list:
+        return list(self._slot.keys())
+
+    def bounds(self, oid) -> tuple:
+        """Returns the bounds stored for the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            tuple: (xmin, ymin, xmax, ymax)
+        """
+        x0, y0, x1, y1 = self._b[self._slot[oid]].tolist()
+        return x0, y0, x1, y1
+
+    def _depth(self, xmin: float, ymin: float, xmax: float, ymax: float) -> int:
+        # the size class of the box, i.e. the deepest level whose loose bounds are large enough to hold it
+        size = max((xmax - xmin) / self._w, (ymax - ymin) / self._h)
+        if size <= 0.0:
+            return self._max_depth
+        if self._margin == 0.0:
+            return 0
+        # a box fits the loose bounds of a cell at depth d if size <= 2 * margin * 2^-d
+        return min(max(math.floor(math.log2(2.0 * self._margin / size)), 0), self._max_depth)
+
+    def _key(self, xmin: float, ymin: float, xmax: float, ymax: float) -> tuple:
+        # the deepest node whose loose bounds hold the box, found from the box size and center
+        d = self._depth(xmin, ymin, xmax, ymax)
+        n = 1 << d
+        # objects beyond the world border go to the closest border cell
+        u = min(max(((xmin + xmax) * 0.5 - self._x0) / self._w, 0.0), 1.0)
+        v = min(max(((ymin + ymax) * 0.5 - self._y0) / self._h, 0.0), 1.0)
+        ix, iy = min(int(u * n), n - 1), min(int(v * n), n - 1)
+        # climb up, if the box reaches beyond the loose bounds (world border or rounding at the size class borders)
+        while d > 0 and not self._holds((d, ix, iy), xmin, ymin, xmax, ymax):
+            d, ix, iy = d - 1, ix >> 1, iy >> 1
+        return d, ix, iy
+
+    def _loose_bounds(self, key: tuple) -> tuple:
+        d, ix, iy = key
+        cw, ch = self._w / (1 << d), self._h / (1 << d)
+        mx, my = cw * self._margin, ch * self._margin
+        x0, y0 = self._x0 + ix * cw, self._y0 + iy * ch
+        return x0 - mx, y0 - my, x0 + cw + mx, y0 + ch + my
+
+    def _holds(self, key: tuple, xmin, ymin, xmax, ymax) -> bool:
+        lx0, ly0, lx1, ly1 = self._loose_bounds(key)
+        return lx0 <= xmin and ly0 <= ymin and xmax <= lx1 and ymax <= ly1
+
+    def _link(self, slot: int, key: tuple) -> None:
+        self._node_of[slot] = key
+        s = self._nodes.get(key)
+        if s is None:
+            s = self._nodes[key] = set()
+        s.add(slot)
+        d, ix, iy = key
+        for _ in range(d + 1):
+            k = (d, ix, iy)
+            self._count[k] = self._count.get(k, 0) + 1
+            d, ix, iy = d - 1, ix >> 1, iy >> 1
+
+    def _unlink(self, slot: int) -> None:
+        key = self._node_of[slot]
+        s = self._nodes[key]
+        s.discard(slot)
+        if not s:
+            del self._nodes[key]
+        d, ix, iy = key
+        for _ in range(d + 1):
+            k = (d, ix, iy)
+            c = self._count[k] - 1
+            if c == 0:
+                del self._count[k]
+            else:
+                self._count[k] = c
+            d, ix, iy = d - 1, ix >> 1, iy >> 1
+
+    def _new_slot(self, oid) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = oid
+        else:
+            slot = len(self._ids)
+            if slot == self._b.shape[0]:
+                self._b = np.concatenate((self._b, np.zeros_like(self._b)))
+            self._ids.append(oid)
+            self._node_of.append(None)
+        self._slot[oid] = slot
+        return slot
+
+    def insert(self, oid, bounds) -> QuadTree:
+        """Inserts the object oid with the provided bounds
+
+        Args:
+            oid: hashable object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the object's bounds (xmin, ymin, xmax, ymax) or a shape providing its AABB
+
+        Raises:
+            ValueError: if the object is already contained
+
+        Returns:
+            QuadTree: this instance
+        """
+        if oid is None:
+            raise ValueError("oid not provided")
+        if oid in self._slot:
+            raise ValueError("object {} already contained".format(oid))
+
+        b = bounds_of(bounds)
+        slot = self._new_slot(oid)
+        self._b[slot] = b
+        self._link(slot, self._key(*b))
+        return self
+
+    def insert_many(self, oids: list, bounds) -> QuadTree:
+        """Bulk loads many objects at once. The node of every object is determined in one vectorized pass.
+
+        Args:
+            oids (list): the hashable object ids
+            bounds (np.ndarray or list): (N, 4) array of bounds (xmin, ymin, xmax, ymax), or list of shapes/ bounds tuples
+
+        Raises:
+            ValueError: if the number of ids and bounds differ or an object is already contained
+
+        Returns:
+            QuadTree: this instance
+        """
+        if oids is None:
+            raise ValueError("oids not provided")
+        if bounds is None:
+            raise ValueError("bounds not provided")
+
+        if isinstance(bounds, np.ndarray):
+            b = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        else:
+            b = np.array([bounds_of(o) for o in bounds], dtype=np.float64).reshape(-1, 4)
+        if b.shape[0] != len(oids):
+            raise ValueError("number of oids and bounds differ")
+        if any([oid in self._slot for oid in oids]) or len(set(oids)) != len(oids):
+            raise ValueError("oids not unique")
+        if b.shape[0] == 0:
+            return self
+
+        size = np.maximum((b[:, 2] - b[:, 0]) / self._w, (b[:, 3] - b[:, 1]) / self._h)
+        d = np.full(b.shape[0], self._max_depth, dtype=np.int64)
+        sized = size > 0.0
+        if self._margin == 0.0:
+            d[sized] = 0
+        else:
+            fit = np.floor(np.log2(2.0 * self._margin / size[sized]))
+            d[sized] = np.clip(fit, 0, self._max_depth).astype(np.int64)
+        n = np.left_shift(1, d)
+        u = np.clip(((b[:, 0] + b[:, 2]) * 0.5 - self._x0) / self._w, 0.0, 1.0)
+        v = np.clip(((b[:, 1] + b[:, 3]) * 0.5 - self._y0) / self._h, 0.0, 1.0)
+        ix = np.minimum((u * n).astype(np.int64), n - 1)
+        iy = np.minimum((v * n).astype(np.int64), n - 1)
+
+        # climb up where the boxes reach beyond the loose bounds, as _key does for single objects
+        while True:
+            cw, ch = self._w / n, self._h / n
+            mx, my = cw * self._margin, ch * self._margin
+            lx0, ly0 = self._x0 + ix * cw - mx, self._y0 + iy * ch - my
+            spill = (d > 0) & (
+                (b[:, 0] < lx0)
+                | (b[:, 1] < ly0)
+                | (b[:, 2] > lx0 + cw + 2 * mx)
+                | (b[:, 3] > ly0 + ch + 2 * my)
+            )
+            if not spill.any():
+                break
+            d[spill] -= 1
+            ix[spill] >>= 1
+            iy[spill] >>= 1
+            n = np.left_shift(1, d)
+
+        for oid, bi, key in zip(oids, b, zip(d.tolist(), ix.tolist(), iy.tolist())):
+            slot = self._new_slot(oid)
+            self._b[slot] = bi
+            self._link(slot, key)
+        return self
+
+    @staticmethod
+    def bulk_load(area, oids: list, bounds, max_depth: int = 8, looseness: float = 2.0) -> QuadTree:
+        """Creates a quad tree over area holding the provided objects, see insert_many
+
+        Returns:
+            QuadTree: the new tree
+        """
+        t = QuadTree(area, max_depth=max_depth, looseness=looseness, capacity=len(oids))
+        return t.insert_many(oids, bounds)
+
+    def remove(self, oid) -> bool:
+        """Removes the object oid
+
+        Args:
+            oid: the object id
+
+        Returns:
+            bool: True if the object was removed, False if it was not contained
+        """
+        slot = self._slot.pop(oid, None)
+        if slot is None:
+            return False
+        self._unlink(slot)
+        self._ids[slot] = None
+        self._node_of[slot] = None
+        self._free.append(slot)
+        return True
+
+    def move(self, oid, bounds) -> bool:
+        """Updates the bounds of the object oid. The object only changes its node, if it left the loose bounds of its node
+        or changed its size class. Otherwise only the stored bounds are updated. Moving to a different node costs O(depth).
+
+        Args:
+            oid: the object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the new bounds
+
+        Raises:
+            ValueError: if the object is not contained
+
+        Returns:
+            bool: True if the object changed its node, else False
+        """
+        slot = self._slot.get(oid)
+        if slot is None:
+            raise ValueError("object {} not contained".format(oid))
+
+        b = bounds_of(bounds)
+        self._b[slot] = b
+        key = self._node_of[slot]
+        # stay put while the object still fits the loose bounds and did not grow out of the node's size class,
+        # objects at the root are always given the chance to sink down
+        if key[0] > 0 and self._depth(*b) >= key[0] and self._holds(key, *b):
+            return False
+        new_key = self._key(*b)
+        if new_key == key:
+            return False
+
+        self._unlink(slot)
+        self._link(slot, new_key)
+        return True
+
+    def clear(self) -> None:
+        self._ids, self._node_of, self._free = [], [], []
+        self._slot, self._nodes, self._count = {}, {}, {}
+
+    def _candidates(self, xmin: float, ymin: float, xmax: float, ymax: float) -> list:
+        # slots of all objects in nodes whose loose bounds overlap the region
+        out = []
+        nodes, count = self._nodes, self._count
+        x0, y0, m = self._x0, self._y0, self._margin
+        stack = [(0, 0, 0)]
+        while stack:
+            key = stack.pop()
+            s = nodes.get(key)
+            if s:
+                out.extend(s)
+            d, ix, iy = key
+            if d == self._max_depth:
+                continue
+            d, ix, iy = d + 1, ix << 1, iy << 1
+            cw, ch = self._w / (1 << d), self._h / (1 << d)
+            mx, my = cw * m, ch * m
+            for c in ((d, ix, iy), (d, ix + 1, iy), (d, ix, iy + 1), (d, ix + 1, iy + 1)):
+                if c in count:
+                    lx0, ly0 = x0 + c[1] * cw - mx, y0 + c[2] * ch - my
+                    if lx0 <= xmax and lx0 + cw + 2 * mx >= xmin and ly0 <= ymax and ly0 + ch + 2 * my >= ymin:
+                        stack.append(c)
+        return out
+
+    def _result(self, slots: list, hit: np.ndarray) -> list:
+        ids = self._ids
+        return [ids[slots[i]] for i in np.flatnonzero(hit).tolist()]
+
+    def query(self, region) -> list:
+        """Returns the ids of all objects whose bounds overlap the region. Touching bounds count as overlapping.
+
+        Args:
+            region (Rect2 or tuple): the query region (xmin, ymin, xmax, ymax)
+
+        Returns:
+            list: ids of the overlapping objects
+        """
+        xmin, ymin, xmax, ymax = bounds_of(region)
+        slots = self._candidates(xmin, ymin, xmax, ymax)
+        if not slots:
+            return []
+        b = self._b[slots]
+        hit = (b[:, 0] <= xmax) & (b[:, 2] >= xmin) & (b[:, 1] <= ymax) & (b[:, 3] >= ymin)
+        return self._result(slots, hit)
+
+    def query_point(self, x: float, y: float) -> list:
+        """Returns the ids of all objects whose bounds contain the point (x, y)
+
+        Args:
+            x (float): x coordinate
+            y (float): y coordinate
+
+        Returns:
+            list: ids of the objects containing the point
+        """
+        return self.query((x, y, x, y))
+
+    def query_radius(self, x: float, y: float, r: float) -> list:
+        """Returns the ids of all objects whose bounds intersect the circle of radius r around (x, y)
+
+        Args:
+            x (float): x coordinate of the center
+            y (float): y coordinate of the center
+            r (float): radius
+
+        Returns:
+            list: ids of the objects within reach
+        """
+        if r < 0.0:
+            raise ValueError("r has to be non-negative")
+        slots = self._candidates(x - r, y - r, x + r, y + r)
+        if not slots:
+            return []
+        b = self._b[slots]
+        # distance to the closest point of every box
+        dx = np.maximum(np.maximum(b[:, 0] - x, x - b[:, 2]), 0.0)
+        dy = np.maximum(np.maximum(b[:, 1] - y, y - b[:, 3]), 0.0)
+        return self._result(slots, dx * dx + dy * dy <= r * r)
+
+    def nodes(self):
+        """Iterates over the tight cell bounds (xmin, ymin, xmax, ymax) of all nodes holding objects in their subtree, e.g. for debug drawing
+
+        Yields:
+            tuple: (depth, xmin, ymin, xmax, ymax)
+        """
+        for d, ix, iy in self._count:
+            cw, ch = self._w / (1 << d), self._h / (1 << d)
+            x0, y0 = self._x0 + ix * cw, self._y0 + iy * ch
+            yield d, x0, y0, x0 + cw, y0 + ch
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import numpy as np
+
+from elisa.linalg.sat2 import collide2
+
+from .core import bounds_of
+
+# Sweep and prune keeps the boxes ordered by their lower bound along one axis. From one frame to the next most objects
+# barely move, so the order from the previous frame is almost right and an insertion sort repairs it in close to linear
+# time. The sweep over the ordered boxes then only compares boxes whose intervals on the sort axis overlap.
+# Comparing the pairs of consecutive updates yields the begin, persist and end events.
+
+_PAIR_SHIFT = 1 << 32
+
+
+class SweepAndPrune(object):
+    """A persistent sweep and prune broadphase over axis aligned boxes identified by a hashable id (e.g. an entity id).
+    Call update once per frame after moving the objects to obtain the overlap events.
+    """
+
+    def __init__(self, axis: int = 0, capacity: int = 64):
+        """Creates a new empty broadphase
+
+        Args:
+            axis (int, optional): the sort axis, 0 for x and 1 for y. Pick the axis along which the objects are spread the most. Defaults to 0.
+            capacity (int, optional): initial number of objects the bounds storage can hold. Defaults to 64.
+
+        Raises:
+            ValueError: if the axis is neither 0 nor 1
+        """
+        super(SweepAndPrune, self).__init__()
+        if axis not in (0, 1):
+            raise ValueError("axis has to be 0 (x) or 1 (y)")
+        self._axis = axis
+        self._b = np.zeros((max(capacity, 1), 4), dtype=np.float64)
+        # lower bounds along the sort axis, as plain list for the insertion sort
+        self._lo = []
+        self._ids = []
+        self._slot = {}
+        self._free = []
+        # slots removed since the last update, they are recycled once their end events are out
+        self._dead = []
+        self._order = []
+        self._pairs = np.empty(0, dtype=np.int64)
+        self._swaps = 0
+
+    @property
+    def axis(self) -> int:
+        return self._axis
+
+    @property
+    def swaps(self) -> int:
+        """Number of swaps the insertion sort needed during the last update, a measure of the temporal coherence
+
+        Returns:
+            int: number of swaps
+        """
+        return self._swaps
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, oid) -> bool:
+        return oid in self._slot
+
+    def __repr__(self) -> str:
+        return "SweepAndPrune(axis={}): {} objects, {} pairs".format(
+            self._axis, len(self), self._pairs.shape[0]
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    @property
+    def ids(self) -> list:
+        return list(self._slot)
+
+    def bounds(self, oid) -> tuple:
+        x0, y0, x1, y1 = self._b[self._slot[oid]].tolist()
+        return x0, y0, x1, y1
+
+    def insert(self, oid, bounds) -> SweepAndPrune:
+        """Inserts the object oid with the provided bounds. Its pairs are reported as begin events by the next update.
+
+        Args:
+            oid: hashable object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the object's bounds (xmin, ymin, xmax, ymax) or a shape providing its AABB
+
+        Raises:
+            ValueError: if the object is already contained
+
+        Returns:
+            SweepAndPrune: this instance
+        """
+        if oid is None:
+            raise ValueError("oid not provided")
+        if oid in self._slot:
+            raise ValueError("object {} already contained".format(oid))
+
+        b = bounds_of(bounds)
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = oid
+        else:
+            slot = len(self._ids)
+            if slot == self._b.shape[0]:
+                self._b = np.concatenate((self._b, np.zeros_like(self._b)))
+            self._ids.append(oid)
+            self._lo.append(0.0)
+        self._slot[oid] = slot
+        self._b[slot] = b
+        self._lo[slot] = b[self._axis]
+        # new objects enter at the end, the next insertion sort moves them into place
+        self._order.append(slot)
+        return self
+
+    def move(self, oid, bounds) -> None:
+        """Updates the bounds of the object oid
+
+        Args:
+            oid: the object id
+            bounds (Poly2, Rect2, Circle2 or tuple): the new bounds
+
+        Raises:
+            ValueError: if the object is not contained
+        """
+        slot = self._slot.get(oid)
+        if slot is None:
+            raise ValueError("object {} not contained".format(oid))
+        b = bounds_of(bounds)
+        self._b[slot] = b
+        self._lo[slot] = b[self._axis]
+
+    def move_many(self, oids: list, bounds) -> None:
+        """Updates the bounds of many objects at once
+
+        Args:
+            oids (list): the object ids
+            bounds (np.ndarray or list): (N, 4) array of bounds, or list of shapes/ bounds tuples
+        """
+        if oids is None:
+            raise ValueError("oids not provided")
+        if bounds is None:
+            raise ValueError("bounds not provided")
+        if isinstance(bounds, np.ndarray):
+            b = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        else:
+            b = np.array([bounds_of(o) for o in bounds], dtype=np.float64).reshape(-1, 4)
+        if b.shape[0] != len(oids):
+            raise ValueError("number of oids and bounds differ")
+
+        slots = [self._slot[oid] for oid in oids]
+        self._b[slots] = b
+        lo = self._lo
+        for s, v in zip(slots, b[:, self._axis].tolist()):
+            lo[s] = v
+
+    def remove(self, oid) -> bool:
+        """Removes the object oid. Its pairs are reported as end events by the next update.
+
+        Args:
+            oid: the object id
+
+        Returns:
+            bool: True if the object was removed, False if it was not contained
+        """
+        slot = self._slot.pop(oid, None)
+        if slot is None:
+            return False
+        self._dead.append(slot)
+        return True
+
+    def _sort(self) -> None:
+        # insertion sort of the order by the lower bounds, which is close to linear for an almost sorted order
+        order, lo = self._order, self._lo
+        swaps = 0
+        for i in range(1, len(order)):
+            s = order[i]
+            v = lo[s]
+            j = i - 1
+            while j >= 0 and lo[order[j]] > v:
+                order[j + 1] = order[j]
+                j -= 1
+            if j + 1 != i:
+                order[j + 1] = s
+                swaps += i - j - 1
+        self._swaps = swaps
+
+    def _sweep(self) -> np.ndarray:
+        # encoded pairs (min slot, max slot) of all overlapping boxes
+        order = np.array(self._order, dtype=np.int64)
+        if order.shape[0] < 2:
+            return np.empty(0, dtype=np.int64)
+
+        a = self._axis
+        b = self._b[order]
+        lo = b[:, a]
+        # every box is compared against the boxes starting before its upper bound along the sort axis
+        hi = np.searchsorted(lo, b[:, a + 2], side="right")
+        idx = np.arange(order.shape[0])
+        cnt = np.maximum(hi - idx - 1, 0)
+        total = int(cnt.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        ii = np.repeat(idx, cnt)
+        jj = ii + 1 + (np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+
+        o = 1 - a
+        keep = (b[ii, o] <= b[jj, o + 2]) & (b[jj, o] <= b[ii, o + 2])
+        sa, sb = order[ii[keep]], order[jj[keep]]
+        return np.minimum(sa, sb) * _PAIR_SHIFT + np.maximum(sa, sb)
+
+    def _decode(self, pairs: np.ndarray) -> list:
+        ids = self._ids
+        return [(ids[p >> 32], ids[p & 0xFFFFFFFF]) for p in pairs.tolist()]
+
+    def update(self) -> tuple:
+        """Sorts the boxes, sweeps them for overlaps and compares the overlapping pairs with the ones of the previous update.
+
+        Returns:
+            tuple: three lists of (id, id) pairs - the pairs that began overlapping, that are still overlapping and that
+            stopped overlapping (including the pairs of removed objects)
+        """
+        if self._dead:
+            dead = set(self._dead)
+            self._order = [s for s in self._order if s not in dead]
+
+        self._sort()
+        pairs = np.unique(self._sweep())
+
+        begin = np.setdiff1d(pairs, self._pairs, assume_unique=True)
+        persist = np.intersect1d(pairs, self._pairs, assume_unique=True)
+        end = np.setdiff1d(self._pairs, pairs, assume_unique=True)
+        self._pairs = pairs
+        events = self._decode(begin), self._decode(persist), self._decode(end)
+
+        # the removed slots are free for reuse once their end events are out
+        for s in self._dead:
+            self._ids[s] = None
+            self._free.append(s)
+        self._dead = []
+        return events
+
+    @property
+    def pairs(self) -> list:
+        """The overlapping pairs found by the last update
+
+        Returns:
+            list: list of (id, id) pairs
+        """
+        return self._decode(self._pairs)
+
+
+def collide_pairs(pairs: list, shape_of) -> list:
+    """Runs the SAT narrow phase on the pairs reported by the broadphase
+
+    Args:
+        pairs (list): list of (id, id) pairs, e.g. the begin and persist pairs of SweepAndPrune.update
+        shape_of (dict or callable): maps an id to its convex shape (Poly2, Tri2, Rect2 or Circle2)
+
+    Returns:
+        list: list of (id, id, Manifold2) for the pairs whose shapes actually collide
+    """
+    if pairs is None:
+        raise ValueError("pairs not provided")
+    if shape_of is None:
+        raise ValueError("shape_of not provided")
+
+    get = shape_of.__getitem__ if isinstance(shape_of, dict) else shape_of
+    contacts = []
+    for a, b in pairs:
+        m = collide2(get(a), get(b))
+        if m is not None:
+            contacts.append((a, b, m))
+    return contacts
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from elisa.arch.ecs.message import CollisionMessage
+from elisa.arch.ecs.system import System
+
+from .hashgrid import SpatialHashGrid
+from .sap import SweepAndPrune, collide_pairs
+
+
+class SpatialHashSystem(System):
+    """Keeps a SpatialHashGrid in sync with the Transform2DComponent positions of the entities it is updated with,
+    so that other systems can run their neighborhood queries against the grid in the same frame.
+    """
+
+    def __init__(self, grid: SpatialHashGrid, hw: float = 0.0, hh: float = None, **kwargs):
+        """Creates a new system maintaining grid
+
+        Args:
+            grid (SpatialHashGrid): the grid to maintain
+            hw (float, optional): half width of the entities. Defaults to 0.0.
+            hh (float, optional): half height of the entities. Defaults to None, i.e. hw.
+        """
+        super(SpatialHashSystem, self).__init__(**kwargs)
+        if grid is None:
+            raise ValueError("grid not provided")
+        self._grid = grid
+        self._hw = hw
+        self._hh = hh
+
+    @property
+    def grid(self) -> SpatialHashGrid:
+        return self._grid
+
+    def update(self, time_delta: float, entities) -> None:
+        """Moves the entities' entries in the grid to their current positions
+
+        Args:
+            time_delta (float): time passed between last invocation of the method and now.
+            entities (list of entities): the entities to keep track of
+        """
+        if entities is None:
+            raise ValueError("entities not provided")
+        self._grid.sync(entities, self._hw, self._hh)
+
+    def __repr__(self) -> str:
+        return "SpatialHashSystem[{}]: {}".format(self.id, self._grid)
+
+
+class SweepAndPruneSystem(System):
+    """Runs a SweepAndPrune broadphase over the entities it is updated with and sends them CollisionMessages
+    when their bounds begin, keep or stop overlapping. If a shape function is provided the overlapping pairs
+    additionally pass the SAT narrow phase, the messages carry the contact manifold and begin, persist and end
+    follow the contact of the shapes instead of the bounds.
+    """
+
+    def __init__(
+        self,
+        bounds_fn=None,
+        shape_fn=None,
+        hw: float = 0.0,
+        hh: float = None,
+        axis: int = 0,
+        component_type: str = "Transform2D",
+        **kwargs
+    ):
+        """Creates a new collision system
+
+        Args:
+            bounds_fn (callable, optional): maps an entity to its bounds (xmin, ymin, xmax, ymax) or a shape. Defaults to None, i.e. the box of half extents hw, hh around the entity's position.
+            shape_fn (callable, optional): maps an entity to its convex shape for the narrow phase. Defaults to None, i.e. no narrow phase.
+            hw (float, optional): half width of the entities if no bounds_fn is given. Defaults to 0.0.
+            hh (float, optional): half height of the entities if no bounds_fn is given. Defaults to None, i.e. hw.
+            axis (int, optional): sort axis of the broadphase. Defaults to 0.
+            component_type (str, optional): type name of the transform component. Defaults to "Transform2D".
+        """
+        super(SweepAndPruneSystem, self).__init__(**kwargs)
+        self._sap = SweepAndPrune(axis=axis)
+        self._bounds_fn = bounds_fn
+        self._shape_fn = shape_fn
+        self._hw = hw
+        self._hh = hw if hh is None else hh
+        self._component_type = component_type
+        self._messages = []
+        self._contacts = set()
+
+    @property
+    def broadphase(self) -> SweepAndPrune:
+        return self._sap
+
+    @property
+    def messages(self) -> list:
+        """The collision messages sent during the last update
+
+        Returns:
+            list: list of CollisionMessage
+        """
+        return self._messages
+
+    def _bounds(self, e):
+        if self._bounds_fn is not None:
+            return self._bounds_fn(e)
+        p = e.get_of_type(self._component_type).position
+        return p.x - self._hw, p.y - self._hh, p.x + self._hw, p.y + self._hh
+
+    def update(self, time_delta: float, entities) -> None:
+        """Moves the entities' boxes, runs the broadphase and sends the collision messages to the entities involved
+
+        Args:
+            time_delta (float): time passed between last invocation of the method and now.
+            entities (list of entities): the entities to collide
+        """
+        if entities is None:
+            raise ValueError("entities not provided")
+
+        sap = self._sap
+        by_id, seen = {}, set()
+        for e in entities:
+            if not e.is_active or (
+                self._bounds_fn is None and not e.has_component_type(self._component_type)
+            ):
+                continue
+            by_id[e.id] = e
+            seen.add(e.id)
+            if e.id in sap:
+                sap.move(e.id, self._bounds(e))
+            else:
+                sap.insert(e.id, self._bounds(e))
+        for oid in [oid for oid in sap.ids if oid not in seen]:
+            sap.remove(oid)
+
+        begin, persist, end = sap.update()
+
+        messages = []
+        if self._shape_fn is not None:
+            shapes = {}
+
+            def shape_of(oid):
+                if oid not in shapes:
+                    shapes[oid] = self._shape_fn(by_id[oid])
+                return shapes[oid]
+
+            # the boxes of a pair may overlap for several frames before the shapes touch, so the phases are
+            # decided against the pairs in contact during the last update
+            contacts = collide_pairs(begin + persist, shape_of)
+            touching = {(a, b) for a, b, _ in contacts}
+            end = [p for p in self._contacts if p not in touching]
+            begin = [c for c in contacts if (c[0], c[1]) not in self._contacts]
+            persist = [c for c in contacts if (c[0], c[1]) in self._contacts]
+            self._contacts = touching
+        else:
+            begin = [(a, b, None) for a, b in begin]
+            persist = [(a, b, None) for a, b in persist]
+
+        for phase, pairs in (("Begin", begin), ("Persist", persist)):
+            for a, b, m in pairs:
+                messages.append(CollisionMessage(phase, b, m, sender=self, receiver=a))
+                messages.append(
+                    CollisionMessage(
+                        phase, a, None if m is None else m.flip(), sender=self, receiver=b
+                    )
+                )
+        for a, b in end:
+            messages.append(CollisionMessage("End", b, sender=self, receiver=a))
+            messages.append(CollisionMessage("End", a, sender=self, receiver=b))
+
+        for msg in messages:
+            receiver = by_id.get(msg.receiver)
+            if receiver is not None:
+                receiver.send_msg(msg)
+        self._messages = messages
+
+    def __repr__(self) -> str:
+        return "SweepAndPruneSystem[{}]: {}".format(self.id, self._sap)
@@ -4,4 +4,11 @@ from .sprite import Sprite
 from .sprite_asset_manager import SpriteAssetManager
 from .sprites import load_image, load_png
 from .spritesheet import SpriteSheet, spritesheet_from_tiled
-from .tilemap import TileMap, tilemap_from_tiled
+from .tilemap import TileMap, tile_ids_of_type, tilemap_from_tiled
+from .tileray import (
+    TileRayHit,
+    cast_ray,
+    cast_ray_tilemap,
+    cast_rays,
+    line_of_sight,
+)
@@ -4,6 +4,8 @@ import os
 import xml.etree.ElementTree
 from uuid import uuid4
 
+import numpy as np
+
 # for starters we closely follow: https://developer.mozilla.org/en-US/docs/Games/Techniques/Tilemaps
 # Initially we start with a single tile atlas
 # but
@@ -64,60 +66,67 @@ class TileMap(object):
         return self
 
     @staticmethod
-    def _tilemap_data_from(data, map_dim) -> tuple:
-        # 1d or 2d data is turned into a 2D nested list representation
+    def _tilemap_data_from(data, map_dim, dtype=None) -> np.ndarray:
+        # 1d or 2d data is turned into a 2D (map height, map width) array of tile indices
         map_width, map_height = map_dim
-        _data = []
-        _unique_indices = set([])
-
-        if len(data) == map_width * map_height:
-            # 1d case
-            for y in range(map_height):
-                x0, x1 = y * map_width, (y + 1) * map_width
-                _yi = data[x0:x1]
-                _data.append(_yi)
-                # potentially expand the set of unique indices
-                for _elem in _yi:
-                    if _elem not in _unique_indices:
-                        _unique_indices.add(_elem)
-        elif len(data) == map_height:
-            # 2d case
-            _x0 = data[0]
-            if not (len(_x0) == map_width):
-                raise ValueError(
-                    "Unknown Map format provided not a 1D or 2D (map height, map width) array"
-                )
-            _data = data
-            _unique_indices = set([_x for y in _data for _x in y])
-        else:
+        try:
+            _data = np.asarray(data)
+        except ValueError:
+            _data = None
+        if _data is not None and _data.ndim == 1 and _data.size == map_width * map_height:
+            _data = _data.reshape(map_height, map_width)
+        elif _data is None or _data.shape != (map_height, map_width):
             raise ValueError(
                 "Unknown Map format provided not a 1D or 2D (map height, map width) array"
             )
 
-        return _data, _unique_indices
+        return np.array(_data, dtype=TileMap._tile_dtype(_data, dtype))
+
+    @staticmethod
+    def _tile_dtype(indices: np.ndarray, dtype=None) -> np.dtype:
+        # the smallest of uint16 and uint32 holding the indices, or the requested one if the indices fit
+        if indices.dtype.kind not in "biu":
+            raise ValueError("tile indices have to be integers")
+        lo = int(indices.min()) if indices.size else 0
+        hi = int(indices.max()) if indices.size else 0
+        if dtype is None:
+            dtype = np.uint16 if hi <= np.iinfo(np.uint16).max else np.uint32
+        dtype = np.dtype(dtype)
+        if dtype not in (np.dtype(np.uint16), np.dtype(np.uint32)):
+            raise ValueError("tile indices are stored as uint16 or uint32")
+        if lo < 0 or hi > np.iinfo(dtype).max:
+            raise ValueError("tile indices have to be in 0 to {}".format(np.iinfo(dtype).max))
+        return dtype
 
     def add_grid(
-        self, grid_name: str, data: list, visible: bool = True, props: dict = None
+        self,
+        grid_name: str,
+        data: list,
+        visible: bool = True,
+        props: dict = None,
+        dtype=None,
     ) -> TileMap:
         """Sets a logical grid for our tile map.
         A logical grid is an arrangement of individual map tiles that define the behaviur of our world. If the
         world has already a logical grid with the same name set, then adding the new grid will raise an exception.
+        The tile indices are copied into a (map height, map width) uint16 or uint32 array.
 
         Args:
-                        data (1D or 2D list of integers): Data defining the grid, which can be a 1D list of width*height tiles or
+                        data (1D or 2D list of integers or np.ndarray): Data defining the grid, which can be a 1D list of width*height tiles or
                         a 2D nested list of the same dimensionality.
                         grid_name (str): name of the grid
                         visible (bool): is this a visible layer
                         props (dict): additional properties (custom layer properties in tiled) to be added to the layer
+                        dtype (np.dtype, optional): np.uint16 or np.uint32. Defaults to None, i.e. uint16 unless an index needs 32 bits.
 
         Raises:
                         ValueError: raises an exception if the visual grid data is not of the required dimensionality, or the name of the logical
-                        grid is either not provided or already taken.
+                        grid is either not provided or already taken, or the tile indices do not fit the dtype.
 
         Returns:
                         TileMap: The tile map with the logical grid added.
         """
-        if not data:
+        if data is None or len(data) == 0:
             raise ValueError("no data provided")
 
         if not grid_name or grid_name.strip() == "":
@@ -126,11 +135,10 @@ class TileMap(object):
         if grid_name in self._grid:
             raise ValueError("Grid type already present")
 
-        _map_data, _unique_indices = TileMap._tilemap_data_from(data, self._map_dim)
+        _map_data = TileMap._tilemap_data_from(data, self._map_dim, dtype)
 
         self._grid[grid_name] = {
             "Grid": _map_data,
-            "Indices": _unique_indices,
             "Visible": visible,
             "Properties": props,
         }
@@ -207,19 +215,143 @@ class TileMap(object):
     def __contains__(self, key):
         return self._grid.__contains__(key)
 
-    def get_grid(self, grid_name: str):
+    def get_array(self, grid_name: str) -> np.ndarray:
+        """Returns the grid's (map height, map width) array of tile indices. It is the grid itself, not a copy, so
+        writing into it writes into the grid.
+
+        Args:
+            grid_name (str): name of the grid
+
+        Raises:
+            ValueError: if the name is not provided or the grid does not exist
+
+        Returns:
+            np.ndarray: the tile indices, indexed as grid[y, x]
+        """
         if not grid_name or grid_name.strip() == "":
             raise ValueError("grid name not provided")
         if grid_name not in self._grid:
             raise ValueError("logical grid does not exist")
         return self._grid[grid_name]["Grid"]
 
-    def get_grid_indices(self, grid_name: str) -> dict:
-        if not grid_name or grid_name.strip() == "":
-            raise ValueError("grid name not provided")
-        if grid_name not in self._grid:
-            raise ValueError("logical grid does not exist")
-        return self._grid[grid_name]["Indices"]
+    def get_grid(self, grid_name: str) -> list:
+        """Returns the grid's tile indices as nested lists, indexed as grid[y][x]. The lists are a copy of the grid,
+        use get_array or set_tiles to change tiles and region to read a part of the grid.
+
+        Args:
+            grid_name (str): name of the grid
+
+        Raises:
+            ValueError: if the name is not provided or the grid does not exist
+
+        Returns:
+            list: map height lists of map width tile indices
+        """
+        return self.get_array(grid_name).tolist()
+
+    def get_grid_indices(self, grid_name: str) -> set:
+        """Returns the distinct tile indices the grid currently holds
+
+        Args:
+            grid_name (str): name of the grid
+
+        Returns:
+            set: the tile indices
+        """
+        return set(np.unique(self.get_array(grid_name)).tolist())
+
+    def _bounds(self, x0: int, y0: int, x1: int, y1: int) -> tuple:
+        if not (0 <= x0 <= x1 <= self.map_width and 0 <= y0 <= y1 <= self.map_height):
+            raise ValueError("region outside of map dimensions")
+        return slice(y0, y1), slice(x0, x1)
+
+    def region(self, grid_name: str, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Returns a view of the tiles in the columns x0 to x1 and rows y0 to y1 (both exclusive) of a grid, without
+        copying. Writing into the view writes into the grid.
+
+        Args:
+            grid_name (str): name of the grid
+            x0 (int): left column
+            y0 (int): top row
+            x1 (int): column after the right most one
+            y1 (int): row after the bottom most one
+
+        Raises:
+            ValueError: if the grid does not exist or the region is not inside the map
+
+        Returns:
+            np.ndarray: (y1 - y0, x1 - x0) view of the tile indices, indexed as view[y - y0, x - x0]
+        """
+        grid = self.get_array(grid_name)
+        return grid[self._bounds(x0, y0, x1, y1)]
+
+    def _cells(self, xs, ys) -> tuple:
+        xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+        if np.any((xs < 0) | (xs >= self.map_width)):
+            raise ValueError("x coordinate outside of map dimensions")
+        if np.any((ys < 0) | (ys >= self.map_height)):
+            raise ValueError("y coordinate outside of map boundaries")
+        return ys, xs
+
+    def get_tiles(self, grid_name: str, xs, ys) -> np.ndarray:
+        """Returns the tile indices of many cells at once
+
+        Args:
+            grid_name (str): name of the grid
+            xs (np.ndarray or list): x cell-locations
+            ys (np.ndarray or list): y cell-locations, broadcast against xs
+
+        Raises:
+            ValueError: if the grid does not exist or a cell is outside of the map
+
+        Returns:
+            np.ndarray: the tile indices of the cells
+        """
+        grid = self.get_array(grid_name)
+        return grid[self._cells(xs, ys)]
+
+    def set_tiles(self, grid_name: str, xs, ys, indices) -> TileMap:
+        """Sets the tile indices of many cells at once
+
+        Args:
+            grid_name (str): name of the grid
+            xs (np.ndarray or list): x cell-locations
+            ys (np.ndarray or list): y cell-locations, broadcast against xs
+            indices (np.ndarray, list or int): the tile indices, broadcast against the cells
+
+        Raises:
+            ValueError: if the grid does not exist, a cell is outside of the map or an index does not fit the grid's dtype
+
+        Returns:
+            TileMap: the updated tile map
+        """
+        grid = self.get_array(grid_name)
+        cells = self._cells(xs, ys)
+        v = np.asarray(indices)
+        grid[cells] = v.astype(TileMap._tile_dtype(v, grid.dtype), copy=False)
+        return self
+
+    def fill(self, grid_name: str, x0: int, y0: int, x1: int, y1: int, index: int) -> TileMap:
+        """Sets all tiles in the columns x0 to x1 and rows y0 to y1 (both exclusive) of a grid to one tile index
+
+        Args:
+            grid_name (str): name of the grid
+            x0 (int): left column
+            y0 (int): top row
+            x1 (int): column after the right most one
+            y1 (int): row after the bottom most one
+            index (int): the tile index
+
+        Raises:
+            ValueError: if the grid does not exist, the region is not inside the map or the index does not fit the grid's dtype
+
+        Returns:
+            TileMap: the updated tile map
+        """
+        view = self.region(grid_name, x0, y0, x1, y1)
+        TileMap._tile_dtype(np.asarray(index), view.dtype)
+        view.fill(index)
+        return self
 
     def remove_grid(self, grid_name):
         if not grid_name or grid_name.strip() == "":
@@ -243,33 +375,81 @@ class TileMap(object):
         Returns:
             [int or list of int]: if one grid is queried a single index is returned else all indices of all grids are provided back
         """
-        if not (0 <= x < self.map_width):
+        w, h = self._map_dim
+        if not (0 <= x < w):
             raise ValueError("x coordinate outside of map dimensions")
-        if not (0 <= y < self.map_height):
+        if not (0 <= y < h):
             raise ValueError("y coordinate outside of map boundaries")
 
-        verbose = kwargs.get("verbose", False)
-
         if grid_name and grid_name.strip() != "":
-            if grid_name not in self._grid:
+            layer = self._grid.get(grid_name)
+            if layer is None:
                 raise ValueError("Unknown grid specified")
-            if verbose:
+            if kwargs.get("verbose", False):
                 print(f"Return {x}, {y} from {grid_name}")
-            return self._grid[grid_name]["Grid"][y][x]
+            return layer["Grid"].item(y, x)
         else:
-            return [self._grid[gn]["Grid"][y][x] for gn in self.grid_names()]
+            return [self._grid[gn]["Grid"].item(y, x) for gn in self.grid_names()]
+
+    def map_tiles(self, grid_name: str, fn, dtype=np.float64) -> np.ndarray:
+        """Evaluates fn once per distinct tile index of the grid and returns the results per cell, e.g. traversal costs
+
+        Args:
+            grid_name (str): name of the grid
+            fn (callable): maps a tile index to a value
+            dtype (np.dtype, optional): type of the values. Defaults to np.float64.
+
+        Raises:
+            ValueError: if the grid does not exist or fn is not provided
+
+        Returns:
+            np.ndarray: (map height, map width) array of values, indexed as values[y, x]
+        """
+        if fn is None:
+            raise ValueError("fn not provided")
+        grid = self.get_array(grid_name)
+        if grid.dtype == np.uint16:
+            # a table over all 16 bit indices, filled for the indices present
+            indices = np.flatnonzero(np.bincount(grid.ravel(), minlength=1))
+            lut = np.zeros(int(indices[-1]) + 1 if indices.size else 1, dtype=dtype)
+            lut[indices] = [fn(i) for i in indices.tolist()]
+            return lut[grid]
+        indices, inverse = np.unique(grid, return_inverse=True)
+        lut = np.array([fn(i) for i in indices.tolist()], dtype=dtype)
+        return lut[inverse].reshape(grid.shape)
+
+    def mask(self, grid_name: str, tiles) -> np.ndarray:
+        """Returns a boolean (map height, map width) mask of the grid's cells holding one of the selected tiles, e.g.
+        the solid tiles for ray casting and path finding.
+
+        Args:
+            grid_name (str): name of the grid
+            tiles (callable or collection of int): predicate on the tile index or the selected tile indices, see tile_ids_of_type
+
+        Raises:
+            ValueError: if the grid does not exist or the tiles are not provided
+
+        Returns:
+            np.ndarray: the mask, indexed as mask[y, x]
+        """
+        if tiles is None:
+            raise ValueError("tiles not provided")
+        selected = tiles if callable(tiles) else set(tiles).__contains__
+        return self.map_tiles(grid_name, lambda i: bool(selected(i)), bool)
 
     def grid_names(self) -> list:
         return [g for g in self._grid]
 
     def empty_grid(self) -> list:
-        _g = [self.map_width * [self._empty_tile_index] for _ in range(self.map_height)]
+        # the grids hold integers only, so without an empty tile index 0 is used, see empty_at
+        _empty = self._empty_tile_index or 0
+        _g = [self.map_width * [_empty] for _ in range(self.map_height)]
         return _g
 
     def empty_at(self, x: int, y: int, grid_name: str = None) -> TileMap:
         """Sets the tile at position x, y in the grid of the tile map to the empty tile.
         If the grid name is provided, a particular grid is considered. Else the tile is set in
-        all grids of the tile map.
+        all grids of the tile map. The grids hold integers only, so without an empty tile index 0 is written.
 
         Args:
             x (int): x-position in tile map space (x in 0 to tilemap_x)
@@ -294,10 +474,10 @@ class TileMap(object):
             if grid_name not in self._grid:
                 raise KeyError("Unknown grid specified")
 
-            self._grid[grid_name]["Grid"][y][x] = self._empty_tile_index
+            self._grid[grid_name]["Grid"][y, x] = self._empty_tile_index or 0
         else:
             for gn in self._grid:
-                self._grid[gn]["Grid"][y][x] = self._empty_tile_index
+                self._grid[gn]["Grid"][y, x] = self._empty_tile_index or 0
 
         return self
 
@@ -357,6 +537,29 @@ def tileprops_from_tsx(tsx_fp: str, reserve_index_zero: bool = True, **kwargs) -
     return props
 
 
+def tile_ids_of_type(tileprops: dict, types) -> set:
+    """Selects the tile indices whose type is among types, e.g. to derive the solid tiles from the tile properties.
+
+    Args:
+        tileprops (dict): map of tile index to tile properties as returned by tileprops_from_tsx
+        types (str or collection of str): the tile type(s) to select
+
+    Raises:
+        ValueError: if the tile properties or types are not provided
+
+    Returns:
+        set: the selected tile indices
+    """
+    if tileprops is None:
+        raise ValueError("tile properties not provided")
+    if not types:
+        raise ValueError("types not provided")
+    if isinstance(types, str):
+        types = (types,)
+    types = set(types)
+    return {i for i, p in tileprops.items() if p.get("type") in types}
+
+
 def tilemap_from_tiled(tsm_fp: str, reserve_index_zero: bool = True, **kwargs) -> tuple:
     """Returns a three tuple composed of tile map, path to referenced tileset descriptors built in TileEd and all of the defined properties,
     i.e. tm, tileset_descs, tileprops.
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from elisa.linalg import Point2, Vec2
+
+from .tilemap import TileMap
+
+# Rays are traced through the tile grid with the digital differential analyzer of Amanatides and Woo. Starting at the
+# cell containing the ray's origin, the ray steps into the neighbouring cell whose boundary it crosses first, so only the
+# cells actually pierced by the ray are visited. Coordinates are in world units, i.e. a cell spans cell_size units and
+# cell (x, y) covers [x * cell_size, (x + 1) * cell_size) x [y * cell_size, (y + 1) * cell_size).
+
+
+class TileRayHit(object):
+    """The first solid cell hit by a ray."""
+
+    def __init__(self, cell: tuple, point: Point2, normal: Vec2, distance: float):
+        super(TileRayHit, self).__init__()
+        self._cell = cell
+        self._point = point
+        self._normal = normal
+        self._distance = distance
+
+    @property
+    def cell(self) -> tuple:
+        """The (x, y) cell hit"""
+        return self._cell
+
+    @property
+    def point(self) -> Point2:
+        """The point where the ray enters the cell"""
+        return self._point
+
+    @property
+    def normal(self) -> Vec2:
+        """The normal of the face through which the ray enters the cell, the zero vector if the ray starts inside the cell"""
+        return self._normal
+
+    @property
+    def distance(self) -> float:
+        """The distance from the ray's origin to the entry point"""
+        return self._distance
+
+    def __repr__(self) -> str:
+        return "TileRayHit: cell={}, point={}, normal={}, distance={}".format(
+            self._cell, self._point, self._normal, self._distance
+        )
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def _as_mask(mask) -> np.ndarray:
+    if mask is None:
+        raise ValueError("mask not provided")
+    m = np.asarray(mask, dtype=bool)
+    if m.ndim != 2:
+        raise ValueError("mask has to be a 2D (height, width) array")
+    return m
+
+
+def _entry(ox, oy, dx, dy, w, h):
+    # vectorized slab test of the rays against the grid's extent [0, w] x [0, h]; returns the distance at which the
+    # rays enter the grid, the axis of the entry face (-1 if the origin is inside) and whether the grid is hit at all
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tx0, tx1 = (0.0 - ox) / dx, (w - ox) / dx
+        ty0, ty1 = (0.0 - oy) / dy, (h - oy) / dy
+    tx0, tx1 = np.minimum(tx0, tx1), np.maximum(tx0, tx1)
+    ty0, ty1 = np.minimum(ty0, ty1), np.maximum(ty0, ty1)
+    # rays parallel to an axis either span the slab completely or miss it
+    inx = (ox >= 0.0) & (ox <= w)
+    iny = (oy >= 0.0) & (oy <= h)
+    tx0 = np.where(dx == 0.0, np.where(inx, -np.inf, np.inf), tx0)
+    tx1 = np.where(dx == 0.0, np.where(inx, np.inf, -np.inf), tx1)
+    ty0 = np.where(dy == 0.0, np.where(iny, -np.inf, np.inf), ty0)
+    ty1 = np.where(dy == 0.0, np.where(iny, np.inf, -np.inf), ty1)
+
+    t0 = np.maximum(np.maximum(tx0, ty0), 0.0)
+    t1 = np.minimum(tx1, ty1)
+    axis = np.where(tx0 >= ty0, 0, 1)
+    axis = np.where(np.maximum(tx0, ty0) > 0.0, axis, -1)
+    return t0, axis, t0 <= t1
+
+
+def cast_rays(
+    mask, origins, directions, max_dist: float = None, cell_size: float = 1.0
+) -> tuple:
+    """Casts many rays through the grid at once, e.g. a whole field of view fan. All rays are stepped together,
+    one cell per iteration, until they hit a solid cell, leave the grid or exceed the maximum distance.
+
+    Args:
+        mask (np.ndarray): boolean (height, width) mask of the solid cells, indexed as mask[y, x] (see TileMap.mask)
+        origins (np.ndarray or tuple): (N, 2) ray origins or a single (x, y) origin shared by all rays
+        directions (np.ndarray): (N, 2) ray directions, need not be normalized
+        max_dist (float, optional): maximum distance travelled by the rays. Defaults to None, i.e. unlimited.
+        cell_size (float, optional): extent of a cell in world units, e.g. the tile width. Defaults to 1.0.
+
+    Raises:
+        ValueError: if the mask, origins or directions are not provided or not of matching shape, or the cell size is not positive
+
+    Returns:
+        tuple: (hit, cells, points, normals, distances) - (N,) bool array flagging the rays hitting a solid cell, (N, 2)
+        int array of the cells hit, (N, 2) entry points, (N, 2) entry face normals and (N,) distances. Entries of rays
+        not hitting anything are -1 for cells and nan otherwise.
+    """
+    m = _as_mask(mask)
+    if origins is None:
+        raise ValueError("origins not provided")
+    if directions is None:
+        raise ValueError("directions not provided")
+    if cell_size <= 0.0:
+        raise ValueError("cell size has to be positive")
+
+    d = np.asarray(directions, dtype=np.float64).reshape(-1, 2)
+    n = d.shape[0]
+    o = np.broadcast_to(np.asarray(origins, dtype=np.float64).reshape(-1, 2), (n, 2))
+    if o.shape[0] != n:
+        raise ValueError("number of origins and directions differ")
+
+    length = np.hypot(d[:, 0], d[:, 1])
+    if np.any(length == 0.0):
+        raise ValueError("directions must not be zero")
+    # work in cell units with unit directions, so that t measures distance in cells
+    dx, dy = d[:, 0] / length, d[:, 1] / length
+    ox, oy = o[:, 0] / cell_size, o[:, 1] / cell_size
+    max_t = np.inf if max_dist is None else max_dist / cell_size
+    h, w = m.shape
+
+    hit = np.zeros(n, dtype=bool)
+    cells = np.full((n, 2), -1, dtype=np.int64)
+    normals = np.full((n, 2), np.nan)
+    dist = np.full(n, np.nan)
+
+    t0, axis, inside = _entry(ox, oy, dx, dy, w, h)
+    active = np.flatnonzero(inside & (t0 <= max_t))
+    if active.shape[0] == 0:
+        return hit, cells, normals.copy(), normals, dist
+
+    # the initial cell and the face through which the ray entered it
+    ex, ey = ox[active] + t0[active] * dx[active], oy[active] + t0[active] * dy[active]
+    cx = np.clip(np.floor(ex).astype(np.int64), 0, w - 1)
+    cy = np.clip(np.floor(ey).astype(np.int64), 0, h - 1)
+    sx = np.where(dx[active] > 0.0, 1, -1)
+    sy = np.where(dy[active] > 0.0, 1, -1)
+    ax = axis[active]
+    t = t0[active]
+
+    with np.errstate(divide="ignore"):
+        tdx = np.abs(1.0 / dx[active])
+        tdy = np.abs(1.0 / dy[active])
+    # distance along the ray to the next vertical and horizontal cell boundary
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tmx = np.where(
+            dx[active] == 0.0, np.inf, ((cx + (sx > 0)) - ox[active]) / dx[active]
+        )
+        tmy = np.where(
+            dy[active] == 0.0, np.inf, ((cy + (sy > 0)) - oy[active]) / dy[active]
+        )
+
+    while active.shape[0] > 0:
+        solid = m[cy, cx]
+        if np.any(solid):
+            r = active[solid]
+            hit[r] = True
+            cells[r, 0], cells[r, 1] = cx[solid], cy[solid]
+            dist[r] = t[solid] * cell_size
+            a = ax[solid]
+            normals[r, 0] = np.where(a == 0, -sx[solid], 0)
+            normals[r, 1] = np.where(a == 1, -sy[solid], 0)
+
+        # step the remaining rays into the next cell
+        step_x = tmx < tmy
+        t = np.where(step_x, tmx, tmy)
+        cx = cx + np.where(step_x, sx, 0)
+        cy = cy + np.where(step_x, 0, sy)
+        tmx = tmx + np.where(step_x, tdx, 0.0)
+        tmy = tmy + np.where(step_x, 0.0, tdy)
+        ax = np.where(step_x, 0, 1)
+
+        keep = ~solid & (t <= max_t) & (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+        active, cx, cy, sx, sy, tdx, tdy, tmx, tmy, ax, t = (
+            v[keep] for v in (active, cx, cy, sx, sy, tdx, tdy, tmx, tmy, ax, t)
+        )
+
+    points = o + d / length[:, None] * dist[:, None]
+    normals[~hit] = np.nan
+    return hit, cells, points, normals, dist
+
+
+def cast_ray(
+    mask, origin, direction, max_dist: float = None, cell_size: float = 1.0
+) -> TileRayHit:
+    """Casts a single ray through the grid and returns the first solid cell hit.
+
+    Args:
+        mask (np.ndarray): boolean (height, width) mask of the solid cells, indexed as mask[y, x] (see TileMap.mask)
+        origin (Point2 or tuple): the ray's origin
+        direction (Vec2 or tuple): the ray's direction, need not be normalized
+        max_dist (float, optional): maximum distance travelled by the ray. Defaults to None, i.e. unlimited.
+        cell_size (float, optional): extent of a cell in world units, e.g. the tile width. Defaults to 1.0.
+
+    Raises:
+        ValueError: if mask, origin or direction are not provided, the direction is zero or the cell size is not positive
+
+    Returns:
+        TileRayHit: the hit or None if the ray does not hit a solid cell
+    """
+    m = _as_mask(mask)
+    if origin is None:
+        raise ValueError("origin not provided")
+    if direction is None:
+        raise ValueError("direction not provided")
+    if cell_size <= 0.0:
+        raise ValueError("cell size has to be positive")
+
+    dx, dy = float(direction[0]), float(direction[1])
+    length = math.hypot(dx, dy)
+    if length == 0.0:
+        raise ValueError("direction must not be zero")
+    dx, dy = dx / length, dy / length
+    ox, oy = float(origin[0]) / cell_size, float(origin[1]) / cell_size
+    max_t = math.inf if max_dist is None else max_dist / cell_size
+    h, w = m.shape
+
+    t0, axis, inside = _entry(
+        np.array([ox]), np.array([oy]), np.array([dx]), np.array([dy]), w, h
+    )
+    t, ax = float(t0[0]), int(axis[0])
+    if not inside[0] or t > max_t:
+        return None
+
+    cx = min(max(int(math.floor(ox + t * dx)), 0), w - 1)
+    cy = min(max(int(math.floor(oy + t * dy)), 0), h - 1)
+    sx, sy = (1 if dx > 0.0 else -1), (1 if dy > 0.0 else -1)
+    tdx = abs(1.0 / dx) if dx != 0.0 else math.inf
+    tdy = abs(1.0 / dy) if dy != 0.0 else math.inf
+    tmx = ((cx + (sx > 0)) - ox) / dx if dx != 0.0 else math.inf
+    tmy = ((cy + (sy > 0)) - oy) / dy if dy != 0.0 else math.inf
+
+    while True:
+        if m[cy, cx]:
+            normal = Vec2(-sx if ax == 0 else 0.0, -sy if ax == 1 else 0.0)
+            point = Point2((ox + t * dx) * cell_size, (oy + t * dy) * cell_size)
+            return TileRayHit((cx, cy), point, normal, t * cell_size)
+        if tmx < tmy:
+            t, cx, tmx, ax = tmx, cx + sx, tmx + tdx, 0
+        else:
+            t, cy, tmy, ax = tmy, cy + sy, tmy + tdy, 1
+        if t > max_t or not (0 <= cx < w and 0 <= cy < h):
+            return None
+
+
+def line_of_sight(mask, p0, p1, cell_size: float = 1.0) -> bool:
+    """Determines if p1 can be seen from p0, i.e. no solid cell lies between the two points.
+
+    Args:
+        mask (np.ndarray): boolean (height, width) mask of the solid cells, indexed as mask[y, x]
+        p0 (Point2 or tuple): the viewer's position
+        p1 (Point2 or tuple): the target's position
+        cell_size (float, optional): extent of a cell in world units. Defaults to 1.0.
+
+    Returns:
+        bool: True if there is a line of sight
+    """
+    dx, dy = float(p1[0]) - float(p0[0]), float(p1[1]) - float(p0[1])
+    if dx == 0.0 and dy == 0.0:
+        m = _as_mask(mask)
+        cx, cy = int(float(p0[0]) // cell_size), int(float(p0[1]) // cell_size)
+        inside = 0 <= cx < m.shape[1] and 0 <= cy < m.shape[0]
+        return not (inside and m[cy, cx])
+    return cast_ray(mask, p0, (dx, dy), math.hypot(dx, dy), cell_size) is None
+
+
+def cast_ray_tilemap(
+    tm: TileMap, grid_name: str, solid, origin, direction, max_dist: float = None
+) -> TileRayHit:
+    """Casts a ray in world (pixel) coordinates through a layer of the tile map.
+    For repeated queries, compute the mask once via TileMap.mask and use cast_ray/ cast_rays directly.
+
+    Args:
+        tm (TileMap): the tile map
+        grid_name (str): the layer to cast against
+        solid (callable or collection of int): predicate on the tile index or the solid tile indices, see tile_ids_of_type
+        origin (Point2 or tuple): the ray's origin
+        direction (Vec2 or tuple): the ray's direction
+        max_dist (float, optional): maximum distance travelled by the ray. Defaults to None, i.e. unlimited.
+
+    Raises:
+        ValueError: if the tile map is not provided or its tiles are not square
+
+    Returns:
+        TileRayHit: the hit or None if the ray does not hit a solid tile
+    """
+    if tm is None:
+        raise ValueError("tile map not provided")
+    if tm.tile_width != tm.tile_height:
+        raise ValueError("tiles need to be square")
+    return cast_ray(
+        tm.mask(grid_name, solid), origin, direction, max_dist, tm.tile_width
+    )
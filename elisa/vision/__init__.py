@@ -0,0 +1,7 @@
+from .visibility import (
+    shape_segments,
+    visibility,
+    visibility_polygon,
+    visible_segments,
+    visible_shapes,
+)
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from elisa.linalg import Poly2, Vec2
+
+# The visibility polygon is computed by an angular sweep around the origin. Every segment covers an angular interval,
+# the segment closest to the origin at a given angle is the visible one. Sorting the interval ends by angle and
+# keeping the active segments in a heap ordered by their distance yields the visible segment for every angular run
+# in O(n log n). Segments are assumed not to cross each other, which keeps the order of two active segments fixed.
+
+_TWO_PI = 2.0 * math.pi
+_EPS = 1e-12
+
+
+def shape_segments(shapes: list) -> tuple:
+    """Collects the edges of the shapes as segments, e.g. to use the shapes as occluders.
+
+    Args:
+        shapes (list): list of Poly2 (or derived) shapes
+
+    Raises:
+        ValueError: if shapes are not provided
+
+    Returns:
+        tuple: (N, 2, 2) array of segments and (N,) array of the index of the shape owning each segment
+    """
+    if shapes is None:
+        raise ValueError("shapes not provided")
+
+    segments, owners = [], []
+    for i, s in enumerate(shapes):
+        if not isinstance(s, Poly2):
+            raise ValueError("shape {} is not a Poly2".format(i))
+        v = s.vertices
+        segments.append(np.stack((v, np.roll(v, -1, axis=0)), axis=1))
+        owners.append(np.full(v.shape[0], i, dtype=np.int64))
+    if not segments:
+        return np.empty((0, 2, 2), dtype=np.float64), np.empty(0, dtype=np.int64)
+    return np.concatenate(segments), np.concatenate(owners)
+
+
+def _as_segments(segments) -> np.ndarray:
+    if segments is None:
+        raise ValueError("segments not provided")
+    s = np.asarray(segments, dtype=np.float64)
+    if s.size == 0:
+        return s.reshape(0, 2, 2)
+    if s.ndim == 2 and s.shape[1] == 4:
+        s = s.reshape(-1, 2, 2)
+    if s.ndim != 3 or s.shape[1:] != (2, 2):
+        raise ValueError("segments have to be given as (N, 2, 2) or (N, 4)")
+    return s
+
+
+def _as_angle(direction) -> float:
+    if isinstance(direction, Vec2):
+        return math.atan2(direction.y, direction.x)
+    if isinstance(direction, (tuple, list)):
+        return math.atan2(direction[1], direction[0])
+    return float(direction)
+
+
+def _clip_to_box(s: np.ndarray, r: float) -> tuple:
+    # Liang-Barsky clipping of the origin relative segments against the box [-r, r]^2
+    p0, d = s[:, 0], s[:, 1] - s[:, 0]
+    u0, u1 = np.zeros(s.shape[0]), np.ones(s.shape[0])
+    keep = np.ones(s.shape[0], dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for a in (0, 1):
+            for p, q in ((-d[:, a], p0[:, a] + r), (d[:, a], r - p0[:, a])):
+                parallel = p == 0
+                keep &= ~(parallel & (q < 0))
+                t = q / p
+                u0 = np.where(~parallel & (p < 0), np.maximum(u0, t), u0)
+                u1 = np.where(~parallel & (p > 0), np.minimum(u1, t), u1)
+    keep &= u0 <= u1
+    s = np.stack((p0 + u0[:, None] * d, p0 + u1[:, None] * d), axis=1)
+    return s[keep], np.flatnonzero(keep)
+
+
+def _at(seg: tuple, phi: float) -> tuple:
+    # point where the ray at absolute angle phi hits the line through the segment
+    (px, py), (qx, qy) = seg[0], seg[1]
+    dx, dy = math.cos(phi), math.sin(phi)
+    ex, ey = qx - px, qy - py
+    den = dx * ey - dy * ex
+    if abs(den) < _EPS:
+        return px, py
+    t = (px * ey - py * ex) / den
+    return t * dx, t * dy
+
+
+class _SegmentHeap(object):
+    """A binary min heap of the active segments supporting removal of arbitrary entries. Two segments are compared
+    at the middle of the angular interval they share, which for non crossing segments orders them consistently.
+    """
+
+    def __init__(self, pieces: list, start: float):
+        self._pieces = pieces
+        self._start = start
+        self._h = []
+        self._pos = {}
+
+    def _less(self, i: int, j: int) -> bool:
+        a, b = self._pieces[i], self._pieces[j]
+        phi = self._start + 0.5 * (max(a[2], b[2]) + min(a[3], b[3]))
+        ax, ay = _at(a, phi)
+        bx, by = _at(b, phi)
+        return ax * ax + ay * ay < bx * bx + by * by
+
+    def _set(self, k: int, i: int) -> None:
+        self._h[k] = i
+        self._pos[i] = k
+
+    def _up(self, k: int) -> None:
+        h = self._h
+        i = h[k]
+        while k > 0:
+            parent = (k - 1) >> 1
+            if not self._less(i, h[parent]):
+                break
+            self._set(k, h[parent])
+            k = parent
+        self._set(k, i)
+
+    def _down(self, k: int) -> None:
+        h, n = self._h, len(self._h)
+        i = h[k]
+        while True:
+            c = 2 * k + 1
+            if c >= n:
+                break
+            if c + 1 < n and self._less(h[c + 1], h[c]):
+                c += 1
+            if not self._less(h[c], i):
+                break
+            self._set(k, h[c])
+            k = c
+        self._set(k, i)
+
+    def push(self, i: int) -> None:
+        self._h.append(i)
+        self._up(len(self._h) - 1)
+
+    def remove(self, i: int) -> None:
+        k = self._pos.pop(i)
+        last = self._h.pop()
+        if k < len(self._h):
+            self._set(k, last)
+            self._down(k)
+            self._up(self._pos[last])
+
+    @property
+    def top(self):
+        return self._h[0] if self._h else None
+
+
+def _sweep(origin, segments, fov: float, max_dist: float, direction) -> tuple:
+    """Runs the angular sweep and returns the runs of closest segments.
+
+    Returns:
+        tuple: the origin as (x, y), the segment pieces relative to the origin as (p, q, a0, a1, index), the absolute
+        start angle of the sweep and the runs as list of (a0, a1, piece) with angles relative to the start angle
+    """
+    if origin is None:
+        raise ValueError("origin not provided")
+    if fov is None:
+        fov = _TWO_PI
+    if fov <= 0.0:
+        raise ValueError("fov has to be positive")
+    if max_dist is not None and max_dist <= 0.0:
+        raise ValueError("max_dist has to be positive")
+    fov = min(float(fov), _TWO_PI)
+
+    ox, oy = float(origin[0]), float(origin[1])
+    s = _as_segments(segments) - (ox, oy)
+    start = _as_angle(direction) - 0.5 * fov if fov < _TWO_PI else _as_angle(direction)
+
+    # a box around the origin closes the polygon where no segment is in sight
+    if max_dist is not None:
+        r = 1.5 * max_dist
+    else:
+        r = 2.0 * float(np.abs(s).max()) + 1.0 if s.shape[0] > 0 else 1.0
+    s, index = _clip_to_box(s, r)
+    box = np.array(
+        [
+            [[-r, -r], [r, -r]],
+            [[r, -r], [r, r]],
+            [[r, r], [-r, r]],
+            [[-r, r], [-r, -r]],
+        ]
+    )
+    s = np.concatenate((s, box))
+    index = np.concatenate((index, np.full(4, -1, dtype=np.int64)))
+
+    # orient every segment counter-clockwise around the origin, segments pointing at the origin are not visible
+    cross = s[:, 0, 0] * s[:, 1, 1] - s[:, 0, 1] * s[:, 1, 0]
+    keep = np.abs(cross) > _EPS
+    s, index, cross = s[keep], index[keep], cross[keep]
+    s = np.where((cross < 0)[:, None, None], s[:, ::-1], s)
+    a = np.mod(np.arctan2(s[:, :, 1], s[:, :, 0]) - start, _TWO_PI)
+    span = np.mod(a[:, 1] - a[:, 0], _TWO_PI)
+
+    pieces = []
+
+    def add(p, q, a0, a1, i):
+        # clips the piece to the field of view
+        if a0 >= fov or a1 - a0 <= _EPS:
+            return
+        if a1 > fov:
+            q, a1 = _at((p, q), start + fov), fov
+        pieces.append((p, q, a0, a1, i))
+
+    for (p, q), a0, da, i in zip(s.tolist(), a[:, 0].tolist(), span.tolist(), index.tolist()):
+        p, q = tuple(p), tuple(q)
+        if a0 + da > _TWO_PI:
+            # the segment crosses the start of the sweep, split it there
+            x = _at((p, q), start)
+            add(p, x, a0, _TWO_PI, i)
+            add(x, q, 0.0, a0 + da - _TWO_PI, i)
+        else:
+            add(p, q, a0, a0 + da, i)
+
+    # the events at each angle, removals before insertions
+    events = sorted(
+        [(pc[3], 0, k) for k, pc in enumerate(pieces)]
+        + [(pc[2], 1, k) for k, pc in enumerate(pieces)]
+    )
+    heap = _SegmentHeap(pieces, start)
+    runs = []
+    current, since = None, 0.0
+    n, k = len(events), 0
+    while k < n:
+        phi = events[k][0]
+        while k < n and events[k][0] - phi <= _EPS:
+            _, kind, j = events[k]
+            if kind == 0:
+                heap.remove(j)
+            else:
+                heap.push(j)
+            k += 1
+        top = heap.top
+        if top != current:
+            if current is not None and phi - since > _EPS:
+                runs.append((since, phi, current))
+            current, since = top, phi
+    return (ox, oy), pieces, start, runs
+
+
+def _piece_point(pc: tuple, start: float, phi: float) -> tuple:
+    if abs(phi - pc[2]) <= _EPS:
+        return pc[0]
+    if abs(phi - pc[3]) <= _EPS:
+        return pc[1]
+    return _at(pc, start + phi)
+
+
+def _relative_angle(x: float, y: float, start: float, a0: float, a1: float) -> float:
+    # angle of (x, y) relative to the start of the sweep, kept within the run [a0, a1] it is known to lie in
+    phi = (math.atan2(y, x) - start) % _TWO_PI
+    if phi > a1 + 1e-9:
+        phi = phi - _TWO_PI if phi - _TWO_PI >= a0 - 1e-9 else a1
+    return min(max(phi, a0), a1)
+
+
+def _inside_interval(p: tuple, q: tuple, r: float) -> tuple:
+    # parameter interval [u0, u1] of p + u (q - p) inside the circle of radius r, or None
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    a = dx * dx + dy * dy
+    b = p[0] * dx + p[1] * dy
+    c = p[0] * p[0] + p[1] * p[1] - r * r
+    if a < _EPS:
+        return (0.0, 1.0) if c <= 0.0 else None
+    disc = b * b - a * c
+    if disc < 0.0:
+        return None
+    sq = math.sqrt(disc)
+    u0, u1 = max((-b - sq) / a, 0.0), min((-b + sq) / a, 1.0)
+    return (u0, u1) if u0 <= u1 else None
+
+
+def _polygon(sweep: tuple, fov: float, max_dist: float, arc_step: float) -> list:
+    # the vertices of the visibility polygon along the runs of a sweep
+    (ox, oy), pieces, start, runs = sweep
+    partial = fov is not None and fov < _TWO_PI
+
+    pts = []
+
+    def emit(x, y):
+        if not pts or abs(pts[-1][0] - x) > 1e-9 or abs(pts[-1][1] - y) > 1e-9:
+            pts.append((x, y))
+
+    def arc(a0, a1):
+        n = max(int(math.ceil((a1 - a0) / arc_step)), 1)
+        for k in range(n + 1):
+            phi = start + a0 + (a1 - a0) * k / n
+            emit(max_dist * math.cos(phi), max_dist * math.sin(phi))
+
+    if partial:
+        emit(0.0, 0.0)
+    for a0, a1, j in runs:
+        pc = pieces[j]
+        p, q = _piece_point(pc, start, a0), _piece_point(pc, start, a1)
+        if max_dist is None:
+            emit(*p)
+            emit(*q)
+            continue
+        inside = _inside_interval(p, q, max_dist)
+        if inside is None:
+            arc(a0, a1)
+            continue
+        u0, u1 = inside
+        x0, y0 = p[0] + u0 * (q[0] - p[0]), p[1] + u0 * (q[1] - p[1])
+        x1, y1 = p[0] + u1 * (q[0] - p[0]), p[1] + u1 * (q[1] - p[1])
+        if u0 > 0.0:
+            arc(a0, _relative_angle(x0, y0, start, a0, a1))
+        emit(x0, y0)
+        emit(x1, y1)
+        if u1 < 1.0:
+            arc(_relative_angle(x1, y1, start, a0, a1), a1)
+
+    if not partial and len(pts) > 1:
+        if abs(pts[0][0] - pts[-1][0]) <= 1e-9 and abs(pts[0][1] - pts[-1][1]) <= 1e-9:
+            pts.pop()
+    return [(x + ox, y + oy) for x, y in pts]
+
+
+def _visible(sweep: tuple, max_dist: float) -> np.ndarray:
+    # the indices of the segments some run of a sweep shows
+    _, pieces, start, runs = sweep
+    visible = set()
+    for a0, a1, j in runs:
+        pc = pieces[j]
+        if pc[4] < 0 or pc[4] in visible:
+            continue
+        if max_dist is not None:
+            p, q = _piece_point(pc, start, a0), _piece_point(pc, start, a1)
+            if _inside_interval(p, q, max_dist) is None:
+                continue
+        visible.add(pc[4])
+    return np.array(sorted(visible), dtype=np.int64)
+
+
+def visibility_polygon(
+    origin,
+    segments,
+    fov: float = None,
+    max_dist: float = None,
+    direction=0.0,
+    arc_step: float = math.pi / 32.0,
+) -> list:
+    """Computes the region visible from origin among the occluding segments by an angular sweep. The result is exact
+    up to the viewing distance, which is approximated by arcs of at most arc_step radians. The segments may touch but
+    must not cross or overlap each other, e.g. the edges of overlapping shapes have to be split at their
+    intersections or the shapes merged first.
+
+    Args:
+        origin (Point2 or tuple): the viewer's position
+        segments (np.ndarray or list): the occluders as (N, 2, 2) segments ((x0, y0), (x1, y1)), see shape_segments
+        fov (float, optional): the opening angle of the field of view in radians. Defaults to None, i.e. all around.
+        max_dist (float, optional): the viewing distance. Defaults to None, i.e. unlimited within the extent of the segments.
+        direction (float, Vec2 or tuple, optional): the viewing direction as angle in radians or vector. Defaults to 0.0.
+        arc_step (float, optional): the maximum angle between two vertices on the arc at the viewing distance. Defaults to pi/32.
+
+    Raises:
+        ValueError: if origin or segments are not provided, or fov or max_dist are not positive
+
+    Returns:
+        list: the polygon's vertices as (x, y) tuples in counter-clockwise order. For a limited field of view the polygon starts at the origin.
+    """
+    return _polygon(_sweep(origin, segments, fov, max_dist, direction), fov, max_dist, arc_step)
+
+
+def visible_segments(
+    origin, segments, fov: float = None, max_dist: float = None, direction=0.0
+) -> np.ndarray:
+    """Determines the segments visible from origin, i.e. the ones forming part of the visibility polygon.
+    This runs the same sweep as visibility_polygon without building the polygon, use visibility for both. The
+    segments must not cross or overlap each other, see visibility_polygon.
+
+    Args:
+        origin (Point2 or tuple): the viewer's position
+        segments (np.ndarray or list): the occluders as (N, 2, 2) segments ((x0, y0), (x1, y1)), see shape_segments
+        fov (float, optional): the opening angle of the field of view in radians. Defaults to None, i.e. all around.
+        max_dist (float, optional): the viewing distance. Defaults to None, i.e. unlimited.
+        direction (float, Vec2 or tuple, optional): the viewing direction as angle in radians or vector. Defaults to 0.0.
+
+    Returns:
+        np.ndarray: sorted indices of the visible segments
+    """
+    return _visible(_sweep(origin, segments, fov, max_dist, direction), max_dist)
+
+
+def visibility(
+    origin,
+    segments,
+    fov: float = None,
+    max_dist: float = None,
+    direction=0.0,
+    arc_step: float = math.pi / 32.0,
+) -> tuple:
+    """Computes the visibility polygon and the visible segments with a single angular sweep, see visibility_polygon
+    and visible_segments. The segments must not cross or overlap each other, see visibility_polygon.
+
+    Args:
+        origin (Point2 or tuple): the viewer's position
+        segments (np.ndarray or list): the occluders as (N, 2, 2) segments ((x0, y0), (x1, y1)), see shape_segments
+        fov (float, optional): the opening angle of the field of view in radians. Defaults to None, i.e. all around.
+        max_dist (float, optional): the viewing distance. Defaults to None, i.e. unlimited within the extent of the segments.
+        direction (float, Vec2 or tuple, optional): the viewing direction as angle in radians or vector. Defaults to 0.0.
+        arc_step (float, optional): the maximum angle between two vertices on the arc at the viewing distance. Defaults to pi/32.
+
+    Raises:
+        ValueError: if origin or segments are not provided, or fov or max_dist are not positive
+
+    Returns:
+        tuple: the polygon's vertices as list of (x, y) tuples and the sorted np.ndarray of the visible segments' indices
+    """
+    sweep = _sweep(origin, segments, fov, max_dist, direction)
+    return _polygon(sweep, fov, max_dist, arc_step), _visible(sweep, max_dist)
+
+
+def visible_shapes(
+    origin, shapes: list, fov: float = None, max_dist: float = None, direction=0.0
+) -> list:
+    """Determines the shapes that can be seen from origin when the shapes occlude each other.
+
+    Args:
+        origin (Point2 or tuple): the viewer's position
+        shapes (list): list of Poly2 (or derived) shapes
+        fov (float, optional): the opening angle of the field of view in radians. Defaults to None, i.e. all around.
+        max_dist (float, optional): the viewing distance. Defaults to None, i.e. unlimited.
+        direction (float, Vec2 or tuple, optional): the viewing direction as angle in radians or vector. Defaults to 0.0.
+
+    Returns:
+        list: sorted indices of the visible shapes
+    """
+    segments, owners = shape_segments(shapes)
+    seen = visible_segments(origin, segments, fov, max_dist, direction)
+    return sorted(set(owners[seen].tolist()))
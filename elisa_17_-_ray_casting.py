@@ -5,10 +5,10 @@
 # ray-casting. We place some random visual obstables (boxes) into this world to demonstrate the ray casting.
 # Actual visibility will not be decided using the ray casting, instead we will highlight those entities that would lie in the
 # field of view of our player. The field of view is defined by some opening angle and a viewing distance. This forms a triangle.
-# All points inside of this triangle are visible to the player. As opposed to a contained visibility test, we perform the
-# ray casting visibility test, i.e. we sample the field of view using rays emanating from the player's position in the viewing
-# direction contained in the field of view. Now, whenever we have a ray hit an object, that object is visible. In such a case, the
-# ray hitting the object and the actual object are highlighted.
+# All points inside of this triangle are visible to the player. As opposed to a contained visibility test, we determine
+# what the player actually sees. Instead of sampling the field of view with rays emanating from the player's position,
+# the edges of the objects are swept once by their angle around the player, which yields the exact visible region.
+# The visible region and the objects contributing to it are highlighted.
 # We build on the previously introduced entity-component system. That is, we will define
 # entities for the movable player and the boxes. Also, properties defined in components make up the speific
 # configurations of these entities. Two systems will be defined the rendering system and the input handling system.
@@ -25,7 +25,9 @@ import pygame
 import elisa.linalg
 from elisa.arch.ecs import Component, Entity, System
 from elisa.arch.ecs.message import Message
-from elisa.linalg import Plane2, Point2, Ray2, Vec2
+from elisa.linalg import Plane2, Point2, Vec2
+from elisa.spatial import DynamicAABBTree
+from elisa.vision import visibility
 
 # Let us define a couple of types
 # the player entity
@@ -266,6 +268,8 @@ class SRender(System):
         )
         self.back_buffer = pygame.Surface(self.screen_buffer.get_size())
         self.back_buffer = self.back_buffer.convert()
+        # the collidables are kept in a bounding volume hierarchy, so that only the ones near the player are ray cast
+        self.bvh = DynamicAABBTree(margin=2.0)
 
     def clear_back_buffer(self):
         self.back_buffer.fill(SRender.C_BLACK)
@@ -275,6 +279,14 @@ class SRender(System):
             return None
 
         pvis = [e for e in entities if e.has_component_type("Collidable")]
+        for vis in pvis:
+            vpos = vis.get_of_type("Transform2").position
+            vrx = vis.get_of_type("Renderable")
+            vbounds = (vpos.x, vpos.y, vpos.x + vrx.width, vpos.y + vrx.width)
+            if vis.id in self.bvh:
+                self.bvh.move(vis.id, vbounds)
+            else:
+                self.bvh.insert(vis.id, vbounds)
 
         # for now we just render everyone having a position component
         # and do not care about the projection from world space coordinates to camera space
@@ -321,62 +333,52 @@ class SRender(System):
 
                 pos, dvec = transform.position, transform.viewing_direction
                 view_dist = fov.distance
-                dvec_alpha = dvec.to_angle()
-                fov_angle = fov.angle
-                falpha1, falpha2 = (dvec_alpha - fov_angle / 2.0) % (
-                    2.0 * pi
-                ), dvec_alpha + fov_angle / 2.0 % (2.0 * pi)
-                N_sample = int(elisa.linalg.rad_to_angle(fov_angle))
-                v1 = Vec2.from_angle(falpha1) * view_dist
-                v2 = Vec2.from_angle(falpha2) * view_dist
-                dv = (v2 - v1) / N_sample
-                pdvi = v1
-
-                pv1, pv2 = pos + v1, pos + v2
-                pygame.draw.polygon(
-                    self.back_buffer,
-                    SRender.C_VDARK_GRAY,
-                    [(pos.x, pos.y), (pv1.x, pv1.y), (pv2.x, pv2.y)],
-                    0,
-                )
 
-                for i in range(N_sample):
-                    # perform the collision test
-                    ppvi = pos + pdvi
-                    pdvi = pdvi + dv
-                    rayi = Ray2(origin=pos, direction=pdvi)
-                    for vis in pvis:
-                        visplanes = vis.get_of_type("Collidable").planes
-                        vpos = vis.get_of_type("Transform2").position
-                        vrx = vis.get_of_type("Renderable")
-
-                        intersects = False
-                        for planei in visplanes:
-                            r, t, _ip = elisa.linalg.intersection2(rayi, planei)
-                            if (
-                                r
-                                and 0 <= t <= pdvi.length
-                                and elisa.linalg.inside_square2(
-                                    vpos.x, vpos.y, vrx.width, _ip
-                                )
-                            ):
-                                intersects = True
-                                break
-
-                        if intersects:
-                            pygame.draw.line(
-                                self.back_buffer,
-                                SRender.C_GRAY,
-                                (pos.x, pos.y),
-                                (ppvi.x, ppvi.y),
-                                1,
-                            )
-                            pygame.draw.rect(
-                                self.back_buffer,
-                                SRender.C_WHITE,
-                                (vpos.x, vpos.y, vrx.width, vrx.width),
-                                1,
-                            )
+                # gather the edges of the collidables within viewing distance, the bvh spares us looking at the others
+                near = set(
+                    self.bvh.query(
+                        (
+                            pos.x - view_dist,
+                            pos.y - view_dist,
+                            pos.x + view_dist,
+                            pos.y + view_dist,
+                        )
+                    )
+                )
+                segments, owners = [], []
+                for vis in pvis:
+                    if vis.id not in near:
+                        continue
+                    vpos = vis.get_of_type("Transform2").position
+                    w = vis.get_of_type("Renderable").width
+                    x0, y0, x1, y1 = vpos.x, vpos.y, vpos.x + w, vpos.y + w
+                    segments += [
+                        ((x0, y0), (x1, y0)),
+                        ((x1, y0), (x1, y1)),
+                        ((x1, y1), (x0, y1)),
+                        ((x0, y1), (x0, y0)),
+                    ]
+                    owners += [vis] * 4
+
+                # the visible region and the boxes seen are computed exactly by a single angular sweep over the edges
+                # instead of sampling the field of view with one ray per degree. The sweep requires edges that do not
+                # cross, the boxes placed in init_ecs do not overlap.
+                origin = (pos.x, pos.y)
+                view, seen = visibility(
+                    origin, segments, fov.angle, view_dist, direction=dvec
+                )
+                pygame.draw.polygon(self.back_buffer, SRender.C_VDARK_GRAY, view, 0)
+                pygame.draw.polygon(self.back_buffer, SRender.C_GRAY, view, 1)
+
+                for vis in {owners[i] for i in seen}:
+                    vpos = vis.get_of_type("Transform2").position
+                    vrx = vis.get_of_type("Renderable")
+                    pygame.draw.rect(
+                        self.back_buffer,
+                        SRender.C_WHITE,
+                        (vpos.x, vpos.y, vrx.width, vrx.width),
+                        1,
+                    )
 
                 pygame.draw.circle(
                     self.back_buffer,
@@ -410,6 +412,7 @@ def init_ecs(screen_width, screen_height, verbose: bool = True):
     e_player = EPlayer().add(ctrans).add(cvel).add(crnd).add(cfov)
     entities.append(e_player)
 
+    # the boxes must not overlap, their edges occlude the view in the visibility sweep of SRender
     box_pos_x = (50, 100, 200, 400, 450, 500, 550, 600, 620)
     box_pos_y = (100, 200, 50, 100, 300, 400, 250, 100, 225)
     box_width = (20, 50, 10, 40, 20, 30, 50, 10, 10)
@@ -32,7 +32,7 @@ def draw_box(s, p1, p2, p3, p4):
 
 
 def draw_player(s, r: int, p0):
-    c = (int(p0.x), int(p0.y))
+    c = (int(p0[0]), int(p0[1]))
     pygame.draw.circle(s, (192, 128, 228), c, r)
     pygame.draw.circle(s, (64, 64, 64), c, r, 1)
 
@@ -208,15 +208,15 @@ class RenderSystem(System):
             e_points = e.points
 
             eg_points = [e_mat * Vec3(p.x, p.y, 1.0) for p in e_points]
-            ws_points = [self._cam2d.project_ws(p) for p in eg_points]
-            nc_points = [self._cam2d.project_nc(p) for p in ws_points]
+            # the camera caches the combined local -> clip matrix, so all points go through a single transformation
+            nc_points = self._cam2d.project_many(eg_points, space="nc")
 
-            fully_visible = all([self._cam2d.is_visible(p) for p in nc_points])
+            fully_visible = self._cam2d.is_visible_many(nc_points).all()
             if not fully_visible:
                 # print("{} is not fully visible".format(e))
                 next
 
-            vp_points = [self._cam2d.project_vp(p) for p in nc_points]
+            vp_points = self._cam2d.mat_vp.transform_points(nc_points)
 
             if isinstance(e, PlayerEntity):
                 draw_player(self._back_buffer, e.radius, *vp_points)
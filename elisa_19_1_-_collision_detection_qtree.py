@@ -12,7 +12,8 @@
 
 # TODO: documentation
 
-# NOTE: QuadTree rebalancing will be done when moved into Elisa
+# NOTE: the library version of this structure, a loose quad tree with bulk loading and id based queries,
+# is elisa.spatial.QuadTree
 
 from __future__ import annotations
 
@@ -133,16 +134,20 @@ class QuadTreeNode(object):
         if o is None:
             raise ValueError("o not provided")
 
+        _updated = []
+
         if o in self._elements:
             # check if o still fits into this node
             #   else remove from here and insert at the parent, so that
             #   updating can be handled there
-            if not self._area_rect.inside(o):
+            if not self._area_rect.inside(o) and self._parent is not None:
                 self._elements.remove(o)
                 _ = self._parent.insert(o)
-                return True
+            _updated.append(True)
         else:
-            _updated = [_t.update(o) for _t in self._trees]
+            for _t in self._trees:
+                if _t is not None:
+                    _updated.append(_t.update(o))
 
         return any(_updated)
 
@@ -406,8 +411,7 @@ def main():
     proposal_region = Rect2.from_points(300, 220, 500, 320)
 
     # we are going to update one poly along the x-axis.
-    # this will be based on copying/ creating new objects, which is somewhat wasteful
-    # for the purposes of the tutorial and the current code base, this is what we do
+    # the poly is moved in place, so that the quad tree only has to check whether it still fits its node
     _move_x_min, _move_x_max = 100, 600
     update_poly = poly5
     dir_x = 1.0
@@ -422,23 +426,17 @@ def main():
 
         back_buffer.fill(c_black)
 
-        # update the two polys - this is wasteful ...
+        # update the moving poly
         _pminx, _pminy, _pmaxx, _pmaxy = update_poly.AABB
 
         if _pminx + (_pmaxx - _pminx) >= _move_x_max or _pminx <= _move_x_min:
             dir_x *= -1.0
 
         dx = dir_x * 1.0
-        new_poly: Poly2 = Poly2.translate(update_poly, dx, 0.0)
-        # update entities
-        entities.remove(update_poly)
-        entities.append(new_poly)
+        update_poly.translate_ip(dx, 0.0)
 
         # update the quad tree
-        q_tree.replace(update_poly, new_poly)
-
-        # replace the object identity
-        update_poly = new_poly
+        q_tree.update(update_poly)
 
         for r in q_tree:
             _r: Rect2 = r.points
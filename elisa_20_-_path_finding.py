@@ -69,20 +69,30 @@ class TileMapRenderer(object):
     def clear_buffer(self, surface):
         surface.fill(self._clear_colour)
 
+    def visible_tiles(self) -> tuple:
+        """The columns x0 to x1 and rows y0 to y1 (both exclusive) of the tiles overlapping the view
+
+        Returns:
+            tuple: (x0, y0, x1, y1)
+        """
+        w, h = self._tile_map.map_width, self._tile_map.map_height
+        x0 = min(max(-self._x // self._tile_width, 0), w)
+        y0 = min(max(-self._y // self._tile_height, 0), h)
+        x1 = max(min(-((self._x - self._view_width) // self._tile_width), w), x0)
+        y1 = max(min(-((self._y - self._view_height) // self._tile_height), h), y0)
+        return x0, y0, x1, y1
+
     def render(self, surface):
         self.clear_buffer(surface)
 
-        _x0, _y0 = self._x, self._y
-
-        for y in range(self._tile_map.map_height):
-            _x0 = self._x
-
-            # very primitive do not render anything strictly outside of the visible bounds
-            if _y0 >= self._view_height or _x0 >= self._view_width:
-                continue
+        # only the tiles on screen are read, as nested lists of plain ints
+        x0, y0, x1, y1 = self.visible_tiles()
+        rows = self._tile_map.region("Tile Layer 1", x0, y0, x1, y1).tolist()
+        _y0 = self._y + y0 * self._tile_height
+        for row in rows:
+            _x0 = self._x + x0 * self._tile_width
 
-            for x in range(self._tile_map.map_width):
-                ti = self._tile_map.get_tile_index("Tile Layer 1", x, y)
+            for ti in row:
                 ta_i = self._index2sprite.get(ti, 0)
 
                 if ti == 0:
@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+
+from elisa.ai import CooperativePathfinder
+
+STEPS = {(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)}
+DIAGONALS = {(1, 1), (-1, 1), (1, -1), (-1, -1)}
+
+
+def _simulate(costs: np.ndarray, diagonal: bool, agents: int, steps: int, seed: int) -> int:
+    rng = np.random.default_rng(seed)
+    planner = CooperativePathfinder(costs, diagonal=diagonal, window=8)
+    free = [tuple(c) for c in np.argwhere(np.isfinite(costs))[:, ::-1].tolist()]
+    picks = rng.permutation(len(free))
+    for agent in range(agents):
+        planner.add_agent(agent, free[picks[agent]], free[picks[-1 - agent]])
+
+    moves = STEPS | DIAGONALS if diagonal else STEPS
+    positions = {agent: planner.position(agent) for agent in range(agents)}
+    arrived = 0
+    for _ in range(steps):
+        planner.update(budget=50.0)
+        new = planner.step()
+
+        # no vertex conflicts
+        assert len(set(new.values())) == len(new)
+        for agent, (x1, y1) in new.items():
+            x0, y0 = positions[agent]
+            dx, dy = x1 - x0, y1 - y0
+            # only legal moves onto walkable cells, diagonal steps never cut a blocked corner
+            assert (dx, dy) in moves
+            assert not math.isinf(costs[y1, x1])
+            if (dx, dy) in DIAGONALS:
+                assert not math.isinf(costs[y0, x1]) and not math.isinf(costs[y1, x0])
+        # no swaps
+        for agent, cell in new.items():
+            for other, other_cell in new.items():
+                if other != agent and cell == positions[other]:
+                    assert other_cell != positions[agent]
+        positions = new
+        arrived = sum(planner.arrived(agent) for agent in range(agents))
+    return arrived
+
+
+def test_cooperative_pathfinder_moves_agents_without_conflicts():
+    rng = np.random.default_rng(23)
+    for diagonal in (False, True):
+        costs = np.ones((20, 20))
+        costs[rng.random((20, 20)) < 0.15] = np.inf
+        arrived = _simulate(costs, diagonal, agents=30, steps=80, seed=int(diagonal))
+        assert arrived > 0
@@ -0,0 +1,28 @@
+import numpy as np
+
+from elisa.ai.flowfield import FlowField
+
+
+def test_flow_field_goal_returns_once_its_cell_is_walkable_again():
+    field = FlowField(np.ones((5, 5))).set_goals([(4, 4)])
+
+    field.set_costs(4, 4, np.inf)
+    assert field.goals == []
+    assert np.isinf(field.integration).all()
+
+    field.set_costs(4, 4, 1.0)
+    assert field.goals == [(4, 4)]
+    rebuilt = FlowField(np.ones((5, 5))).set_goals([(4, 4)])
+    assert np.allclose(field.integration, rebuilt.integration)
+    assert (field.directions == rebuilt.directions).all()
+
+
+def test_flow_field_walls_have_no_direction():
+    costs = np.ones((6, 6))
+    costs[2, 1:5] = np.inf
+    field = FlowField(costs).set_goals([(0, 0)])
+    assert (field.directions[2, 1:5] == 0).all()
+    assert field.direction(2, 2) == (0, 0)
+
+    field.set_costs(3, 4, np.inf)
+    assert (field.directions[~np.isfinite(field.costs)] == 0).all()
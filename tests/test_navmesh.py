@@ -0,0 +1,173 @@
+import math
+
+import numpy as np
+
+from elisa.ai import NavMesh
+
+SIZE = 20.0
+
+
+def _inside(poly: list, x: float, y: float) -> bool:
+    # even-odd rule
+    inside = False
+    for (x0, y0), (x1, y1) in zip(poly, poly[1:] + poly[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _boundary_distance(poly: list, x: float, y: float) -> float:
+    best = math.inf
+    for (x0, y0), (x1, y1) in zip(poly, poly[1:] + poly[:1]):
+        dx, dy = x1 - x0, y1 - y0
+        t = min(max(((x - x0) * dx + (y - y0) * dy) / (dx * dx + dy * dy), 0.0), 1.0)
+        best = min(best, math.hypot(x - x0 - t * dx, y - y0 - t * dy))
+    return best
+
+
+def _blocked(obstacles: list, x: float, y: float, margin: float = 1e-6) -> bool:
+    # strictly inside an obstacle, points on an obstacle's boundary are walkable
+    return any(_inside(o, x, y) and _boundary_distance(o, x, y) > margin for o in obstacles)
+
+
+def _rectangles(rng, n: int) -> list:
+    obstacles = []
+    for _ in range(n):
+        x, y = rng.integers(0, 19, 2).tolist()
+        w, h = rng.integers(1, 5, 2).tolist()
+        obstacles.append([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+    return obstacles
+
+
+def _shapes(rng, n: int) -> list:
+    # rotated rectangles and concave L shapes
+    obstacles = []
+    for k in range(n):
+        cx, cy = rng.uniform(1.0, SIZE - 1.0, 2).tolist()
+        a = rng.uniform(0.0, math.pi)
+        if k % 2 == 0:
+            w, h = rng.uniform(0.5, 2.5, 2).tolist()
+            corners = [(-w, -h), (w, -h), (w, h), (-w, h)]
+        else:
+            s = rng.uniform(1.0, 2.5)
+            corners = [(0, 0), (s, 0), (s, s / 3), (s / 3, s / 3), (s / 3, s), (0, s)]
+        ca, sa = math.cos(a), math.sin(a)
+        obstacles.append([(cx + ca * px - sa * py, cy + sa * px + ca * py) for px, py in corners])
+    return obstacles
+
+
+def _maps(rng, n: int):
+    for k in range(n):
+        yield _rectangles(rng, 12) if k % 2 == 0 else _shapes(rng, 10)
+
+
+def _free_points(rng, obstacles: list, n: int) -> list:
+    points = []
+    while len(points) < n:
+        x, y = rng.uniform(0.0, SIZE, 2).tolist()
+        if not _blocked(obstacles, x, y, margin=-1e-3) and min(x, y, SIZE - x, SIZE - y) > 1e-3:
+            points.append((x, y))
+    return points
+
+
+def test_navmesh_triangles_are_counter_clockwise_and_locate_matches_obstacles():
+    rng = np.random.default_rng(24)
+    for obstacles in _maps(rng, 20):
+        mesh = NavMesh.build((0.0, 0.0, SIZE, SIZE), obstacles)
+        a, b, c = (mesh.vertices[mesh.triangles[:, k]] for k in range(3))
+        cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        assert (cross > 0.0).all()
+
+        for x, y in rng.uniform(0.0, SIZE, (200, 2)).tolist():
+            if any(_boundary_distance(o, x, y) < 1e-6 for o in obstacles):
+                continue
+            assert (mesh.locate((x, y)) == -1) == _blocked(obstacles, x, y)
+
+
+def test_navmesh_covers_the_free_area():
+    rng = np.random.default_rng(25)
+    for obstacles in _maps(rng, 6):
+        mesh = NavMesh.build((0.0, 0.0, SIZE, SIZE), obstacles)
+        a, b, c = (mesh.vertices[mesh.triangles[:, k]] for k in range(3))
+        area = 0.5 * np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])).sum()
+
+        # midpoints of a fine raster estimate the free area
+        r = np.arange(0.0, SIZE, 0.1) + 0.05
+        free = sum(not _blocked(obstacles, x, y, margin=0.0) for x in r.tolist() for y in r.tolist())
+        assert math.isclose(area, free * 0.01, rel_tol=0.02)
+
+
+def test_navmesh_paths_stay_out_of_obstacles():
+    rng = np.random.default_rng(26)
+    for obstacles in _maps(rng, 12):
+        mesh = NavMesh.build((0.0, 0.0, SIZE, SIZE), obstacles)
+        points = _free_points(rng, obstacles, 20)
+        for start, goal in zip(points[::2], points[1::2]):
+            path = mesh.find_path(start, goal)
+            if path is None:
+                continue
+            assert np.allclose(path[0], start) and np.allclose(path[-1], goal)
+            for (x0, y0), (x1, y1) in zip(path, path[1:]):
+                for t in np.linspace(0.0, 1.0, 40).tolist():
+                    x, y = x0 + t * (x1 - x0), y0 + t * (y1 - y0)
+                    assert -1e-6 <= x <= SIZE + 1e-6 and -1e-6 <= y <= SIZE + 1e-6
+                    assert not _blocked(obstacles, x, y)
+
+
+def _flood_fill(obstacles: list, res: float = 0.25) -> np.ndarray:
+    # 4-connected components of the raster cells, their centres never lie on the integer obstacle edges
+    n = int(SIZE / res)
+    centres = (np.arange(n) + 0.5) * res
+    free = np.array([[not _blocked(obstacles, x, y, margin=0.0) for x in centres.tolist()] for y in centres.tolist()])
+    label = np.full((n, n), -1)
+    for sy, sx in np.argwhere(free).tolist():
+        if label[sy, sx] >= 0:
+            continue
+        stack = [(sy, sx)]
+        label[sy, sx] = sy * n + sx
+        while stack:
+            y, x = stack.pop()
+            for ny, nx in ((y + 1, x), (y - 1, x), (y, x + 1), (y, x - 1)):
+                if 0 <= ny < n and 0 <= nx < n and free[ny, nx] and label[ny, nx] < 0:
+                    label[ny, nx] = label[sy, sx]
+                    stack.append((ny, nx))
+    return label
+
+
+def test_navmesh_reachability_matches_a_flood_fill():
+    rng = np.random.default_rng(27)
+    res = 0.25
+    for _ in range(6):
+        # a walled room, its inside is only reachable from itself
+        x, y = rng.integers(0, 14, 2).tolist()
+        room = [
+            [(x, y), (x + 6, y), (x + 6, y + 1), (x, y + 1)],
+            [(x, y + 5), (x + 6, y + 5), (x + 6, y + 6), (x, y + 6)],
+            [(x, y), (x + 1, y), (x + 1, y + 6), (x, y + 6)],
+            [(x + 5, y), (x + 6, y), (x + 6, y + 6), (x + 5, y + 6)],
+        ]
+        obstacles = _rectangles(rng, 10) + room
+        mesh = NavMesh.build((0.0, 0.0, SIZE, SIZE), obstacles)
+        label = _flood_fill(obstacles, res)
+        free = np.argwhere(label >= 0)
+        picks = free[rng.integers(0, len(free), (40, 2))]
+        for (sy, sx), (gy, gx) in picks.tolist():
+            start, goal = ((sx + 0.5) * res, (sy + 0.5) * res), ((gx + 0.5) * res, (gy + 0.5) * res)
+            reachable = label[sy, sx] == label[gy, gx]
+            assert (mesh.find_path(start, goal) is not None) == reachable
+
+
+def test_navmesh_save_and_load_round_trip(tmp_path):
+    rng = np.random.default_rng(28)
+    obstacles = _shapes(rng, 8)
+    mesh = NavMesh.build((0.0, 0.0, SIZE, SIZE), obstacles)
+    fp = str(tmp_path / "navmesh.json")
+    mesh.save(fp)
+    loaded = NavMesh.load(fp)
+    assert np.allclose(loaded.vertices, mesh.vertices)
+    assert (loaded.triangles == mesh.triangles).all()
+    assert (loaded.neighbours == mesh.neighbours).all()
+
+    points = _free_points(rng, obstacles, 10)
+    for start, goal in zip(points[::2], points[1::2]):
+        assert loaded.find_path(start, goal) == mesh.find_path(start, goal)
@@ -0,0 +1,160 @@
+import heapq
+import math
+
+import numpy as np
+
+from elisa.ai import GridPathfinder, HierarchicalPathfinder, JumpPointFinder
+from elisa.ai.pathfinding import SQRT2
+
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+
+def _random_costs(rng, h: int, w: int, blocked: float = 0.25, weighted: bool = True) -> np.ndarray:
+    costs = rng.integers(1, 5, (h, w)).astype(np.float64) if weighted else np.ones((h, w))
+    costs[rng.random((h, w)) < blocked] = math.inf
+    return costs
+
+
+def _dijkstra(costs: np.ndarray, start, diagonal: bool) -> np.ndarray:
+    # reference cost of the cheapest path from start to every cell, diagonal steps may not cut blocked corners
+    h, w = costs.shape
+    dist = np.full((h, w), math.inf)
+    dist[start[1], start[0]] = 0.0
+    open_set = [(0.0, start)]
+    while open_set:
+        d, (x, y) = heapq.heappop(open_set)
+        if d > dist[y, x]:
+            continue
+        for dx, dy in STEPS if diagonal else STEPS[:4]:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < w and 0 <= ny < h) or math.isinf(costs[ny, nx]):
+                continue
+            if dx != 0 and dy != 0 and (math.isinf(costs[y, nx]) or math.isinf(costs[ny, x])):
+                continue
+            nd = d + costs[ny, nx] * (SQRT2 if dx != 0 and dy != 0 else 1.0)
+            if nd < dist[ny, nx]:
+                dist[ny, nx] = nd
+                heapq.heappush(open_set, (nd, (nx, ny)))
+    return dist
+
+
+def _assert_valid_path(path: list, costs: np.ndarray, start, goal, diagonal: bool) -> None:
+    assert path[0] == tuple(start) and path[-1] == tuple(goal)
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        dx, dy = x1 - x0, y1 - y0
+        assert (dx, dy) in (STEPS if diagonal else STEPS[:4])
+        assert not math.isinf(costs[y1, x1])
+        if dx != 0 and dy != 0:
+            assert not math.isinf(costs[y0, x1]) and not math.isinf(costs[y1, x0])
+
+
+def _expand(path: list) -> list:
+    # jump point paths list the jump points only, the cells in between lie on straight or diagonal lines
+    cells = [path[0]]
+    for (x1, y1) in path[1:]:
+        x0, y0 = cells[-1]
+        sx, sy = int(np.sign(x1 - x0)), int(np.sign(y1 - y0))
+        while (x0, y0) != (x1, y1):
+            x0, y0 = x0 + sx, y0 + sy
+            cells.append((x0, y0))
+    return cells
+
+
+def _queries(rng, costs: np.ndarray, n: int) -> list:
+    free = np.argwhere(np.isfinite(costs))
+    picks = rng.integers(0, len(free), (n, 2))
+    return [(tuple(free[a][::-1].tolist()), tuple(free[b][::-1].tolist())) for a, b in picks]
+
+
+def test_grid_pathfinder_finds_cheapest_paths():
+    rng = np.random.default_rng(18)
+    for diagonal in (False, True):
+        for _ in range(5):
+            costs = _random_costs(rng, 24, 32)
+            finder = GridPathfinder(costs, diagonal)
+            for start, goal in _queries(rng, costs, 30):
+                best = _dijkstra(costs, start, diagonal)[goal[1], goal[0]]
+                path = finder.find_path(start, goal)
+                if math.isinf(best):
+                    assert path is None
+                    continue
+                _assert_valid_path(path, costs, start, goal, diagonal)
+                assert math.isclose(finder.path_cost(path), best)
+
+
+def test_jump_point_finder_matches_astar_costs():
+    rng = np.random.default_rng(19)
+    for _ in range(8):
+        costs = _random_costs(rng, 30, 30, weighted=False)
+        jps, astar = JumpPointFinder.from_costs(costs), GridPathfinder(costs, diagonal=True)
+        for start, goal in _queries(rng, costs, 40):
+            expected = astar.find_path(start, goal)
+            path = jps.find_path(start, goal)
+            if expected is None:
+                assert path is None
+                continue
+            cells = _expand(path)
+            _assert_valid_path(cells, costs, start, goal, diagonal=True)
+            assert math.isclose(astar.path_cost(cells), astar.path_cost(expected))
+
+
+def test_jump_point_finder_set_walkable_equals_fresh_build():
+    rng = np.random.default_rng(20)
+    walkable = rng.random((25, 35)) > 0.3
+    jps = JumpPointFinder(walkable)
+    for _ in range(40):
+        h, w = rng.integers(1, 4, 2)
+        x0, y0 = rng.integers(0, 35 - w), rng.integers(0, 25 - h)
+        region = rng.random((h, w)) > 0.5
+        walkable[y0 : y0 + h, x0 : x0 + w] = region
+        jps.set_walkable(x0, y0, region)
+
+        fresh = JumpPointFinder(walkable)
+        assert (jps.walkable == fresh.walkable).all()
+        assert jps._jump == fresh._jump and jps._run == fresh._run
+
+
+def test_hierarchical_pathfinder_set_costs_equals_fresh_build():
+    rng = np.random.default_rng(21)
+    for diagonal in (False, True):
+        costs = _random_costs(rng, 30, 37)
+        hpa = HierarchicalPathfinder(costs, 8, diagonal)
+        for _ in range(25):
+            h, w = rng.integers(1, 6, 2)
+            x0, y0 = rng.integers(0, 37 - w), rng.integers(0, 30 - h)
+            region = _random_costs(rng, h, w, blocked=0.4)
+            costs[y0 : y0 + h, x0 : x0 + w] = region
+            hpa.set_costs(x0, y0, region)
+
+            fresh = HierarchicalPathfinder(costs, 8, diagonal)
+            assert hpa._transitions == fresh._transitions
+            assert hpa._inter == fresh._inter
+            assert hpa._intra == fresh._intra
+
+
+def test_hierarchical_pathfinder_paths_are_valid_and_near_optimal():
+    rng = np.random.default_rng(22)
+    cs = 8
+    for diagonal in (False, True):
+        costs = _random_costs(rng, 40, 40, blocked=0.2)
+        hpa, astar = HierarchicalPathfinder(costs, cs, diagonal), GridPathfinder(costs, diagonal)
+        for start, goal in _queries(rng, costs, 150):
+            expected = astar.find_path(start, goal)
+            path = hpa.find_path(start, goal)
+            if expected is None:
+                assert path is None
+                continue
+            _assert_valid_path(path, costs, start, goal, diagonal)
+            best = astar.path_cost(expected)
+            assert hpa.path_cost(path) >= best - 1e-9
+
+            # in the same or neighbouring clusters the direct path inside both clusters is always considered
+            (sx, sy), (tx, ty) = start, goal
+            if abs(sx // cs - tx // cs) <= 1 and abs(sy // cs - ty // cs) <= 1 and (sx // cs, sy // cs) != (
+                tx // cs,
+                ty // cs,
+            ):
+                x0, x1 = min(sx, tx) // cs * cs, (max(sx, tx) // cs + 1) * cs
+                y0, y1 = min(sy, ty) // cs * cs, (max(sy, ty) // cs + 1) * cs
+                if all(x0 <= x < x1 and y0 <= y < y1 for x, y in expected):
+                    assert math.isclose(hpa.path_cost(path), best)
@@ -0,0 +1,62 @@
+from elisa.arch.ecs.entity import Entity
+from elisa.linalg import Point2
+from elisa.linalg.geom2 import Circle2
+from elisa.spatial.systems import SweepAndPruneSystem
+
+
+def _collision_system(positions: dict) -> SweepAndPruneSystem:
+    # unit circles whose boxes are the circles' bounding squares
+    def bounds_fn(e):
+        x, y = positions[e.id]
+        return x - 1.0, y - 1.0, x + 1.0, y + 1.0
+
+    return SweepAndPruneSystem(bounds_fn=bounds_fn, shape_fn=lambda e: Circle2(Point2(*positions[e.id]), 1.0))
+
+
+def _phases(system: SweepAndPruneSystem) -> list:
+    return sorted(m.phase for m in system.messages)
+
+
+def test_sweep_and_prune_system_contacts_follow_the_shapes():
+    a, b = Entity(), Entity()
+    positions = {a.id: (0.0, 0.0), b.id: (1.6, 1.6)}
+    system = _collision_system(positions)
+
+    # the boxes overlap a frame before the circles touch
+    system.update(0.0, [a, b])
+    assert system.broadphase.pairs
+    assert _phases(system) == []
+
+    positions[b.id] = (1.2, 1.2)
+    system.update(0.0, [a, b])
+    assert _phases(system) == ["Begin", "Begin"]
+    assert {m.receiver for m in system.messages} == {a.id, b.id}
+    assert all(m.manifold is not None for m in system.messages)
+
+    system.update(0.0, [a, b])
+    assert _phases(system) == ["Persist", "Persist"]
+
+    # the circles separate while the boxes still overlap
+    positions[b.id] = (1.6, 1.6)
+    system.update(0.0, [a, b])
+    assert system.broadphase.pairs
+    assert _phases(system) == ["End", "End"]
+
+    positions[b.id] = (10.0, 10.0)
+    system.update(0.0, [a, b])
+    assert _phases(system) == []
+
+
+def test_sweep_and_prune_system_ends_contacts_of_removed_entities():
+    a, b = Entity(), Entity()
+    positions = {a.id: (0.0, 0.0), b.id: (1.0, 0.0)}
+    system = _collision_system(positions)
+
+    system.update(0.0, [a, b])
+    assert _phases(system) == ["Begin", "Begin"]
+
+    system.update(0.0, [a])
+    assert _phases(system) == ["End", "End"]
+
+    system.update(0.0, [a, b])
+    assert _phases(system) == ["Begin", "Begin"]
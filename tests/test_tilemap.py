@@ -0,0 +1,41 @@
+import numpy as np
+
+from elisa.sprite import TileMap
+
+
+def _tile_map() -> TileMap:
+    tm = TileMap(16, 4, 3)
+    tm.add_grid("layer", [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]])
+    return tm
+
+
+def test_get_grid_returns_nested_lists_of_ints():
+    tm = _tile_map()
+    grid = tm.get_grid("layer")
+    assert grid == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]]
+    assert type(grid) is list and all(type(row) is list for row in grid)
+    assert all(type(ti) is int for row in grid for ti in row)
+
+    # the lists are a copy of the layer
+    grid[0][0] = 42
+    assert tm.get_tile_index(0, 0, "layer") == 1
+
+
+def test_get_array_is_the_layer():
+    tm = _tile_map()
+    array = tm.get_array("layer")
+    assert isinstance(array, np.ndarray) and array.shape == (3, 4)
+
+    array[1, 2] = 42
+    assert tm.get_tile_index(2, 1, "layer") == 42
+    assert tm.region("layer", 1, 1, 3, 3).tolist() == [[6, 42], [10, 11]]
+
+
+def test_empty_grid_round_trips_through_add_grid():
+    tm = _tile_map()
+    tm.add_grid("empty", tm.empty_grid())
+    assert tm.get_grid("empty") == [[0] * 4 for _ in range(3)]
+
+    tm = TileMap(16, 4, 3, empty_tile_id=5)
+    tm.add_grid("empty", tm.empty_grid())
+    assert tm.get_grid_indices("empty") == {5}
@@ -0,0 +1,51 @@
+import copy
+
+import pytest
+
+from elisa.linalg import Vec, Vec2, Vec3, VecN
+from elisa.linalg.vec2 import OneVec2, ZeroVec2
+from elisa.linalg.vec3 import one3, zero3
+
+
+def test_augmented_operators_change_a_vec2_in_place():
+    u = Vec2(1.0, 2.0)
+    alias = u
+    u += Vec2(1.0, 1.0)
+    assert alias is u and u == Vec2(2.0, 3.0)
+
+
+def test_shared_vec2_constants_do_not_change():
+    v = ZeroVec2
+    v += Vec2(1.0, 2.0)
+    w = OneVec2
+    w *= 3.0
+    assert v == Vec2(1.0, 2.0) and w == Vec2(3.0, 3.0)
+    assert ZeroVec2 == Vec2(0.0, 0.0) and OneVec2 == Vec2(1.0, 1.0)
+
+    with pytest.raises(ValueError):
+        ZeroVec2.set(1.0, 1.0)
+    with pytest.raises(ValueError):
+        ZeroVec2[0] = 1.0
+    with pytest.raises(ValueError):
+        Vec2.add_into(OneVec2, OneVec2, OneVec2)
+
+
+def test_shared_vec3_constants_do_not_change():
+    v = zero3
+    v += Vec3(1.0, 2.0, 3.0)
+    assert tuple(v) == (1.0, 2.0, 3.0)
+    assert tuple(zero3) == (0.0, 0.0, 0.0) and tuple(one3) == (1.0, 1.0, 1.0)
+
+    with pytest.raises(ValueError):
+        Vec3.add_into(one3, one3, one3)
+
+
+def test_vec_is_constructible_and_vecn_keeps_its_type():
+    u = Vec([1.0, 2.0, 3.0])
+    w = u + (1.0, 1.0, 1.0)
+    assert type(w) is Vec and w.v == [2.0, 3.0, 4.0]
+    assert Vec(Vec2(1.0, 2.0)).v == [1.0, 2.0]
+
+    n = VecN([3.0, 4.0])
+    assert isinstance(n, Vec) and n.length == 5.0
+    assert type(n - VecN([1.0, 1.0])) is VecN and type(copy.copy(n)) is VecN
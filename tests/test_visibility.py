@@ -0,0 +1,28 @@
+import math
+
+import numpy as np
+
+from elisa.vision import visibility, visibility_polygon, visible_segments
+
+
+def test_visibility_equals_polygon_and_visible_segments():
+    rng = np.random.default_rng(16)
+    for _ in range(50):
+        segments = []
+        # non overlapping boxes on a grid of slots
+        for k in rng.permutation(36)[:8].tolist():
+            x, y = (k % 6) * 16.0 - 48.0, (k // 6) * 16.0 - 48.0
+            w = rng.uniform(1.0, 8.0)
+            segments += [
+                ((x, y), (x + w, y)),
+                ((x + w, y), (x + w, y + w)),
+                ((x + w, y + w), (x, y + w)),
+                ((x, y + w), (x, y)),
+            ]
+        origin = tuple(rng.uniform(-56.0, -50.0, 2).tolist())
+        fov, direction = rng.uniform(0.3, 2.0 * math.pi), rng.uniform(0.0, 2.0 * math.pi)
+        max_dist = None if rng.random() < 0.5 else 60.0
+
+        polygon, seen = visibility(origin, segments, fov, max_dist, direction)
+        assert polygon == visibility_polygon(origin, segments, fov, max_dist, direction)
+        assert (seen == visible_segments(origin, segments, fov, max_dist, direction)).all()